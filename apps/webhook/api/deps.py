@@ -17,9 +17,15 @@ from fastapi import Depends, Header, HTTPException, Request, status
 from redis import Redis
 from rq import Queue
 
+from api.schemas.search import CountMode
 from config import settings
 from services.bm25_engine import BM25Engine
+from services.chunking_pool import ChunkingPool
+from services.content_registry import IndexedContentRegistry, index_version
 from services.embedding import EmbeddingService
+from services.embedding_cache import create_embedding_cache
+from services.query_embedding_cache import QueryEmbeddingCache
+from services.search_cache import IndexGeneration, SearchResultCache
 # NOTE: IndexingService is imported lazily inside get_indexing_service
 # to avoid circular imports between services.indexing, api.deps, and
 # API routers that depend on these modules.
@@ -36,6 +42,7 @@ __all__ = [
     "verify_api_secret",
     "verify_webhook_signature",
     "get_text_chunker",
+    "get_chunking_pool",
     "get_embedding_service",
     "get_vector_store",
     "get_bm25_engine",
@@ -49,6 +56,7 @@ __all__ = [
 
 # Global instances (lazy-loaded)
 _text_chunker: TextChunker | None = None
+_chunking_pool: ChunkingPool | None = None
 _embedding_service: Any = None
 _vector_store: Any = None
 _bm25_engine: Any = None
@@ -82,6 +90,9 @@ class _StubVectorStore:
     async def health_check(self) -> bool:
         return True
 
+    async def payload_index_status(self) -> dict[str, str]:
+        return {}
+
     async def count_points(self) -> int:
         return 1
 
@@ -109,6 +120,8 @@ class _StubIndexingService:
 
 
 class _StubSearchOrchestrator:
+    query_cache = None
+
     async def search(
         self, query: str, mode: str, limit: int, **kwargs: Any
     ) -> tuple[list[dict[str, Any]], int]:
@@ -153,6 +166,20 @@ def get_text_chunker() -> TextChunker:
     return _text_chunker  # type: ignore[return-value]
 
 
+def get_chunking_pool(
+    text_chunker: Annotated[TextChunker, Depends(get_text_chunker)],
+) -> ChunkingPool:
+    """Get or create the pool cleaning and chunking documents off the event loop."""
+    global _chunking_pool
+    if _chunking_pool is None:
+        _chunking_pool = ChunkingPool(
+            text_chunker,
+            mode="inline" if settings.test_mode else settings.chunking_pool_mode,
+            workers=settings.chunking_pool_workers,
+        )
+    return _chunking_pool
+
+
 def get_embedding_service() -> EmbeddingService:
     """Get or create EmbeddingService instance."""
     global _embedding_service
@@ -163,6 +190,18 @@ def get_embedding_service() -> EmbeddingService:
             _embedding_service = EmbeddingService(
                 tei_url=settings.tei_url,
                 api_key=settings.tei_api_key,
+                cache=create_embedding_cache(
+                    backend=settings.embedding_cache_backend,
+                    model=settings.embedding_model,
+                    path=settings.embedding_cache_path,
+                    redis_url=settings.redis_url,
+                    max_entries=settings.embedding_cache_max_entries,
+                ),
+                micro_batch_wait_ms=settings.embedding_micro_batch_wait_ms,
+                micro_batch_size=settings.embedding_micro_batch_size,
+                micro_batch_tokens=settings.embedding_micro_batch_tokens,
+                max_concurrency=settings.tei_max_concurrent_requests,
+                eject_seconds=settings.tei_eject_seconds,
             )
     return _embedding_service  # type: ignore[no-any-return]
 
@@ -179,6 +218,14 @@ def get_vector_store() -> VectorStore:
                 collection_name=settings.qdrant_collection,
                 vector_dim=settings.vector_dim,
                 timeout=int(settings.qdrant_timeout),
+                count_cache_ttl=settings.vector_count_cache_ttl_seconds,
+                quantization=settings.qdrant_quantization,
+                oversampling=settings.qdrant_oversampling,
+                rescore=settings.qdrant_rescore,
+                vectors_on_disk=settings.qdrant_vectors_on_disk,
+                payload_on_disk=settings.qdrant_payload_on_disk,
+                hnsw_m=settings.qdrant_hnsw_m,
+                hnsw_ef_construct=settings.qdrant_hnsw_ef_construct,
             )
     return _vector_store  # type: ignore[no-any-return]
 
@@ -202,6 +249,7 @@ def get_indexing_service(
     embedding_service: Annotated[EmbeddingService, Depends(get_embedding_service)],
     vector_store: Annotated[VectorStore, Depends(get_vector_store)],
     bm25_engine: Annotated[BM25Engine, Depends(get_bm25_engine)],
+    chunking_pool: Annotated[ChunkingPool, Depends(get_chunking_pool)],
 ) -> "IndexingService":
     """Get or create IndexingService instance.
 
@@ -215,11 +263,24 @@ def get_indexing_service(
         if settings.test_mode:
             _indexing_service = _StubIndexingService()
         else:
+            content_registry = None
+            if settings.skip_unchanged_documents:
+                content_registry = IndexedContentRegistry(
+                    redis=get_redis_connection(),
+                    index_version=index_version(settings),
+                )
             _indexing_service = IndexingService(
                 text_chunker=text_chunker,
                 embedding_service=embedding_service,
                 vector_store=vector_store,
                 bm25_engine=bm25_engine,
+                content_registry=content_registry,
+                index_generation=(
+                    IndexGeneration(get_redis_connection(), settings.qdrant_collection)
+                    if settings.search_result_cache_enabled
+                    else None
+                ),
+                chunking_pool=chunking_pool,
             )
     return _indexing_service  # type: ignore[no-any-return]
 
@@ -237,11 +298,37 @@ def get_search_orchestrator(
         else:
             from services.search import SearchOrchestrator
 
+            query_cache = None
+            if settings.query_embedding_cache_size > 0:
+                query_cache = QueryEmbeddingCache(
+                    model=settings.embedding_model,
+                    max_entries=settings.query_embedding_cache_size,
+                    ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+                    # Vectors are binary, so the connection must not decode responses
+                    redis=(
+                        Redis.from_url(settings.redis_url)
+                        if settings.query_embedding_cache_redis
+                        else None
+                    ),
+                )
+            result_cache = None
+            if settings.search_result_cache_enabled:
+                redis_conn = get_redis_connection()
+                result_cache = SearchResultCache(
+                    redis=redis_conn,
+                    generation=IndexGeneration(redis_conn, settings.qdrant_collection),
+                    ttl_seconds=settings.search_result_cache_ttl_seconds,
+                )
             _search_orchestrator = SearchOrchestrator(
                 embedding_service=embedding_service,
                 vector_store=vector_store,
                 bm25_engine=bm25_engine,
                 rrf_k=settings.rrf_k,
+                query_cache=query_cache,
+                semantic_timeout=settings.hybrid_semantic_timeout_seconds,
+                keyword_timeout=settings.hybrid_keyword_timeout_seconds,
+                result_cache=result_cache,
+                count_mode=CountMode(settings.vector_count_mode),
             )
     return _search_orchestrator  # type: ignore[no-any-return]
 
@@ -290,7 +377,7 @@ async def cleanup_services() -> None:
 
     This function is idempotent and can be safely called multiple times.
     """
-    global _text_chunker, _embedding_service, _vector_store, _bm25_engine
+    global _text_chunker, _chunking_pool, _embedding_service, _vector_store, _bm25_engine
     global _indexing_service, _search_orchestrator, _redis_conn, _rq_queue
     global _http_client
 
@@ -324,6 +411,15 @@ async def cleanup_services() -> None:
         finally:
             _vector_store = None
 
+    # Stop chunking pool workers
+    if _chunking_pool is not None:
+        try:
+            _chunking_pool.close()
+        except Exception:
+            logger.exception("Failed to close chunking pool")
+        finally:
+            _chunking_pool = None
+
     # Close Redis connection (synchronous - use thread to avoid blocking)
     if _redis_conn is not None:
         try:
@@ -59,6 +59,19 @@ async def health_check(
         logger.error("Qdrant health check failed", error=str(e))
         services["qdrant"] = f"unhealthy: {str(e)}"
 
+    # Check Qdrant payload indexes used by filtered search
+    try:
+        index_status = await vector_store.payload_index_status()
+        not_indexed = [
+            f"{field} {state}" for field, state in index_status.items() if state != "indexed"
+        ]
+        services["qdrant_payload_indexes"] = (
+            f"unhealthy: {', '.join(not_indexed)}" if not_indexed else "healthy"
+        )
+    except Exception as e:
+        logger.error("Qdrant payload index check failed", error=str(e))
+        services["qdrant_payload_indexes"] = f"unhealthy: {str(e)}"
+
     # Check TEI
     try:
         tei_healthy = await embedding_service.health_check()
@@ -1,7 +1,7 @@
 """
 Document indexing API endpoints.
 
-Handles document indexing requests (legacy and test endpoints).
+Handles document indexing requests (legacy and test endpoints) and deletions.
 """
 
 import time
@@ -100,6 +100,30 @@ async def index_document(
         )
 
 
+@router.delete("/index", dependencies=[Depends(verify_api_secret)])
+@limiter.limit("100/minute")
+async def delete_document(
+    request: Request,
+    url: str,
+    indexing_service: Annotated[IndexingService, Depends(get_indexing_service)],
+) -> dict[str, Any]:
+    """
+    Remove a document from the search indexes.
+
+    Deletes the document's vectors and tombstones every BM25 version of its
+    canonical URL, so it stops matching searches immediately.
+    """
+    logger.info("Delete document request", url=url)
+
+    result = await indexing_service.delete_document(url)
+    if not result["success"]:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=result["error"],
+        )
+    return result
+
+
 @router.post("/test-index", dependencies=[Depends(verify_api_secret)])
 @limiter.limit("5/minute")
 async def test_index_document(
@@ -4,15 +4,17 @@ API routes for querying timing metrics.
 Provides endpoints to retrieve and analyze performance metrics.
 """
 
+import asyncio
 from datetime import UTC, datetime, timedelta
 from typing import Annotated, Any
 
 import sqlalchemy as sa
 from fastapi import APIRouter, Depends, HTTPException, Query
+from redis import Redis
 from sqlalchemy import desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.deps import verify_api_secret
+from api.deps import get_redis_connection, get_search_orchestrator, verify_api_secret
 from api.schemas.metrics import (
     CrawlMetricsResponse,
     OperationTimingSummary,
@@ -20,6 +22,8 @@ from api.schemas.metrics import (
 )
 from domain.models import CrawlSession, OperationMetric, RequestMetric
 from infra.database import get_db_session
+from services.chunking_pool import published_stats
+from services.search import SearchOrchestrator
 from utils.logging import get_logger
 from utils.time import format_est_timestamp
 
@@ -391,3 +395,50 @@ async def get_crawl_metrics(
         error_message=session.error_message,
         extra_metadata=session.extra_metadata,
     )
+
+
+@router.get("/query-cache", dependencies=[Depends(verify_api_secret)])
+async def get_query_cache_metrics(
+    orchestrator: Annotated[SearchOrchestrator, Depends(get_search_orchestrator)],
+) -> dict[str, Any]:
+    """
+    Retrieve query embedding cache counters.
+
+    Args:
+        orchestrator: Search orchestrator owning the cache
+
+    Returns:
+        Hit/miss counters since startup, or ``enabled: False`` when the
+        cache is disabled
+    """
+    if orchestrator.query_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **orchestrator.query_cache.stats()}
+
+
+@router.get("/chunking-pool", dependencies=[Depends(verify_api_secret)])
+async def get_chunking_pool_metrics(
+    redis: Annotated[Redis, Depends(get_redis_connection)],
+) -> dict[str, Any]:
+    """
+    Retrieve utilisation of the pools cleaning and chunking documents.
+
+    Indexing runs in the RQ workers, whose pools publish their counters to
+    Redis after every batch.
+
+    Args:
+        redis: Redis connection
+
+    Returns:
+        Per worker process: mode, worker count, in-flight tasks and busy/wait
+        time since startup, and when they were published
+
+    Raises:
+        HTTPException: If Redis cannot be read
+    """
+    try:
+        workers = await asyncio.to_thread(published_stats, redis)
+    except Exception as e:
+        logger.error("Failed to read chunking pool stats", error=str(e))
+        raise HTTPException(status_code=503, detail="Chunking pool stats unavailable") from e
+    return {"workers": workers}
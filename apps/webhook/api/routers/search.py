@@ -11,7 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from api.deps import get_bm25_engine, get_search_orchestrator, get_vector_store, verify_api_secret
 from api.schemas.health import IndexStats
-from api.schemas.search import SearchRequest, SearchResponse, SearchResult
+from api.schemas.search import CountMode, SearchRequest, SearchResponse, SearchResult
 from infra.rate_limit import limiter
 from services.bm25_engine import BM25Engine
 from services.vector_store import VectorStore
@@ -82,14 +82,20 @@ async def search_documents(
             language=filters.get("language"),
             country=filters.get("country"),
             is_mobile=filters.get("is_mobile"),
+            count_mode=search_request.count_mode,
         )
         search_duration_ms = round((time.perf_counter() - search_start) * 1000, 2)
+        # Hybrid searches return SearchResults, flagged when a leg was dropped
+        partial = getattr(raw_results, "partial", False)
+        count_mode = getattr(raw_results, "count_mode", CountMode.EXACT)
 
         logger.info(
             "Search orchestration completed",
             duration_ms=search_duration_ms,
             raw_results_count=len(raw_results),
             total_count=total_count,
+            count_mode=count_mode,
+            partial=partial,
         )
 
         # Convert to response format
@@ -146,6 +152,8 @@ async def search_documents(
             total=total_count,
             query=search_request.query,
             mode=search_request.mode,
+            partial=partial,
+            count_mode=count_mode,
         )
 
     except Exception as e:
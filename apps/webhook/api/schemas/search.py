@@ -1,6 +1,6 @@
 """Search-related API schemas."""
 
-from enum import Enum
+from enum import Enum, StrEnum
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -15,6 +15,15 @@ class SearchMode(str, Enum):
     BM25 = "bm25"  # Alias for keyword
 
 
+class CountMode(StrEnum):
+    """How the total of a vector search is counted."""
+
+    NONE = "none"  # No count request; total is a lower bound
+    APPROXIMATE = "approximate"  # Qdrant estimate from index statistics
+    CACHED = "cached"  # Exact count reused per filter set for a TTL
+    EXACT = "exact"  # Exact filtered count on every search
+
+
 class SearchFilter(BaseModel):
     """Search filters."""
 
@@ -39,6 +48,10 @@ class SearchRequest(BaseModel):
     limit: int = Field(default=10, ge=1, le=100, description="Maximum results")
     offset: int = Field(default=0, ge=0, description="Zero-based pagination offset")
     filters: SearchFilter | None = Field(default=None, description="Search filters")
+    count_mode: CountMode | None = Field(
+        default=None,
+        description="How the vector total is counted (default: server setting)",
+    )
 
 
 class SearchResult(BaseModel):
@@ -60,3 +73,11 @@ class SearchResponse(BaseModel):
     total: int = Field(description="Total number of results")
     query: str = Field(description="Original query")
     mode: SearchMode = Field(description="Search mode used")
+    partial: bool = Field(
+        default=False,
+        description="True when a hybrid search leg timed out or failed and was left out",
+    )
+    count_mode: CountMode = Field(
+        default=CountMode.EXACT,
+        description="How total was counted; with none it is only a lower bound",
+    )
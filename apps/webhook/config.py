@@ -10,7 +10,7 @@ Environment variables are checked in order:
 
 import json
 import re
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import (
     AliasChoices,
@@ -132,7 +132,7 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices(
             "WEBHOOK_QDRANT_COLLECTION", "SEARCH_BRIDGE_QDRANT_COLLECTION"
         ),
-        description="Qdrant collection name",
+        description="Qdrant collection alias searches and writes go through",
     )
     qdrant_timeout: float = Field(
         default=60.0,
@@ -145,11 +145,51 @@ class Settings(BaseSettings):
         description="Vector dimensions",
     )
 
+    # Qdrant collection storage layout (existing collections are migrated at startup)
+    qdrant_quantization: Literal["none", "scalar", "binary"] = Field(
+        default="none",
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_QUANTIZATION"),
+        description="Vector quantization kept in RAM: none, scalar (int8) or binary",
+    )
+    qdrant_oversampling: float = Field(
+        default=2.0,
+        ge=1.0,
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_OVERSAMPLING"),
+        description="Quantized candidates fetched per requested result",
+    )
+    qdrant_rescore: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_RESCORE"),
+        description="Re-rank quantized candidates with the original vectors",
+    )
+    qdrant_vectors_on_disk: bool | None = Field(
+        default=None,
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_VECTORS_ON_DISK"),
+        description="Keep original vectors on disk, memory-mapped (unset: Qdrant server default)",
+    )
+    qdrant_payload_on_disk: bool | None = Field(
+        default=None,
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_PAYLOAD_ON_DISK"),
+        description="Keep point payloads on disk instead of in RAM (unset: Qdrant server default)",
+    )
+    qdrant_hnsw_m: int = Field(
+        default=16,
+        ge=4,
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_HNSW_M"),
+        description="Edges per node of the HNSW graph",
+    )
+    qdrant_hnsw_ef_construct: int = Field(
+        default=100,
+        ge=4,
+        validation_alias=AliasChoices("WEBHOOK_QDRANT_HNSW_EF_CONSTRUCT"),
+        description="Candidate list size while building the HNSW graph",
+    )
+
     # HuggingFace Text Embeddings Inference
     tei_url: str = Field(
         default="http://localhost:52104",
         validation_alias=AliasChoices("WEBHOOK_TEI_URL", "SEARCH_BRIDGE_TEI_URL"),
-        description="TEI server URL",
+        description="TEI server URL, or comma-separated replica URLs to load-balance across",
     )
     tei_api_key: str | None = Field(
         default=None,
@@ -161,6 +201,75 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("WEBHOOK_EMBEDDING_MODEL", "SEARCH_BRIDGE_EMBEDDING_MODEL"),
         description="HuggingFace embedding model",
     )
+    tei_max_concurrent_requests: int = Field(
+        default=4,
+        ge=1,
+        validation_alias=AliasChoices("WEBHOOK_TEI_MAX_CONCURRENT_REQUESTS"),
+        description="Sub-batches in flight when a request is split to fit TEI's /info limits",
+    )
+    tei_eject_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        validation_alias=AliasChoices("WEBHOOK_TEI_EJECT_SECONDS"),
+        description="How long a failing TEI replica is kept out of rotation before a health probe",
+    )
+
+    # Content-addressed embedding cache (model + SHA-256 of chunk text)
+    embedding_cache_backend: Literal["none", "sqlite", "redis"] = Field(
+        default="sqlite",
+        validation_alias=AliasChoices("WEBHOOK_EMBEDDING_CACHE_BACKEND"),
+        description="Embedding cache backend: none, sqlite (per host) or redis (shared)",
+    )
+    embedding_cache_path: str = Field(
+        default="./data/embeddings/cache.sqlite3",
+        validation_alias=AliasChoices("WEBHOOK_EMBEDDING_CACHE_PATH"),
+        description="SQLite embedding cache file",
+    )
+    embedding_cache_max_entries: int = Field(
+        default=200_000,
+        ge=1,
+        validation_alias=AliasChoices("WEBHOOK_EMBEDDING_CACHE_MAX_ENTRIES"),
+        description="Cached vectors kept before least recently used are evicted",
+    )
+
+    # Query embedding cache (in process, optionally shared through Redis)
+    query_embedding_cache_size: int = Field(
+        default=1024,
+        ge=0,
+        validation_alias=AliasChoices("WEBHOOK_QUERY_EMBEDDING_CACHE_SIZE"),
+        description="Query embeddings kept in process (0 disables the cache)",
+    )
+    query_embedding_cache_ttl_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        validation_alias=AliasChoices("WEBHOOK_QUERY_EMBEDDING_CACHE_TTL_SECONDS"),
+        description="Seconds a cached query embedding is served before it is re-embedded",
+    )
+    query_embedding_cache_redis: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("WEBHOOK_QUERY_EMBEDDING_CACHE_REDIS"),
+        description="Share query embeddings between API processes through Redis",
+    )
+
+    # Coalesce concurrent embedding requests into larger TEI batches
+    embedding_micro_batch_wait_ms: float = Field(
+        default=5.0,
+        ge=0.0,
+        validation_alias=AliasChoices("WEBHOOK_EMBEDDING_MICRO_BATCH_WAIT_MS"),
+        description="Max time a partial embedding batch waits for more texts (0 disables)",
+    )
+    embedding_micro_batch_size: int = Field(
+        default=32,
+        ge=1,
+        validation_alias=AliasChoices("WEBHOOK_EMBEDDING_MICRO_BATCH_SIZE"),
+        description="Maximum texts per coalesced TEI request",
+    )
+    embedding_micro_batch_tokens: int = Field(
+        default=16384,
+        ge=1,
+        validation_alias=AliasChoices("WEBHOOK_EMBEDDING_MICRO_BATCH_TOKENS"),
+        description="Estimated token budget per coalesced TEI request",
+    )
 
     # Chunking Configuration (TOKEN-BASED!)
     max_chunk_tokens: int = Field(
@@ -176,6 +285,29 @@ class Settings(BaseSettings):
         description="Overlap between chunks in tokens",
     )
 
+    # Pool running cleaning and chunking off the event loop
+    chunking_pool_mode: Literal["inline", "thread", "process"] = Field(
+        default="thread",
+        validation_alias=AliasChoices("WEBHOOK_CHUNKING_POOL_MODE"),
+        description=(
+            "Where text is cleaned and chunked: inline (on the event loop), thread "
+            "(shared chunker) or process (one tokenizer per worker process)"
+        ),
+    )
+    chunking_pool_workers: int = Field(
+        default=4,
+        ge=1,
+        validation_alias=AliasChoices("WEBHOOK_CHUNKING_POOL_WORKERS"),
+        description="Threads or processes in the chunking pool",
+    )
+
+    # Skip documents whose cleaned content matches what was last indexed
+    skip_unchanged_documents: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("WEBHOOK_SKIP_UNCHANGED_DOCUMENTS"),
+        description="Skip re-indexing documents whose content hash is unchanged",
+    )
+
     # Search Configuration
     hybrid_alpha: float = Field(
         default=0.5,
@@ -210,6 +342,44 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("WEBHOOK_RRF_K", "SEARCH_BRIDGE_RRF_K"),
         description="RRF k constant (standard is 60)",
     )
+    hybrid_semantic_timeout_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        validation_alias=AliasChoices("WEBHOOK_HYBRID_SEMANTIC_TIMEOUT_SECONDS"),
+        description="Budget of the vector leg of hybrid search before BM25-only results are returned",
+    )
+    hybrid_keyword_timeout_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        validation_alias=AliasChoices("WEBHOOK_HYBRID_KEYWORD_TIMEOUT_SECONDS"),
+        description="Budget of the BM25 leg of hybrid search before vector-only results are returned",
+    )
+
+    # Totals of vector searches: none skips Qdrant's filtered count (total is a lower bound)
+    vector_count_mode: Literal["none", "approximate", "cached", "exact"] = Field(
+        default="none",
+        validation_alias=AliasChoices("WEBHOOK_VECTOR_COUNT_MODE"),
+        description="How vector search totals are counted: none, approximate, cached or exact",
+    )
+    vector_count_cache_ttl_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        validation_alias=AliasChoices("WEBHOOK_VECTOR_COUNT_CACHE_TTL_SECONDS"),
+        description="Seconds an exact total is reused per filter set in cached count mode",
+    )
+
+    # Shared cache of search results, invalidated whenever the index is written
+    search_result_cache_enabled: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("WEBHOOK_SEARCH_RESULT_CACHE_ENABLED"),
+        description="Serve identical searches from Redis until the index changes",
+    )
+    search_result_cache_ttl_seconds: int = Field(
+        default=3600,
+        gt=0,
+        validation_alias=AliasChoices("WEBHOOK_SEARCH_RESULT_CACHE_TTL_SECONDS"),
+        description="Expiry of cached search results, bounding memory held by superseded entries",
+    )
 
     # Worker Configuration
     enable_worker: bool = Field(
@@ -0,0 +1,126 @@
+"""
+Benchmark BM25 top-k latency on a synthetic corpus.
+
+Builds a Zipf-distributed corpus (default 1M documents), then compares
+MaxScore-pruned search against exhaustive scoring with exact totals, both
+unfiltered, with broad language and language + country filters, and with a
+narrow domain filter.
+
+Usage:
+    cd apps/webhook
+    uv run python scripts/bench_bm25.py --docs 1000000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from itertools import accumulate
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.logging import configure_logging  # noqa: E402
+
+# Loggers bind at import time, so quiet them before importing the engine
+configure_logging("WARNING")
+
+from services.bm25_engine import BM25Engine  # noqa: E402
+
+_LANGUAGES = ("en", "de", "fr", "es")
+_COUNTRIES = ("us", "gb", "de")
+
+_FILTERS: dict[str, dict[str, Any]] = {
+    "unfiltered": {},
+    "language": {"language": "en"},
+    "language+country": {"language": "en", "country": "us"},
+    "domain": {"domain": "site7.example.com"},
+}
+
+
+def _zipf_cum_weights(vocab_size: int, exponent: float) -> list[float]:
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(vocab_size)))
+
+
+def _documents(
+    count: int,
+    vocab: list[str],
+    cum_weights: list[float],
+    rng: random.Random,
+) -> Iterator[tuple[str, dict[str, str]]]:
+    for i in range(count):
+        length = rng.randint(50, 400)
+        text = " ".join(rng.choices(vocab, cum_weights=cum_weights, k=length))
+        metadata = {
+            "url": f"https://example.com/{i}",
+            "domain": f"site{i % 100}.example.com",
+            "language": rng.choices(_LANGUAGES, weights=(6, 2, 1, 1))[0],
+            "country": rng.choices(_COUNTRIES, weights=(5, 3, 2))[0],
+        }
+        yield text, metadata
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    cut = statistics.quantiles(ordered, n=100, method="inclusive")
+    return (
+        f"p50={cut[49] * 1000:.2f}ms p95={cut[94] * 1000:.2f}ms "
+        f"p99={cut[98] * 1000:.2f}ms max={ordered[-1] * 1000:.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--index-dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = [f"t{i}" for i in range(args.vocab)]
+    cum_weights = _zipf_cum_weights(args.vocab, 1.1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_path = (args.index_dir or Path(tmp)) / "index.pkl"
+        engine = BM25Engine(index_path=str(index_path), background_merge=False)
+
+        started = time.perf_counter()
+        documents = _documents(args.docs, vocab, cum_weights, rng)
+        remaining = args.docs
+        while remaining:
+            size = min(args.batch, remaining)
+            engine.index_documents([next(documents) for _ in range(size)])
+            remaining -= size
+        while engine.merge_segments():
+            pass
+        print(f"indexed {engine.get_document_count()} docs in {time.perf_counter() - started:.1f}s")
+
+        # Mix frequent and rare terms, two to four per query
+        queries = [
+            " ".join(
+                rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(1, 2))
+                + rng.sample(vocab, rng.randint(1, 2))
+            )
+            for _ in range(args.queries)
+        ]
+
+        for filter_label, filters in _FILTERS.items():
+            for label, exact_total in (("maxscore", False), ("exhaustive", True)):
+                samples = []
+                for query in queries:
+                    started = time.perf_counter()
+                    engine.search(query, limit=args.limit, exact_total=exact_total, **filters)
+                    samples.append(time.perf_counter() - started)
+                print(f"{filter_label:>16} {label:>10}: {_percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
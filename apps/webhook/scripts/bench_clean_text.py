@@ -0,0 +1,92 @@
+"""
+Benchmark clean_text against the original per-character implementation.
+
+Generates markdown-like pages (default 200 pages of about 40 KB, every
+tenth one sprinkled with control and zero-width characters), checks both
+implementations agree, and reports per-page cleaning time.
+
+Usage:
+    cd apps/webhook
+    uv run python scripts/bench_clean_text.py --pages 200 --page-kb 40
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.logging import configure_logging  # noqa: E402
+
+# Loggers bind at import time, so quiet them before importing the utilities
+configure_logging("WARNING")
+
+from utils.text_processing import clean_text  # noqa: E402
+
+_NOISE = ["\x00", "\x1b", "\x7f", "\xad", "\u200b", "\ufeff"]
+
+
+def _legacy_clean_text(text: str) -> str:
+    if not text:
+        return ""
+    text = " ".join(text.split())
+    text = "".join(char for char in text if char.isprintable() or char in "\n\t")
+    return text.strip()
+
+
+def _page(size: int, noisy: bool, rng: random.Random) -> str:
+    words = ["the", "search", "index", "vector", "データ", "über", "`code()`", "https://x.io/a"]
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choices(words, k=rng.randint(4, 16)))
+        if noisy and rng.random() < 0.2:
+            line += rng.choice(_NOISE)
+        line = rng.choice(["# ", "- ", "", "", "\t"]) + line
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def _time(fn: Callable[[str], str], pages: list[str]) -> list[float]:
+    samples = []
+    for page in pages:
+        started = time.perf_counter()
+        fn(page)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _summary(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    cut = statistics.quantiles(ordered, n=100, method="inclusive")
+    return (
+        f"mean={statistics.fmean(ordered) * 1000:.3f}ms p50={cut[49] * 1000:.3f}ms "
+        f"p99={cut[98] * 1000:.3f}ms max={ordered[-1] * 1000:.3f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-kb", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [_page(args.page_kb * 1024, i % 10 == 0, rng) for i in range(args.pages)]
+
+    for page in pages:
+        if clean_text(page) != _legacy_clean_text(page):
+            sys.exit("clean_text disagrees with the original implementation")
+
+    for label, fn in (("legacy", _legacy_clean_text), ("clean_text", clean_text)):
+        print(f"{label:>10}: {_summary(_time(fn, pages))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Rebuild the search indexes from the scraped_content table.
+
+Streams the latest stored version of every page, chunks it in a process
+pool, embeds it through TEI and loads it into a new Qdrant collection and
+BM25, then switches the collection alias. Progress is checkpointed after
+every page; running the command again after an interruption resumes it.
+
+Usage:
+    cd apps/webhook
+    uv run python scripts/rebuild_indexes.py --workers 8 --page-size 512
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from utils.logging import configure_logging  # noqa: E402
+
+# Loggers bind at import time, so configure them before importing the services
+configure_logging(settings.log_level)
+
+from services.index_rebuild import IndexRebuilder  # noqa: E402
+from services.service_pool import ServicePool  # noqa: E402
+
+
+async def _run(args: argparse.Namespace) -> None:
+    pool = ServicePool.get_instance()
+    rebuilder = IndexRebuilder(
+        text_chunker=pool.text_chunker,
+        embedding_service=pool.embedding_service,
+        vector_store=pool.vector_store,
+        bm25_engine=pool.bm25_engine,
+        index_generation=pool.index_generation,
+        workers=args.workers,
+        page_size=args.page_size,
+        upsert_concurrency=args.upsert_concurrency,
+    )
+    try:
+        summary = await rebuilder.run(
+            Path(args.checkpoint),
+            index_timeout=args.index_timeout,
+            drop_old=args.drop_old,
+        )
+    finally:
+        await pool.close()
+    print(json.dumps(summary, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Chunking processes (default: CPU count)"
+    )
+    parser.add_argument("--page-size", type=int, default=512)
+    parser.add_argument("--upsert-concurrency", type=int, default=4)
+    parser.add_argument(
+        "--checkpoint",
+        default="./data/rebuild/checkpoint.json",
+        help="Checkpoint file; an existing one is resumed",
+    )
+    parser.add_argument(
+        "--drop-old",
+        action="store_true",
+        help="Delete the previous collection after the switch instead of keeping it",
+    )
+    parser.add_argument(
+        "--index-timeout",
+        type=float,
+        default=3600.0,
+        help="Seconds to wait for the new collection to finish indexing",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
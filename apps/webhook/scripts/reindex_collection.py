@@ -0,0 +1,76 @@
+"""
+Blue/green reindex of the Qdrant collection.
+
+Builds a new collection with the current settings (embedding model, vector
+size, quantization and storage layout) from the points of the served one,
+then atomically switches the collection alias to it. Set the new values in
+the environment and point TEI at the new model before running.
+
+Usage:
+    cd apps/webhook
+    uv run python scripts/reindex_collection.py --batch-size 256 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from utils.logging import configure_logging  # noqa: E402
+
+# Loggers bind at import time, so configure them before importing the services
+configure_logging(settings.log_level)
+
+from services.collection_reindex import reindex_collection  # noqa: E402
+from services.service_pool import ServicePool  # noqa: E402
+
+
+async def _run(args: argparse.Namespace) -> None:
+    pool = ServicePool.get_instance()
+    try:
+        summary = await reindex_collection(
+            pool.vector_store,
+            pool.embedding_service,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            reuse_vectors=args.reuse_vectors,
+            drop_old=args.drop_old,
+            index_timeout=args.index_timeout,
+            index_generation=pool.index_generation,
+        )
+    finally:
+        await pool.close()
+    print(json.dumps(summary, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--reuse-vectors",
+        action="store_true",
+        help="Copy stored vectors instead of re-embedding (layout-only changes)",
+    )
+    parser.add_argument(
+        "--drop-old",
+        action="store_true",
+        help="Delete the previous collection after the switch instead of keeping it",
+    )
+    parser.add_argument(
+        "--index-timeout",
+        type=float,
+        default=3600.0,
+        help="Seconds to wait for the new collection to finish indexing",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
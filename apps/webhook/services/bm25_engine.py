@@ -2,32 +2,61 @@
 BM25 keyword search engine.
 
 Provides traditional keyword-based search using the BM25 algorithm.
-The index is persisted to disk as a pickle file.
 
-This implementation uses file locking (fcntl.flock on Unix) to ensure safe concurrent
-access by multiple workers:
-- Shared locks (LOCK_SH) are used for reading the index
-- Exclusive locks (LOCK_EX) are used for writing the index
+Scoring uses a native inverted index (term -> postings of document term
+frequencies, plus per-document lengths and a running total length for avgdl).
+Indexing a document only touches the postings of its own terms, and a query
+only scores documents that appear in the postings of the query terms, so the
+cost of both operations is independent of corpus size.
+
+Persistence is log-structured (see services.bm25_segments): every indexed
+document is appended as a small immutable segment file and published by
+atomically swapping a manifest. A background thread merges runs of small
+segments into larger ones. Indexing a page therefore writes kilobytes rather
+than the whole index. A legacy ``index.pkl`` pickle is migrated into a single
+segment on first load.
+
+Segments are flat binary arrays that are memory-mapped read-only, so the
+engine keeps no per-process copy of the corpus: all API processes and RQ
+workers share one page-cache copy of the index. Each process notices new
+segments from other processes with a single ``stat`` of the manifest before
+every operation and only maps the segments it has not seen yet.
+
+Metadata filters (domain, language, country, isMobile) are answered from
+per-segment filter postings built at index time. A filtered search
+intersects those sorted id lists first; selective filters drive scoring
+directly from the allowed ids, broad ones become a bitmap that rejects
+candidates before they are scored.
+
+This implementation uses file locking (fcntl.flock on Unix) to coordinate
+writers across worker processes:
+- An exclusive lock (LOCK_EX) is held only while the manifest is swapped
 - Non-blocking locks (LOCK_NB) with retry logic prevent deadlocks
 - A separate lock file (index.pkl.lock) coordinates access between processes
 
-The locking mechanism ensures that:
-- Multiple workers can safely read the index simultaneously
-- Only one worker can write at a time
-- Readers are blocked during writes to prevent reading stale/corrupted data
-- All locks are properly released even if exceptions occur
+Readers never take the lock: segments are immutable and the manifest is
+replaced atomically, so searching never blocks behind a writer.
 
 Note: File locking requires a POSIX environment. On Windows, consider using
 portalocker library or running in WSL/Docker.
 """
 
+import bisect
 import errno
+import heapq
+import math
+import os
 import pickle
+import threading
 import time
-from collections.abc import Iterator
+from array import array
+from collections import Counter
+from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import accumulate
 from pathlib import Path
-from typing import Any
+from typing import Any, overload
 
 # Unix-only file locking - Windows not supported
 try:
@@ -39,12 +68,149 @@ except ModuleNotFoundError as exc:
         "and modify the locking implementation."
     ) from exc
 
-from rank_bm25 import BM25Okapi
-
+from services.bm25_segments import (
+    KEY_FIELD,
+    MANIFEST_NAME,
+    Manifest,
+    Segment,
+    SegmentInfo,
+    delete_file,
+    delete_segment,
+    read_deletes,
+    read_manifest,
+    select_expunge,
+    select_merge,
+    write_deletes,
+    write_manifest,
+    write_segment,
+)
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Filters passing at most 1/N of a segment are intersected and their documents
+# scored directly; broader ones only mask MaxScore candidates, since walking
+# them would cost more than the postings pruning skips
+SELECTIVE_FILTER_FRACTION = 16
+
+
+@dataclass(frozen=True)
+class _TermCursor:
+    """A query term's postings slice within one segment."""
+
+    weight: float  # idf * query tf * (k1 + 1)
+    upper: float  # Upper bound of the term's score contribution in this segment
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class _LiveDocs:
+    """Tombstones of one segment, as loaded from its deletes sidecar."""
+
+    deletes: str  # Sidecar file name the bitmap was loaded from
+    bitmap: bytearray  # 1 for live local ids, 0 for tombstoned ones
+    deleted_count: int
+    deleted_length: int  # Tokens in tombstoned documents
+
+    @classmethod
+    def load(cls, index_dir: Path, info: SegmentInfo, segment: Segment) -> "_LiveDocs | None":
+        """Load a segment's tombstones, or None if it has none."""
+        if not info.deletes:
+            return None
+        deleted = read_deletes(index_dir, info)
+        bitmap = bytearray(b"\x01") * segment.doc_count
+        for local_id in deleted:
+            bitmap[local_id] = 0
+        return cls(
+            deletes=info.deletes,
+            bitmap=bitmap,
+            deleted_count=len(deleted),
+            deleted_length=sum(segment.doc_lengths[local_id] for local_id in deleted),
+        )
+
+
+@dataclass(frozen=True)
+class _IndexView:
+    """Immutable snapshot of the mapped segments making up the index."""
+
+    segments: tuple[Segment, ...] = ()
+    live: tuple[_LiveDocs | None, ...] = ()  # Tombstones per segment
+    bases: tuple[int, ...] = ()  # Global doc id of each segment's first document
+    doc_count: int = 0  # Including tombstoned documents (global id space)
+    total_length: int = 0
+    live_count: int = 0
+    live_length: int = 0
+    generation: int = 0
+    segment_names: frozenset[str] = field(default_factory=frozenset)
+
+    @classmethod
+    def build(
+        cls,
+        segments: list[Segment],
+        live: list[_LiveDocs | None],
+        generation: int,
+    ) -> "_IndexView":
+        """Compute global offsets and statistics for a list of segments."""
+        bases: list[int] = []
+        doc_count = 0
+        for segment in segments:
+            bases.append(doc_count)
+            doc_count += segment.doc_count
+
+        total_length = sum(segment.total_length for segment in segments)
+        tombstones = [docs for docs in live if docs is not None]
+        return cls(
+            segments=tuple(segments),
+            live=tuple(live),
+            bases=tuple(bases),
+            doc_count=doc_count,
+            total_length=total_length,
+            live_count=doc_count - sum(docs.deleted_count for docs in tombstones),
+            live_length=total_length - sum(docs.deleted_length for docs in tombstones),
+            generation=generation,
+            segment_names=frozenset(segment.name for segment in segments),
+        )
+
+    def locate(self, doc_id: int) -> tuple[Segment, int]:
+        """Map a global document id to (segment, local id)."""
+        if not 0 <= doc_id < self.doc_count:
+            raise IndexError(doc_id)
+        position = bisect.bisect_right(self.bases, doc_id) - 1
+        return self.segments[position], doc_id - self.bases[position]
+
+
+class _DocumentSequence(Sequence[Any]):
+    """
+    Lazy, read-only sequence of document texts or metadata.
+
+    Indexed by global document id, so tombstoned documents that have not been
+    compacted away yet are still included.
+    """
+
+    def __init__(self, view: _IndexView, field_name: str) -> None:
+        self._view = view
+        self._field = field_name
+
+    def __len__(self) -> int:
+        return self._view.doc_count
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Any]: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        segment, local_id = self._view.locate(index)
+        if self._field == "text":
+            return segment.text(local_id)
+        return segment.metadata(local_id)
+
 
 class BM25Engine:
     """BM25 keyword search engine with disk persistence."""
@@ -54,32 +220,49 @@ class BM25Engine:
         index_path: str = "./data/bm25/index.pkl",
         k1: float = 1.5,
         b: float = 0.75,
+        merge_factor: int = 10,
+        background_merge: bool = True,
+        max_deleted_ratio: float = 0.3,
     ) -> None:
         """
         Initialize BM25 engine.
 
         Args:
-            index_path: Path to persist the BM25 index
+            index_path: Path of the BM25 index. Segments are stored in a
+                directory next to it with the suffix stripped (index.pkl ->
+                index/); an existing pickle at this path is migrated.
             k1: BM25 k1 parameter (term frequency saturation)
             b: BM25 b parameter (length normalization)
+            merge_factor: Number of same-sized segments that triggers a merge
+            background_merge: Merge segments in a background thread after writes
+            max_deleted_ratio: Fraction of tombstoned documents at which a
+                segment is rewritten to drop them
         """
         self.index_path = Path(index_path)
+        self.index_dir = self.index_path.with_suffix("")
         self.lock_path = Path(f"{self.index_path}.lock")
         self.k1 = k1
         self.b = b
+        self.merge_factor = merge_factor
+        self.background_merge = background_merge
+        self.max_deleted_ratio = max_deleted_ratio
 
         # Lock configuration
         self.lock_timeout = 30.0  # Maximum seconds to wait for lock
         self.lock_retry_delay = 0.1  # Seconds between lock acquisition attempts
 
         # Ensure directory exists
-        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+        # Segments written but not yet published (e.g. after a lock timeout)
+        self._pending_segments: list[SegmentInfo] = []
+        self._merge_lock = threading.Lock()
+        self._merge_thread: threading.Thread | None = None
 
-        # In-memory structures
-        self.corpus: list[str] = []  # Original texts
-        self.tokenized_corpus: list[list[str]] = []  # Tokenized texts
-        self.metadata: list[dict[str, Any]] = []  # Document metadata (URL, title, etc.)
-        self.bm25: BM25Okapi | None = None
+        # Current snapshot of mapped segments, swapped atomically on refresh
+        self._view = _IndexView()
+        self._manifest_stamp: tuple[int, int, int] | None = None
+        self._refresh_lock = threading.Lock()
 
         # Load existing index if available
         try:
@@ -97,11 +280,21 @@ class BM25Engine:
             "BM25 engine initialized",
             index_path=str(self.index_path),
             lock_path=str(self.lock_path),
-            documents=len(self.corpus),
+            documents=self._view.live_count,
             k1=k1,
             b=b,
         )
 
+    @property
+    def corpus(self) -> Sequence[str]:
+        """Document texts, decoded lazily from the mapped segments."""
+        return _DocumentSequence(self._view, "text")
+
+    @property
+    def metadata(self) -> Sequence[dict[str, Any]]:
+        """Document metadata, decoded lazily from the mapped segments."""
+        return _DocumentSequence(self._view, "metadata")
+
     def _tokenize(self, text: str) -> list[str]:
         """
         Simple tokenization (split on whitespace and lowercase).
@@ -114,6 +307,24 @@ class BM25Engine:
         """
         return text.lower().split()
 
+    def _idf(self, doc_freq: int, doc_count: int) -> float:
+        """
+        Compute inverse document frequency for a term.
+
+        Uses the non-negative Okapi variant ``log(1 + (N - n + 0.5) / (n + 0.5))``
+        so that very common terms never contribute a negative score. Unlike
+        the classic formulation it does not depend on the average IDF of the
+        whole vocabulary, which would otherwise need recomputing on every insert.
+
+        Args:
+            doc_freq: Number of documents containing the term
+            doc_count: Number of documents in the index
+
+        Returns:
+            IDF weight
+        """
+        return math.log(1.0 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
     @contextmanager
     def _acquire_lock(self, exclusive: bool = False) -> Iterator[None]:
         """
@@ -187,63 +398,414 @@ class BM25Engine:
                     lock_file.close()
 
     def _load_index(self) -> None:
-        """Load index from disk if it exists with shared lock."""
-        if not self.index_path.exists():
+        """
+        Open the on-disk index, migrating a legacy pickle if present.
+
+        Opening maps each segment read-only; nothing is unpickled or rebuilt.
+        An index in an unsupported format is reported by ``_refresh`` and
+        served as empty.
+        """
+        if not (self.index_dir / MANIFEST_NAME).exists() and self.index_path.is_file():
+            self._migrate_legacy_pickle()
+
+        self._refresh(force=True)
+
+        if self._view.doc_count:
+            logger.info(
+                "BM25 index loaded",
+                documents=self._view.live_count,
+                segments=len(self._view.segments),
+                generation=self._view.generation,
+            )
+        else:
             logger.info("No existing BM25 index found")
+
+    def _refresh(self, force: bool = False) -> None:
+        """
+        Pick up segments published by this or other processes.
+
+        A single ``stat`` of the manifest detects changes (the manifest is
+        replaced, never modified, so its inode changes on every publish).
+        Already-mapped segments are reused; only new ones are opened. Readers
+        take no lock. If a concurrent merge removes a segment between reading
+        the manifest and mapping it, the manifest is simply read again.
+
+        Args:
+            force: Re-read the manifest even if it appears unchanged
+        """
+        try:
+            stat = (self.index_dir / MANIFEST_NAME).stat()
+        except FileNotFoundError:
             return
 
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if not force and stamp == self._manifest_stamp:
+            return
+
+        with self._refresh_lock:
+            if not force and stamp == self._manifest_stamp:
+                return
+
+            try:
+                view = self._view
+                current_live: dict[tuple[str, str | None], _LiveDocs] = {
+                    (segment.name, docs.deletes): docs
+                    for segment, docs in zip(view.segments, view.live)
+                    if docs is not None
+                }
+                for attempt in range(3):
+                    manifest = read_manifest(self.index_dir) or Manifest()
+                    try:
+                        segments = self._map_segments(manifest.segments)
+                        live = [
+                            current_live.get((info.name, info.deletes))
+                            or _LiveDocs.load(self.index_dir, info, segment)
+                            for info, segment in zip(manifest.segments, segments)
+                        ]
+                        break
+                    except FileNotFoundError:
+                        # Segment merged away (or tombstones replaced) under us - retry
+                        if attempt == 2:
+                            raise
+
+                self._view = _IndexView.build(segments, live, manifest.generation)
+                self._manifest_stamp = stamp
+
+            except ValueError as e:
+                # Manifest written by another format version: keep the current
+                # view, and do not retry until the manifest is replaced
+                self._manifest_stamp = stamp
+                logger.error(
+                    "BM25 index format unsupported, keyword search serves the last loaded index",
+                    index_dir=str(self.index_dir),
+                    error=str(e),
+                )
+            except Exception:
+                logger.exception("Failed to refresh BM25 index")
+
+    def _map_segments(self, infos: list[SegmentInfo]) -> list[Segment]:
+        """Map segment files, reusing the ones the current view already maps."""
+        current = {segment.name: segment for segment in self._view.segments}
+        return [current.get(info.name) or Segment(self.index_dir / info.name) for info in infos]
+
+    def _tombstone_replaced(self, manifest: Manifest, first_new: int) -> list[str]:
+        """
+        Tombstone documents superseded by the segments from ``first_new`` on.
+
+        Documents are keyed by canonical URL (falling back to URL). Within the
+        new segments the last version of each key wins; every older version,
+        in any segment, is tombstoned. Callers must hold the exclusive lock
+        and publish the manifest with its generation incremented.
+
+        Args:
+            manifest: Manifest already including the new segments (updated in place)
+            first_new: Position of the first new segment
+
+        Returns:
+            Tombstone sidecars made obsolete, to delete once published
+        """
+        segments = self._map_segments(manifest.segments)
+        deletes: dict[int, set[int]] = {}
+        replaced: set[str] = set()
+
+        for position in range(len(segments) - 1, first_new - 1, -1):
+            for key, local_ids in segments[position].document_keys():
+                dead = local_ids if key in replaced else local_ids[:-1]
+                replaced.add(key)
+                if dead:
+                    deletes.setdefault(position, set()).update(dead)
+
+        for position in range(first_new):
+            for key in replaced:
+                local_ids = segments[position].filter_postings(KEY_FIELD, key)
+                if local_ids:
+                    deletes.setdefault(position, set()).update(local_ids)
+
+        return self._apply_deletes(manifest, deletes)
+
+    def _apply_deletes(self, manifest: Manifest, deletes: dict[int, set[int]]) -> list[str]:
+        """
+        Merge new tombstones into the manifest's segments.
+
+        Args:
+            manifest: Manifest to update in place (generation not yet incremented)
+            deletes: Segment position -> local ids to tombstone
+
+        Returns:
+            Tombstone sidecars made obsolete, to delete once published
+        """
+        obsolete: list[str] = []
+        for position, dead in deletes.items():
+            info = manifest.segments[position]
+            existing = set(read_deletes(self.index_dir, info))
+            if dead <= existing:
+                continue
+
+            manifest.segments[position] = write_deletes(
+                self.index_dir, info, existing | dead, manifest.generation + 1
+            )
+            if info.deletes:
+                obsolete.append(info.deletes)
+        return obsolete
+
+    def _select_merge(self, segments: list[SegmentInfo]) -> tuple[int, int] | None:
+        """Pick the next merge: tiered merges first, then tombstone expunges."""
+        return select_merge(segments, self.merge_factor) or select_expunge(
+            segments, self.max_deleted_ratio
+        )
+
+    def _migrate_legacy_pickle(self) -> None:
+        """Convert a pre-segment ``index.pkl`` into a single segment."""
         try:
-            # Acquire shared lock for reading
-            with self._acquire_lock(exclusive=False):
+            with self._acquire_lock(exclusive=True):
+                # Another process may have migrated while we waited for the lock
+                if read_manifest(self.index_dir) is not None:
+                    return
+
                 with open(self.index_path, "rb") as f:
                     data = pickle.load(f)
 
-                self.corpus = data.get("corpus", [])
-                self.tokenized_corpus = data.get("tokenized_corpus", [])
-                self.metadata = data.get("metadata", [])
-
-                # Rebuild BM25 index
-                if self.tokenized_corpus:
-                    self.bm25 = BM25Okapi(self.tokenized_corpus, k1=self.k1, b=self.b)
+                documents = list(zip(data.get("corpus", []), data.get("metadata", [])))
+                manifest = Manifest()
+                if documents:
+                    manifest.segments.append(
+                        write_segment(self.index_dir, documents, self._tokenize)
+                    )
+                    # The pickle kept every crawl of a URL; only the latest stays live
+                    self._tombstone_replaced(manifest, 0)
+                    manifest.generation += 1
+                write_manifest(self.index_dir, manifest)
 
-                logger.info("BM25 index loaded", documents=len(self.corpus))
+                os.replace(self.index_path, f"{self.index_path}.migrated")
+                logger.info("Migrated legacy BM25 pickle to segments", documents=len(documents))
 
         except TimeoutError:
-            logger.exception("Timeout acquiring lock to load BM25 index")
-            # Re-raise to let caller handle - don't wipe existing index
+            logger.exception("Timeout acquiring lock to migrate BM25 index")
             raise
 
         except Exception:
-            logger.exception("Failed to load BM25 index")
-            # Reset to empty state only on other errors (corrupted file, etc.)
-            self.corpus = []
-            self.tokenized_corpus = []
-            self.metadata = []
-            self.bm25 = None
-
-    def _save_index(self) -> None:
-        """Save index to disk with exclusive lock."""
-        try:
-            # Acquire exclusive lock for writing
-            with self._acquire_lock(exclusive=True):
-                data = {
-                    "corpus": self.corpus,
-                    "tokenized_corpus": self.tokenized_corpus,
-                    "metadata": self.metadata,
-                }
+            logger.exception("Failed to migrate legacy BM25 index")
 
-                with open(self.index_path, "wb") as f:
-                    pickle.dump(data, f)
+    def _save_index(self, documents: list[tuple[str, dict[str, Any]]]) -> None:
+        """
+        Upsert documents into the on-disk index as a new segment.
 
-                logger.debug("BM25 index saved", documents=len(self.corpus))
+        The segment is written without holding the lock; the exclusive lock is
+        only held to tombstone older versions of the same documents and swap
+        the manifest, so lock hold time does not grow with index size.
+        Segments that could not be published because of a lock timeout are
+        retried on the next save.
+
+        Args:
+            documents: (text, metadata) pairs to persist
+        """
+        try:
+            self._pending_segments.append(write_segment(self.index_dir, documents, self._tokenize))
+        except Exception:
+            logger.exception("Failed to write BM25 segment")
+            return
+
+        try:
+            with self._acquire_lock(exclusive=True):
+                manifest = read_manifest(self.index_dir) or Manifest()
+                first_new = len(manifest.segments)
+                manifest.segments.extend(self._pending_segments)
+                obsolete = self._tombstone_replaced(manifest, first_new)
+                manifest.generation += 1
+                write_manifest(self.index_dir, manifest)
+
+                logger.debug(
+                    "BM25 segment published",
+                    segments=len(manifest.segments),
+                    published=len(self._pending_segments),
+                    generation=manifest.generation,
+                )
+                self._pending_segments = []
+
+            for name in obsolete:
+                delete_file(self.index_dir, name)
 
         except TimeoutError:
             logger.exception("Timeout acquiring lock to save BM25 index")
             # Timeout during save is non-fatal, just log it
-            # Index is still in memory and can be saved later
+            # Segment stays pending and is published on the next save
+            return
 
         except Exception:
             logger.exception("Failed to save BM25 index")
+            return
+
+        if self.background_merge and self._select_merge(manifest.segments):
+            self._schedule_merge()
+
+    def delete_document(self, canonical_url: str) -> int:
+        """
+        Tombstone every version of a document.
+
+        Deleted documents stop matching immediately and are physically
+        dropped when their segment is next merged.
+
+        Args:
+            canonical_url: Document key (canonical URL, or URL for documents
+                indexed without one)
+
+        Returns:
+            Number of document versions deleted
+
+        Raises:
+            TimeoutError: If the index lock cannot be acquired
+        """
+        with self._acquire_lock(exclusive=True):
+            manifest = read_manifest(self.index_dir)
+            if manifest is None:
+                return 0
+
+            deletes: dict[int, set[int]] = {}
+            for position, segment in enumerate(self._map_segments(manifest.segments)):
+                local_ids = segment.filter_postings(KEY_FIELD, canonical_url)
+                if local_ids:
+                    deletes[position] = set(local_ids)
+
+            live_before = manifest.live_count
+            obsolete = self._apply_deletes(manifest, deletes)
+            deleted = live_before - manifest.live_count
+            if deleted:
+                manifest.generation += 1
+                write_manifest(self.index_dir, manifest)
+
+        for name in obsolete:
+            delete_file(self.index_dir, name)
+
+        self._refresh()
+        logger.info("Deleted document from BM25", url=canonical_url, versions=deleted)
+
+        if deleted and self.background_merge and self._select_merge(manifest.segments):
+            self._schedule_merge()
+
+        return deleted
+
+    def _schedule_merge(self) -> None:
+        """Start a background merge unless one is already running."""
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return
+
+        self._merge_thread = threading.Thread(
+            target=self.merge_segments,
+            name="bm25-merge",
+            daemon=True,
+        )
+        self._merge_thread.start()
+
+    def merge_segments(self) -> int:
+        """
+        Compact runs of small segments into larger ones.
+
+        Only live documents are copied, so merging also drops tombstoned
+        documents; segments with too many tombstones are rewritten on their
+        own even when no tiered merge is due.
+
+        Merged segments are written without the lock. The manifest is then
+        swapped under the exclusive lock, but only if all source segments are
+        still present (another process may have merged them concurrently).
+        Documents tombstoned while the merge ran are carried over to the
+        merged segment, and the source files are deleted afterwards.
+
+        Returns:
+            Number of merges performed
+        """
+        if not self._merge_lock.acquire(blocking=False):
+            return 0
+
+        merges = 0
+        try:
+            while True:
+                manifest = read_manifest(self.index_dir)
+                if manifest is None:
+                    break
+
+                selection = self._select_merge(manifest.segments)
+                if selection is None:
+                    break
+
+                start, end = selection
+                sources = manifest.segments[start:end]
+                source_deletes = [set(read_deletes(self.index_dir, info)) for info in sources]
+                documents: list[tuple[str, dict[str, Any]]] = []
+                merged_ids: dict[tuple[int, int], int] = {}
+                for index, segment in enumerate(self._map_segments(sources)):
+                    for local_id in range(segment.doc_count):
+                        if local_id not in source_deletes[index]:
+                            merged_ids[index, local_id] = len(documents)
+                            documents.append((segment.text(local_id), segment.metadata(local_id)))
+
+                merged = None
+                if documents:
+                    merged = write_segment(self.index_dir, documents, self._tokenize)
+
+                with self._acquire_lock(exclusive=True):
+                    current = read_manifest(self.index_dir) or Manifest()
+                    names = [segment.name for segment in current.segments]
+                    source_names = [segment.name for segment in sources]
+                    try:
+                        position = names.index(source_names[0])
+                    except ValueError:
+                        position = -1
+
+                    if position < 0 or names[position : position + len(sources)] != source_names:
+                        # Lost a race with another merger - discard our output
+                        if merged is not None:
+                            delete_segment(self.index_dir, merged)
+                        continue
+
+                    # Carry over tombstones added while we were merging
+                    current_sources = current.segments[position : position + len(sources)]
+                    late_deletes = {
+                        merged_ids[index, local_id]
+                        for index, info in enumerate(current_sources)
+                        if info.deletes != sources[index].deletes
+                        for local_id in read_deletes(self.index_dir, info)
+                        if local_id not in source_deletes[index]
+                    }
+                    if merged is not None and late_deletes:
+                        merged = write_deletes(
+                            self.index_dir, merged, late_deletes, current.generation + 1
+                        )
+
+                    current.segments[position : position + len(sources)] = (
+                        [merged] if merged is not None else []
+                    )
+                    current.generation += 1
+                    write_manifest(self.index_dir, current)
+
+                for info in current_sources:
+                    delete_segment(self.index_dir, info)
+                for index, info in enumerate(sources):
+                    if info.deletes and info.deletes != current_sources[index].deletes:
+                        delete_file(self.index_dir, info.deletes)
+
+                merges += 1
+                logger.info(
+                    "Merged BM25 segments",
+                    sources=len(sources),
+                    documents=merged.live_count if merged is not None else 0,
+                    dropped=sum(info.doc_count for info in current_sources)
+                    - (merged.live_count if merged is not None else 0),
+                    segments=len(current.segments),
+                )
+
+        except TimeoutError:
+            logger.warning("Timeout acquiring lock to merge BM25 segments")
+
+        except Exception:
+            logger.exception("Failed to merge BM25 segments")
+
+        finally:
+            self._merge_lock.release()
+
+        if merges:
+            self._refresh()
+
+        return merges
 
     def index_document(
         self,
@@ -251,7 +813,11 @@ class BM25Engine:
         metadata: dict[str, Any],
     ) -> None:
         """
-        Index a single document.
+        Index a single document, replacing earlier versions of it.
+
+        Documents are keyed by ``metadata["canonical_url"]`` (falling back to
+        ``metadata["url"]``); re-indexing a key tombstones the previous
+        version, so re-crawls do not accumulate duplicates.
 
         Args:
             text: Document text (typically full markdown)
@@ -261,25 +827,43 @@ class BM25Engine:
             logger.warning("Empty text provided for BM25 indexing")
             return
 
-        # Tokenize
-        tokens = self._tokenize(text)
+        # Append to disk as a new segment, then map it
+        self._save_index([(text, metadata)])
+        self._refresh()
+
+        logger.info(
+            "Indexed document in BM25",
+            total_documents=self._view.live_count,
+            url=metadata.get("url", "unknown"),
+        )
+
+    def index_documents(self, documents: list[tuple[str, dict[str, Any]]]) -> int:
+        """
+        Index a batch of documents as a single segment.
 
-        # Add to corpus
-        self.corpus.append(text)
-        self.tokenized_corpus.append(tokens)
-        self.metadata.append(metadata)
+        Intended for bulk loads, where writing one segment per document would
+        only create merge work. Upserts like ``index_document``; within a
+        batch the last document for a key wins.
 
-        # Rebuild BM25 index
-        self.bm25 = BM25Okapi(self.tokenized_corpus, k1=self.k1, b=self.b)
+        Args:
+            documents: (text, metadata) pairs
 
-        # Save to disk
-        self._save_index()
+        Returns:
+            Number of documents indexed (empty texts are skipped)
+        """
+        batch = [(text, metadata) for text, metadata in documents if text and text.strip()]
+        if not batch:
+            return 0
+
+        self._save_index(batch)
+        self._refresh()
 
         logger.info(
-            "Indexed document in BM25",
-            total_documents=len(self.corpus),
-            url=metadata.get("url", "unknown"),
+            "Indexed document batch in BM25",
+            batch_size=len(batch),
+            total_documents=self._view.live_count,
         )
+        return len(batch)
 
     def search(
         self,
@@ -290,80 +874,463 @@ class BM25Engine:
         language: str | None = None,
         country: str | None = None,
         is_mobile: bool | None = None,
+        exact_total: bool = False,
     ) -> tuple[list[dict[str, Any]], int]:
         """
         Search documents using BM25.
 
+        Only documents containing at least one query term are matched. The top
+        ``offset + limit`` documents are found with MaxScore dynamic pruning:
+        per-term score upper bounds let the search skip documents that cannot
+        enter the top-k, so most postings are never scored.
+
+        Because pruned documents are never visited, the total match count is
+        estimated from document frequencies unless every match was scored or
+        ``exact_total`` is set, which scores all postings exhaustively.
+
         Args:
             query: Search query
             limit: Maximum results
+            offset: Zero-based pagination offset
             domain: Filter by domain
             language: Filter by language
             country: Filter by country
             is_mobile: Filter by mobile flag
+            exact_total: Count all matches exactly instead of estimating
 
         Returns:
             Tuple of (results, total_count)
         """
-        if not self.bm25 or not self.corpus:
+        self._refresh()
+        view = self._view
+
+        if not view.live_count:
             logger.warning("BM25 index is empty")
             return [], 0
 
-        # Tokenize query
-        query_tokens = self._tokenize(query)
-
-        # Get BM25 scores
-        scores = self.bm25.get_scores(query_tokens)
-
-        # Create (index, score) pairs
-        doc_scores = list(enumerate(scores))
-
-        # Apply filters
-        if any([domain, language, country, is_mobile is not None]):
-            filtered_scores = []
-            for idx, score in doc_scores:
-                meta = self.metadata[idx]
+        # Tokenize query (repeated query terms weigh proportionally more)
+        query_terms = Counter(self._tokenize(query))
+
+        # BM25 term score: weight * tf / (tf + c1 + c2 * doc_length).
+        # N and avgdl exclude tombstoned documents; document frequencies still
+        # count them until their segment is merged.
+        avgdl = view.live_length / view.live_count or 1.0
+        c1 = self.k1 * (1.0 - self.b)
+        c2 = self.k1 * self.b / avgdl
+
+        # Resolve postings per segment and global document frequency per term
+        doc_freqs: list[int] = []
+        segment_terms: list[list[_TermCursor]] = [[] for _ in view.segments]
+        for term, query_tf in query_terms.items():
+            lookups = [segment.lookup(term) for segment in view.segments]
+            doc_freq = sum(found[1] - found[0] for found in lookups if found)
+            if not doc_freq:
+                continue
+
+            doc_freqs.append(doc_freq)
+            weight = self._idf(min(doc_freq, view.live_count), view.live_count)
+            weight *= query_tf * (self.k1 + 1.0)
+            for terms, found in zip(segment_terms, lookups):
+                if found:
+                    start, end, max_tf, min_len = found
+                    upper = weight * max_tf / (max_tf + c1 + c2 * min_len)
+                    terms.append(_TermCursor(weight, upper, start, end))
+
+        # Look up each segment's filter postings. Selective filters are
+        # intersected into id lists; broad ones use the segment's cached
+        # filter bitmaps, so no query does work proportional to the corpus
+        filters = self._filter_terms(domain, language, country, is_mobile)
+        segment_filters = [self._filter_postings(segment, filters) for segment in view.segments]
+        selectivity = 1.0
+        if filters:
+            selectivity = (
+                sum(
+                    self._estimate_allowed(lists, segment.doc_count)
+                    for segment, lists in zip(view.segments, segment_filters)
+                )
+                / view.doc_count
+            )
 
-                # Check filters
-                if domain and meta.get("domain") != domain:
+        k = offset + limit
+
+        if exact_total:
+            bitmaps = [
+                self._segment_bitmap(segment, filters, live) if terms else None
+                for segment, terms, live in zip(view.segments, segment_terms, view.live)
+            ]
+            heap, matched = self._score_exhaustive(view, segment_terms, bitmaps, c1, c2, k)
+            total, total_exact = matched, True
+        else:
+            heap, matched = [], 0
+            for segment, base, terms, lists, live in zip(
+                view.segments, view.bases, segment_terms, segment_filters, view.live
+            ):
+                if not terms or (lists is not None and not lists[0]):
                     continue
-                if language and meta.get("language") != language:
+                if live is not None and live.deleted_count == segment.doc_count:
                     continue
-                if country and meta.get("country") != country:
-                    continue
-                if is_mobile is not None and meta.get("isMobile") != is_mobile:
-                    continue
-
-                filtered_scores.append((idx, score))
-
-            doc_scores = filtered_scores
-
-        # Sort by score (descending)
-        doc_scores.sort(key=lambda x: x[1], reverse=True)
 
-        # Take window respecting offset/limit
-        top_results = doc_scores[offset : offset + limit]
+                if (
+                    lists is not None
+                    and len(lists[0]) * SELECTIVE_FILTER_FRACTION <= segment.doc_count
+                    and len(lists[0]) * len(terms) < sum(term.end - term.start for term in terms)
+                ):
+                    # Selective filter: walk the allowed documents and probe postings
+                    allowed = self._allowed_documents(lists, live)
+                    matched += self._score_allowed(segment, base, terms, allowed, c1, c2, k, heap)
+                else:
+                    bitmap = self._segment_bitmap(segment, filters, live)
+                    matched += self._max_score(segment, base, terms, bitmap, c1, c2, k, heap)
+
+            # If the heap never filled, nothing was pruned and every match was counted
+            total_exact = len(heap) < k
+            if total_exact:
+                total = matched
+            else:
+                total = self._estimate_total(doc_freqs, view.live_count, selectivity, matched)
+
+        # Highest score first, ties broken by insertion order
+        top_results = sorted(heap, reverse=True)[offset : offset + limit]
 
         # Build result list
         results: list[dict[str, Any]] = []
-        for idx, score in top_results:
+        for score, negated_idx in top_results:
+            idx = -negated_idx
+            segment, local_id = view.locate(idx)
             results.append(
                 {
                     "index": idx,
                     "score": float(score),
-                    "text": self.corpus[idx],
-                    "metadata": self.metadata[idx],
+                    "text": segment.text(local_id),
+                    "metadata": segment.metadata(local_id),
                 }
             )
 
         logger.info(
             "BM25 search completed",
             query=query,
-            total_matches=len(doc_scores),
+            total_matches=total,
+            total_exact=total_exact,
+            scored=matched,
             returned=len(results),
         )
 
-        return results, len(doc_scores)
+        return results, total
+
+    @staticmethod
+    def _filter_terms(
+        domain: str | None,
+        language: str | None,
+        country: str | None,
+        is_mobile: bool | None,
+    ) -> list[tuple[str, Any]]:
+        """Collect the active search filters as (metadata field, value) pairs."""
+        filters: list[tuple[str, Any]] = [
+            (name, value)
+            for name, value in (("domain", domain), ("language", language), ("country", country))
+            if value
+        ]
+        if is_mobile is not None:
+            filters.append(("isMobile", is_mobile))
+        return filters
+
+    @staticmethod
+    def _filter_postings(
+        segment: Segment,
+        filters: list[tuple[str, Any]],
+    ) -> list[Sequence[int]] | None:
+        """Sorted local id lists of a segment's active filters, shortest first."""
+        if not filters:
+            return None
+        return sorted((segment.filter_postings(name, value) for name, value in filters), key=len)
+
+    @staticmethod
+    def _estimate_allowed(lists: list[Sequence[int]] | None, doc_count: int) -> float:
+        """Estimate how many documents of a segment pass its filters, assuming independence."""
+        if lists is None:
+            return doc_count
+        estimate = float(len(lists[0]))
+        for other in lists[1:]:
+            estimate *= len(other) / doc_count
+        return estimate
+
+    @staticmethod
+    def _allowed_documents(
+        lists: list[Sequence[int]],
+        live: _LiveDocs | None,
+    ) -> Sequence[int]:
+        """
+        Intersect a segment's filter postings and drop tombstoned documents.
+
+        Lists are intersected smallest first, probing the larger lists by
+        binary search, so cost is bounded by the most selective filter.
+
+        Args:
+            lists: Filter postings, shortest first
+            live: Tombstones of the segment, if any
+
+        Returns:
+            Sorted live local ids passing every filter
+        """
+        allowed: Sequence[int] = lists[0]
+        for other in lists[1:]:
+            if not allowed:
+                break
+            kept = array("I")
+            position, end = 0, len(other)
+            for local_id in allowed:
+                position = bisect.bisect_left(other, local_id, position, end)
+                if position < end and other[position] == local_id:
+                    kept.append(local_id)
+            allowed = kept
+
+        if live is not None and allowed:
+            bitmap = live.bitmap
+            allowed = array("I", [local_id for local_id in allowed if bitmap[local_id]])
+        return allowed
+
+    @staticmethod
+    def _segment_bitmap(
+        segment: Segment,
+        filters: list[tuple[str, Any]],
+        live: _LiveDocs | None,
+    ) -> bytes | bytearray | None:
+        """
+        Byte map of the local ids a search may return, or None if all may.
+
+        Combines the segment's cached filter bitmaps and its tombstones with
+        a single big-integer AND (the maps hold only 0 and 1 bytes).
+        """
+        bitmaps: list[bytes | bytearray] = [
+            segment.filter_bitmap(name, value) for name, value in filters
+        ]
+        if live is not None:
+            bitmaps.append(live.bitmap)
+        if len(bitmaps) <= 1:
+            return bitmaps[0] if bitmaps else None
+
+        combined = int.from_bytes(bitmaps[0], "little")
+        for other in bitmaps[1:]:
+            combined &= int.from_bytes(other, "little")
+        return combined.to_bytes(segment.doc_count, "little")
+
+    @staticmethod
+    def _push(heap: list[tuple[float, int]], k: int, score: float, global_id: int) -> None:
+        """Offer a document to the shared top-k min-heap of (score, -global_id)."""
+        entry = (score, -global_id)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    @staticmethod
+    def _max_score(
+        segment: Segment,
+        base: int,
+        terms: list["_TermCursor"],
+        allowed: bytes | bytearray | None,
+        c1: float,
+        c2: float,
+        k: int,
+        heap: list[tuple[float, int]],
+    ) -> int:
+        """
+        Document-at-a-time MaxScore over one segment.
+
+        Terms are ordered by upper bound. The longest prefix of low-bound
+        terms whose bounds sum to no more than the current top-k threshold is
+        "non-essential": a document matching only those terms cannot enter the
+        top-k, so candidates are generated from the essential terms alone and
+        non-essential postings are only probed (by binary search) while the
+        candidate can still beat the threshold. The threshold rises as the
+        shared min-heap fills, shrinking the essential set.
+
+        Args:
+            segment: Segment to score
+            base: Global id of the segment's first document
+            terms: Per-term cursors for this segment
+            allowed: Optional filter bitmap; candidates outside it are skipped unscored
+            c1: k1 * (1 - b)
+            c2: k1 * b / avgdl
+            k: Number of results to keep
+            heap: Shared top-k min-heap of (score, -global_id), updated in place
+
+        Returns:
+            Number of matching documents that reached the heap
+        """
+        terms = sorted(terms, key=lambda term: term.upper)
+        count = len(terms)
+        bounds = list(accumulate(term.upper for term in terms))
+        weights = [term.weight for term in terms]
+        positions = [term.start for term in terms]
+        ends = [term.end for term in terms]
+        doc_ids, tfs, doc_lengths = segment.doc_ids, segment.tfs, segment.doc_lengths
+
+        threshold = heap[0][0] if len(heap) >= k else 0.0
+        first = 0  # Index of the first essential term
+        while first < count and bounds[first] <= threshold:
+            first += 1
+
+        matched = 0
+        while first < count:
+            # Next candidate: smallest current document among essential cursors
+            candidate = -1
+            for i in range(first, count):
+                if positions[i] < ends[i]:
+                    doc_id = doc_ids[positions[i]]
+                    if candidate < 0 or doc_id < candidate:
+                        candidate = doc_id
+            if candidate < 0:
+                break
+
+            if allowed is not None and not allowed[candidate]:
+                for i in range(first, count):
+                    if positions[i] < ends[i] and doc_ids[positions[i]] == candidate:
+                        positions[i] += 1
+                continue
+
+            norm = c1 + c2 * doc_lengths[candidate]
+            score = 0.0
+            for i in range(first, count):
+                position = positions[i]
+                if position < ends[i] and doc_ids[position] == candidate:
+                    tf = tfs[position]
+                    score += weights[i] * tf / (tf + norm)
+                    positions[i] = position + 1
+
+            # Probe non-essential terms while the candidate can still qualify
+            for i in range(first - 1, -1, -1):
+                if score + bounds[i] <= threshold:
+                    break
+                position = bisect.bisect_left(doc_ids, candidate, positions[i], ends[i])
+                positions[i] = position
+                if position < ends[i] and doc_ids[position] == candidate:
+                    tf = tfs[position]
+                    score += weights[i] * tf / (tf + norm)
+
+            if score <= threshold:
+                continue
+
+            matched += 1
+            BM25Engine._push(heap, k, score, base + candidate)
+
+            if len(heap) >= k:
+                threshold = heap[0][0]
+                while first < count and bounds[first] <= threshold:
+                    first += 1
+
+        return matched
+
+    @staticmethod
+    def _score_allowed(
+        segment: Segment,
+        base: int,
+        terms: list["_TermCursor"],
+        allowed: Sequence[int],
+        c1: float,
+        c2: float,
+        k: int,
+        heap: list[tuple[float, int]],
+    ) -> int:
+        """
+        Score only the documents passing a selective filter.
+
+        Walks the sorted allowed ids and binary-searches each term's postings,
+        highest-bound term first, stopping once the remaining bounds cannot
+        lift the document past the top-k threshold.
+
+        Returns:
+            Number of matching documents that reached the heap
+        """
+        terms = sorted(terms, key=lambda term: term.upper, reverse=True)
+        remaining_bounds = list(accumulate(term.upper for term in reversed(terms)))[::-1]
+        positions = [term.start for term in terms]
+        doc_ids, tfs, doc_lengths = segment.doc_ids, segment.tfs, segment.doc_lengths
+
+        matched = 0
+        threshold = heap[0][0] if len(heap) >= k else 0.0
+        for local_id in allowed:
+            if remaining_bounds[0] <= threshold:
+                break
+
+            score = 0.0
+            for i, term in enumerate(terms):
+                if score + remaining_bounds[i] <= threshold:
+                    break
+                position = bisect.bisect_left(doc_ids, local_id, positions[i], term.end)
+                positions[i] = position
+                if position < term.end and doc_ids[position] == local_id:
+                    tf = tfs[position]
+                    score += term.weight * tf / (tf + c1 + c2 * doc_lengths[local_id])
+
+            if score <= threshold:
+                continue
+
+            matched += 1
+            BM25Engine._push(heap, k, score, base + local_id)
+            if len(heap) >= k:
+                threshold = heap[0][0]
+
+        return matched
+
+    @staticmethod
+    def _score_exhaustive(
+        view: _IndexView,
+        segment_terms: list[list["_TermCursor"]],
+        bitmaps: list[bytes | bytearray | None],
+        c1: float,
+        c2: float,
+        k: int,
+    ) -> tuple[list[tuple[float, int]], int]:
+        """
+        Term-at-a-time scoring of every posting (used for exact totals).
+
+        Returns:
+            (top-k heap of (score, -global_id), number of matching documents)
+        """
+        heap: list[tuple[float, int]] = []
+        matched = 0
+
+        for segment, base, terms, bitmap in zip(view.segments, view.bases, segment_terms, bitmaps):
+            scores: dict[int, float] = {}
+            doc_lengths = segment.doc_lengths
+            for term in terms:
+                for local_id, tf in zip(
+                    segment.doc_ids[term.start : term.end], segment.tfs[term.start : term.end]
+                ):
+                    if bitmap is not None and not bitmap[local_id]:
+                        continue
+                    norm = c1 + c2 * doc_lengths[local_id]
+                    scores[local_id] = scores.get(local_id, 0.0) + term.weight * tf / (tf + norm)
+
+            matched += len(scores)
+            for local_id, score in scores.items():
+                BM25Engine._push(heap, k, score, base + local_id)
+
+        return heap, matched
+
+    @staticmethod
+    def _estimate_total(
+        doc_freqs: list[int],
+        doc_count: int,
+        selectivity: float,
+        seen: int,
+    ) -> int:
+        """
+        Estimate how many documents match at least one query term.
+
+        Assumes terms occur independently: P(match) = 1 - prod(1 - df / N),
+        clamped to [max(df), sum(df)] and scaled by the filter selectivity
+        observed among scored documents.
+        """
+        if not doc_freqs:
+            return seen
+
+        miss = 1.0
+        for doc_freq in doc_freqs:
+            miss *= 1.0 - doc_freq / doc_count
+        union = min(max(doc_count * (1.0 - miss), max(doc_freqs)), sum(doc_freqs))
+        return max(seen, round(union * selectivity))
 
     def get_document_count(self) -> int:
         """
@@ -372,4 +1339,5 @@ class BM25Engine:
         Returns:
             Document count
         """
-        return len(self.corpus)
+        self._refresh()
+        return self._view.live_count
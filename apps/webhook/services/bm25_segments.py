@@ -0,0 +1,731 @@
+"""
+On-disk segment format for the BM25 index.
+
+The index is stored log-structured in a directory:
+
+    <index_dir>/
+        manifest.json        # list of live segments, swapped atomically
+        seg_<id>.bm25        # immutable binary segment files
+        seg_<id>.bm25.<gen>.del  # tombstoned local ids of a segment
+
+Each segment is a single file of flat little-endian arrays that is opened
+with ``mmap`` read-only and accessed through zero-copy ``memoryview`` casts.
+Every API process and RQ worker mapping the same segment shares one
+page-cache copy, and opening an index is an ``open()`` + ``mmap()`` per
+segment instead of an unpickle and rebuild into the Python heap.
+
+Segment layout (all offsets are byte offsets from the start of the file):
+
+    header              magic, counts, total token length
+    section table       (offset, length) per section below
+    term_offsets  u64   [terms + 1]  -> term_blob
+    term_blob     utf-8 terms sorted by their encoded bytes
+    post_offsets  u64   [terms + 1]  -> doc_ids / tfs
+    doc_ids       u32   [postings]   local document ids, ascending per term
+    tfs           u32   [postings]   term frequencies aligned with doc_ids
+    term_max_tf   u32   [terms]      highest term frequency in each postings list
+    term_min_len  u32   [terms]      shortest document in each postings list
+    doc_lengths   u32   [docs]       tokens per document
+    text_offsets  u64   [docs + 1]   -> text_blob
+    text_blob     utf-8 document texts
+    meta_offsets  u64   [docs + 1]   -> meta_blob
+    meta_blob     utf-8 JSON metadata per document
+    filter_key_offsets  u64 [keys + 1] -> filter_key_blob
+    filter_key_blob     "field\0<json value>" keys sorted by their bytes
+    filter_post_offsets u64 [keys + 1] -> filter_doc_ids
+    filter_doc_ids      u32 [entries]  local document ids, ascending per key
+
+``term_max_tf`` and ``term_min_len`` give a per-term, per-segment upper bound
+on the BM25 contribution of a term (the score grows with tf and shrinks with
+document length) without depending on the corpus-wide avgdl, so bounds stay
+valid as the index grows. Query evaluation uses them for MaxScore pruning.
+
+The filter sections are a second, much smaller inverted index over the
+metadata fields in ``FILTER_FIELDS``: each (field, value) pair maps to the
+sorted ids of the documents carrying it. Filtered searches intersect these
+lists instead of decoding each candidate's JSON metadata; broad filters are
+also expanded once per segment into a cached byte-per-document map, so that
+checking a candidate is a single index. The same dictionary
+also maps each document key (canonical URL, falling back to URL) to its ids,
+which is how upserts find the older versions of a document.
+
+Deletions never modify a segment. Tombstoned local ids are written to a
+small sorted u32 sidecar file, named after the segment and the manifest
+generation that introduced it, and referenced from the segment's manifest
+entry. Merges copy only live documents, so dead documents are physically
+dropped on compaction.
+
+Segments are written once to a temporary file and renamed into place, so a
+segment is either fully visible or not at all. The manifest is replaced with
+``os.replace`` which is atomic on POSIX, so a reader always sees a consistent
+list of segments without taking any lock.
+
+Merging concatenates a contiguous run of segments into a new segment and
+swaps the manifest to reference it in place of its sources. Document order is
+preserved, so the relative order of live documents is stable across merges.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 3
+SEGMENT_PREFIX = "seg_"
+SEGMENT_SUFFIX = ".bm25"
+
+FILTER_FIELDS = ("domain", "language", "country", "isMobile")
+
+# Filter bitmaps kept per mapped segment (each is one byte per document)
+FILTER_BITMAP_CACHE_SIZE = 16
+KEY_FIELD = "_key"  # Pseudo filter field holding each document's key
+DELETES_SUFFIX = ".del"
+
+_MAGIC = b"BM25SEG4"
+_HEADER = struct.Struct("<8sIIQQ")  # magic, doc_count, term_count, posting_count, total_length
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = (
+    "term_offsets",
+    "term_blob",
+    "post_offsets",
+    "doc_ids",
+    "tfs",
+    "term_max_tf",
+    "term_min_len",
+    "doc_lengths",
+    "text_offsets",
+    "text_blob",
+    "meta_offsets",
+    "meta_blob",
+    "filter_key_offsets",
+    "filter_key_blob",
+    "filter_post_offsets",
+    "filter_doc_ids",
+)
+
+if sys.byteorder != "little":  # pragma: no cover - all supported platforms are little-endian
+    raise RuntimeError("BM25 segments require a little-endian platform")
+
+
+@dataclass
+class SegmentInfo:
+    """Manifest entry describing one immutable segment."""
+
+    name: str
+    doc_count: int
+    size_bytes: int
+    deletes: str | None = None  # Tombstone sidecar file name
+    deleted_count: int = 0
+
+    @property
+    def live_count(self) -> int:
+        """Documents not tombstoned."""
+        return self.doc_count - self.deleted_count
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize for the manifest."""
+        data: dict[str, Any] = {
+            "name": self.name,
+            "doc_count": self.doc_count,
+            "size_bytes": self.size_bytes,
+        }
+        if self.deletes:
+            data["deletes"] = self.deletes
+            data["deleted_count"] = self.deleted_count
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SegmentInfo":
+        """Deserialize a manifest entry."""
+        return cls(
+            name=str(data["name"]),
+            doc_count=int(data["doc_count"]),
+            size_bytes=int(data.get("size_bytes", 0)),
+            deletes=data.get("deletes"),
+            deleted_count=int(data.get("deleted_count", 0)),
+        )
+
+
+@dataclass
+class Manifest:
+    """Ordered list of live segments plus a generation counter."""
+
+    generation: int = 0
+    segments: list[SegmentInfo] = field(default_factory=list)
+
+    @property
+    def doc_count(self) -> int:
+        """Total documents across all segments, including tombstoned ones."""
+        return sum(segment.doc_count for segment in self.segments)
+
+    @property
+    def live_count(self) -> int:
+        """Documents across all segments that are not tombstoned."""
+        return sum(segment.live_count for segment in self.segments)
+
+
+class Segment:
+    """Read-only, memory-mapped view of one segment file."""
+
+    def __init__(self, path: Path) -> None:
+        """
+        Map a segment file.
+
+        Args:
+            path: Segment file path
+
+        Raises:
+            FileNotFoundError: If the segment was removed (e.g. merged away)
+            ValueError: If the file is not a valid segment
+        """
+        self.path = path
+        self.name = path.name
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        magic, doc_count, term_count, posting_count, total_length = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a BM25 segment: {path}")
+
+        self.doc_count: int = doc_count
+        self.term_count: int = term_count
+        self.posting_count: int = posting_count
+        self.total_length: int = total_length
+
+        sections: dict[str, memoryview] = {}
+        for i, section in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+            sections[section] = view[offset : offset + length]
+
+        self._term_offsets = sections["term_offsets"].cast("Q")
+        self._term_blob = sections["term_blob"]
+        self._post_offsets = sections["post_offsets"].cast("Q")
+        self.doc_ids = sections["doc_ids"].cast("I")
+        self.tfs = sections["tfs"].cast("I")
+        self._term_max_tf = sections["term_max_tf"].cast("I")
+        self._term_min_len = sections["term_min_len"].cast("I")
+        self.doc_lengths = sections["doc_lengths"].cast("I")
+        self._text_offsets = sections["text_offsets"].cast("Q")
+        self._text_blob = sections["text_blob"]
+        self._meta_offsets = sections["meta_offsets"].cast("Q")
+        self._meta_blob = sections["meta_blob"]
+        self._filter_key_offsets = sections["filter_key_offsets"].cast("Q")
+        self._filter_key_blob = sections["filter_key_blob"]
+        self._filter_post_offsets = sections["filter_post_offsets"].cast("Q")
+        self._filter_doc_ids = sections["filter_doc_ids"].cast("I")
+        self.filter_key_count: int = len(self._filter_key_offsets) - 1
+
+        self._filter_bitmaps: dict[bytes | None, bytes] = {}
+        self._filter_bitmaps_lock = threading.Lock()
+
+    def _term_at(self, index: int) -> bytes:
+        return bytes(self._term_blob[self._term_offsets[index] : self._term_offsets[index + 1]])
+
+    def _filter_key_at(self, index: int) -> bytes:
+        start, end = self._filter_key_offsets[index], self._filter_key_offsets[index + 1]
+        return bytes(self._filter_key_blob[start:end])
+
+    def find_term(self, term: str) -> int | None:
+        """
+        Look up a term by binary search over the sorted term dictionary.
+
+        Args:
+            term: Token to look up
+
+        Returns:
+            Term ordinal within this segment, or None if absent
+        """
+        return _binary_search(self._term_at, self.term_count, term.encode("utf-8"))
+
+    def filter_postings(self, field: str, value: Any) -> memoryview:
+        """
+        Get the sorted local ids of documents whose metadata ``field`` equals ``value``.
+
+        Args:
+            field: One of ``FILTER_FIELDS``
+            value: Metadata value to match
+
+        Returns:
+            Zero-copy u32 view of matching local ids (empty if none match)
+        """
+        key = filter_key(field, value)
+        ordinal = None
+        if key is not None:
+            ordinal = _binary_search(self._filter_key_at, self.filter_key_count, key)
+        if ordinal is None:
+            return self._filter_doc_ids[0:0]
+        return self._filter_ids_at(ordinal)
+
+    def filter_bitmap(self, field: str, value: Any) -> bytes:
+        """
+        Get a map of the documents whose metadata ``field`` equals ``value``.
+
+        Segments are immutable, so the map is built from ``filter_postings``
+        on first use and cached for the life of the mapping (up to
+        ``FILTER_BITMAP_CACHE_SIZE`` maps, oldest dropped first).
+
+        Args:
+            field: One of ``FILTER_FIELDS``
+            value: Metadata value to match
+
+        Returns:
+            One byte per local id: 1 if the document matches, else 0
+        """
+        key = filter_key(field, value)
+        bitmap = self._filter_bitmaps.get(key)
+        if bitmap is not None:
+            return bitmap
+
+        built = bytearray(self.doc_count)
+        for local_id in self.filter_postings(field, value):
+            built[local_id] = 1
+        bitmap = bytes(built)
+
+        with self._filter_bitmaps_lock:
+            if len(self._filter_bitmaps) >= FILTER_BITMAP_CACHE_SIZE:
+                del self._filter_bitmaps[next(iter(self._filter_bitmaps))]
+            self._filter_bitmaps[key] = bitmap
+        return bitmap
+
+    def _filter_ids_at(self, ordinal: int) -> memoryview:
+        start, end = self._filter_post_offsets[ordinal], self._filter_post_offsets[ordinal + 1]
+        return self._filter_doc_ids[start:end]
+
+    def document_keys(self) -> Iterator[tuple[str, memoryview]]:
+        """
+        Iterate the document keys stored in this segment.
+
+        Yields:
+            (key, sorted local ids of the documents with that key)
+        """
+        prefix = f"{KEY_FIELD}\0".encode()
+        ordinal = _lower_bound(self._filter_key_at, self.filter_key_count, prefix)
+        while ordinal < self.filter_key_count:
+            key = self._filter_key_at(ordinal)
+            if not key.startswith(prefix):
+                break
+            yield json.loads(key[len(prefix) :]), self._filter_ids_at(ordinal)
+            ordinal += 1
+
+    def postings_range(self, term: str) -> tuple[int, int]:
+        """
+        Get the slice of ``doc_ids``/``tfs`` holding a term's postings.
+
+        Args:
+            term: Token to look up
+
+        Returns:
+            (start, end) indices; empty range if the term is absent
+        """
+        ordinal = self.find_term(term)
+        if ordinal is None:
+            return 0, 0
+        return self._post_offsets[ordinal], self._post_offsets[ordinal + 1]
+
+    def lookup(self, term: str) -> tuple[int, int, int, int] | None:
+        """
+        Get a term's postings slice together with its score-bound statistics.
+
+        Args:
+            term: Token to look up
+
+        Returns:
+            (start, end, max_tf, min_doc_length), or None if the term is absent
+        """
+        ordinal = self.find_term(term)
+        if ordinal is None:
+            return None
+        return (
+            self._post_offsets[ordinal],
+            self._post_offsets[ordinal + 1],
+            self._term_max_tf[ordinal],
+            self._term_min_len[ordinal],
+        )
+
+    def text(self, local_id: int) -> str:
+        """Decode the text of a document."""
+        start, end = self._text_offsets[local_id], self._text_offsets[local_id + 1]
+        return str(self._text_blob[start:end], "utf-8")
+
+    def metadata(self, local_id: int) -> dict[str, Any]:
+        """Decode the metadata of a document."""
+        start, end = self._meta_offsets[local_id], self._meta_offsets[local_id + 1]
+        result: dict[str, Any] = json.loads(self._meta_blob[start:end].tobytes())
+        return result
+
+    def documents(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Iterate all documents in insertion order.
+
+        Yields:
+            (text, metadata) pairs
+        """
+        for local_id in range(self.doc_count):
+            yield self.text(local_id), self.metadata(local_id)
+
+
+def _lower_bound(key_at: Callable[[int], bytes], count: int, key: bytes) -> int:
+    """Ordinal of the first of ``count`` sorted keys that is >= ``key``."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key_at(mid) < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _binary_search(key_at: Callable[[int], bytes], count: int, key: bytes) -> int | None:
+    """Find ``key`` among ``count`` sorted keys, returning its ordinal or None."""
+    ordinal = _lower_bound(key_at, count, key)
+    if ordinal < count and key_at(ordinal) == key:
+        return ordinal
+    return None
+
+
+def document_key(metadata: dict[str, Any]) -> str | None:
+    """
+    Identify the logical document a version belongs to.
+
+    Returns:
+        Canonical URL, falling back to URL; None if the document has neither
+    """
+    key = metadata.get("canonical_url") or metadata.get("url")
+    return str(key) if key else None
+
+
+def filter_key(field: str, value: Any) -> bytes | None:
+    """
+    Encode a (field, value) pair as a filter dictionary key.
+
+    Values are JSON-encoded so ``True`` and ``"true"`` stay distinct.
+
+    Returns:
+        Key bytes, or None for values that are not indexed (None, containers)
+    """
+    if value is None or not isinstance(value, str | bool | int | float):
+        return None
+    return f"{field}\0{json.dumps(value, ensure_ascii=False)}".encode()
+
+
+def _fsync_write(path: Path, chunks: list[bytes]) -> int:
+    """Write chunks to a temp file, fsync, and atomically rename into place."""
+    tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return size
+
+
+def read_manifest(index_dir: Path) -> Manifest | None:
+    """
+    Read the manifest from disk.
+
+    Args:
+        index_dir: Index directory
+
+    Returns:
+        Manifest, or None if the index has not been created yet
+
+    Raises:
+        ValueError: If the manifest was written in an unknown format version
+    """
+    path = index_dir / MANIFEST_NAME
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+    version = data.get("version")
+    if version != MANIFEST_VERSION:
+        raise ValueError(
+            f"Unsupported BM25 manifest version {version!r} in {path} "
+            f"(expected {MANIFEST_VERSION}); restore a version that reads it, or move the "
+            "index directory aside and rebuild the index"
+        )
+
+    return Manifest(
+        generation=int(data.get("generation", 0)),
+        segments=[SegmentInfo.from_dict(entry) for entry in data.get("segments", [])],
+    )
+
+
+def write_manifest(index_dir: Path, manifest: Manifest) -> None:
+    """
+    Atomically replace the manifest on disk.
+
+    Callers must hold the index write lock.
+
+    Args:
+        index_dir: Index directory
+        manifest: Manifest to persist
+    """
+    data = {
+        "version": MANIFEST_VERSION,
+        "generation": manifest.generation,
+        "segments": [segment.to_dict() for segment in manifest.segments],
+    }
+    _fsync_write(index_dir / MANIFEST_NAME, [json.dumps(data).encode("utf-8")])
+
+
+def _offsets(blobs: list[bytes]) -> array[int]:
+    offsets = array("Q", [0])
+    total = 0
+    for blob in blobs:
+        total += len(blob)
+        offsets.append(total)
+    return offsets
+
+
+def write_segment(
+    index_dir: Path,
+    documents: list[tuple[str, dict[str, Any]]],
+    tokenize: Callable[[str], list[str]],
+) -> SegmentInfo:
+    """
+    Write documents into a new immutable segment.
+
+    Segment names are random, so concurrent writers never collide and no
+    lock is needed until the segment is published in the manifest.
+
+    Args:
+        index_dir: Index directory
+        documents: (text, metadata) pairs
+        tokenize: Tokenizer used to build postings (must match the engine's)
+
+    Returns:
+        Manifest entry for the new segment
+    """
+    postings: dict[bytes, tuple[array[int], array[int]]] = {}
+    doc_lengths = array("I")
+    texts: list[bytes] = []
+    metas: list[bytes] = []
+    filters: dict[bytes, array[int]] = {}
+
+    for local_id, (text, metadata) in enumerate(documents):
+        tokens = tokenize(text)
+        doc_lengths.append(len(tokens))
+        texts.append(text.encode("utf-8"))
+        metas.append(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+
+        values = [(name, metadata.get(name)) for name in FILTER_FIELDS]
+        values.append((KEY_FIELD, document_key(metadata)))
+        for filter_field, value in values:
+            filter_posting_key = filter_key(filter_field, value)
+            if filter_posting_key is not None:
+                filters.setdefault(filter_posting_key, array("I")).append(local_id)
+
+        for token, tf in Counter(tokens).items():
+            term_key = token.encode("utf-8")
+            entry = postings.get(term_key)
+            if entry is None:
+                entry = postings[term_key] = (array("I"), array("I"))
+            entry[0].append(local_id)
+            entry[1].append(tf)
+
+    terms = sorted(postings)
+    post_offsets = array("Q", [0])
+    doc_ids = array("I")
+    tfs = array("I")
+    term_max_tf = array("I")
+    term_min_len = array("I")
+    for term in terms:
+        term_doc_ids, term_tfs = postings[term]
+        doc_ids.extend(term_doc_ids)
+        tfs.extend(term_tfs)
+        post_offsets.append(len(doc_ids))
+        term_max_tf.append(max(term_tfs))
+        term_min_len.append(min(doc_lengths[local_id] for local_id in term_doc_ids))
+
+    filter_keys = sorted(filters)
+    filter_post_offsets = array("Q", [0])
+    filter_doc_ids = array("I")
+    for filter_posting_key in filter_keys:
+        filter_doc_ids.extend(filters[filter_posting_key])
+        filter_post_offsets.append(len(filter_doc_ids))
+
+    section_data = [
+        _offsets(terms).tobytes(),
+        b"".join(terms),
+        post_offsets.tobytes(),
+        doc_ids.tobytes(),
+        tfs.tobytes(),
+        term_max_tf.tobytes(),
+        term_min_len.tobytes(),
+        doc_lengths.tobytes(),
+        _offsets(texts).tobytes(),
+        b"".join(texts),
+        _offsets(metas).tobytes(),
+        b"".join(metas),
+        _offsets(filter_keys).tobytes(),
+        b"".join(filter_keys),
+        filter_post_offsets.tobytes(),
+        filter_doc_ids.tobytes(),
+    ]
+
+    # Lay out sections after the header, each aligned to 8 bytes
+    offset = _HEADER.size + len(_SECTIONS) * _SECTION.size
+    table = bytearray()
+    body: list[bytes] = []
+    for data in section_data:
+        padding = -offset % 8
+        body.append(b"\0" * padding + data)
+        offset += padding
+        table += _SECTION.pack(offset, len(data))
+        offset += len(data)
+
+    header = _HEADER.pack(_MAGIC, len(documents), len(terms), len(doc_ids), sum(doc_lengths))
+
+    name = f"{SEGMENT_PREFIX}{uuid4().hex}{SEGMENT_SUFFIX}"
+    size = _fsync_write(index_dir / name, [header, bytes(table), *body])
+    return SegmentInfo(name=name, doc_count=len(documents), size_bytes=size)
+
+
+def read_deletes(index_dir: Path, segment: SegmentInfo) -> array[int]:
+    """
+    Read the tombstoned local ids of a segment.
+
+    Raises:
+        FileNotFoundError: If the sidecar was replaced by a newer one
+    """
+    deleted = array("I")
+    if segment.deletes:
+        with open(index_dir / segment.deletes, "rb") as f:
+            deleted.frombytes(f.read())
+    return deleted
+
+
+def write_deletes(
+    index_dir: Path,
+    segment: SegmentInfo,
+    deleted: set[int],
+    generation: int,
+) -> SegmentInfo:
+    """
+    Write a new tombstone sidecar for a segment.
+
+    Callers must hold the index write lock and publish the returned entry in
+    the manifest of ``generation``; the previous sidecar is then obsolete.
+
+    Args:
+        index_dir: Index directory
+        segment: Current manifest entry
+        deleted: Complete set of tombstoned local ids
+        generation: Manifest generation that will reference the sidecar
+
+    Returns:
+        Updated manifest entry
+    """
+    name = f"{segment.name}.{generation}{DELETES_SUFFIX}"
+    _fsync_write(index_dir / name, [array("I", sorted(deleted)).tobytes()])
+    return replace(segment, deletes=name, deleted_count=len(deleted))
+
+
+def delete_segment(index_dir: Path, segment: SegmentInfo) -> None:
+    """
+    Remove a segment file that is no longer referenced by the manifest.
+
+    Processes that still have the segment mapped keep reading it safely;
+    the file's pages are released once the last mapping is dropped.
+    """
+    for name in (segment.name, segment.deletes):
+        if name:
+            delete_file(index_dir, name)
+
+
+def delete_file(index_dir: Path, name: str) -> None:
+    """Remove an unreferenced index file, ignoring files already gone."""
+    try:
+        (index_dir / name).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def select_merge(segments: list[SegmentInfo], merge_factor: int) -> tuple[int, int] | None:
+    """
+    Pick a contiguous run of segments to merge (tiered merge policy).
+
+    Segments are bucketed into size tiers of ``merge_factor`` (1-9 docs,
+    10-99 docs, ... for a factor of 10). When the trailing run of segments
+    from the same tier reaches ``merge_factor`` entries, that run is merged.
+    This keeps the segment count logarithmic in the number of documents while
+    each document is rewritten only O(log N) times.
+
+    Args:
+        segments: Manifest segments in order
+        merge_factor: Number of same-tier segments that triggers a merge
+
+    Returns:
+        (start, end) slice of segments to merge, or None
+    """
+    if merge_factor < 2 or len(segments) < merge_factor:
+        return None
+
+    def tier(segment: SegmentInfo) -> int:
+        count, level = max(segment.doc_count, 1), 0
+        while count >= merge_factor:
+            count //= merge_factor
+            level += 1
+        return level
+
+    end = len(segments)
+    start = end - 1
+    last_tier = tier(segments[start])
+    while start > 0 and tier(segments[start - 1]) == last_tier:
+        start -= 1
+
+    if end - start >= merge_factor:
+        return start, end
+    return None
+
+
+def select_expunge(segments: list[SegmentInfo], max_deleted_ratio: float) -> tuple[int, int] | None:
+    """
+    Pick a single segment to rewrite because too much of it is tombstoned.
+
+    Tiered merging alone would leave large segments full of dead documents
+    until their tier fills up, so index size would track crawl count rather
+    than unique documents.
+
+    Args:
+        segments: Manifest segments in order
+        max_deleted_ratio: Fraction of tombstoned documents that triggers a rewrite
+
+    Returns:
+        (start, end) slice holding the most-deleted qualifying segment, or None
+    """
+    best: tuple[float, int] | None = None
+    for position, segment in enumerate(segments):
+        ratio = segment.deleted_count / max(segment.doc_count, 1)
+        if (
+            segment.deleted_count
+            and ratio >= max_deleted_ratio
+            and (best is None or ratio > best[0])
+        ):
+            best = (ratio, position)
+    if best is None:
+        return None
+    return best[1], best[1] + 1
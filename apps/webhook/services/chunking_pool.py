@@ -0,0 +1,246 @@
+"""
+Executor pool for text cleaning and chunking.
+
+Tokenizing a large page takes long enough to stall the event loop, and with
+it every TEI and Qdrant request in flight for the other documents of a
+batch. ``ChunkingPool`` runs that CPU work in a thread or process pool so it
+overlaps with the I/O:
+
+- ``inline`` runs on the event loop, as before the pool existed
+- ``thread`` shares the service's chunker between worker threads (the Rust
+  splitter is thread-safe)
+- ``process`` loads one chunker per worker process, for when the Python
+  parts of cleaning and chunking contend for the GIL
+
+Functions run through ``run`` receive the chunker of the worker they run on
+as their first argument. In process mode they must be importable module
+level functions, and their arguments and results are pickled.
+
+Indexing runs in the RQ workers, so their pools publish utilisation to
+Redis (one expiring key per worker process) for the metrics API to read.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Literal
+
+from redis import Redis
+
+from utils.logging import get_logger
+from utils.text_processing import TextChunker, clean_text
+
+logger = get_logger(__name__)
+
+ChunkingPoolMode = Literal["inline", "thread", "process"]
+
+# Published stats of a worker process's pool, dropped when it stops publishing
+STATS_KEY_PREFIX = "chunking_pool_stats:"
+STATS_TTL_SECONDS = 600
+
+# Chunker of a pool worker process, created once by _init_process
+_process_chunker: TextChunker | None = None
+
+
+def _init_process(model_name: str, max_tokens: int, overlap_tokens: int) -> None:
+    global _process_chunker
+    _process_chunker = TextChunker(
+        model_name=model_name, max_tokens=max_tokens, overlap_tokens=overlap_tokens
+    )
+
+
+def _with_process_chunker[T](fn: Callable[..., T], *args: Any) -> T:
+    assert _process_chunker is not None, "chunking worker not initialized"
+    return fn(_process_chunker, *args)
+
+
+def _timed[T](fn: Callable[..., T], *args: Any) -> tuple[T, float]:
+    """Run a call on a worker and measure the time it kept the worker busy."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _clean(text_chunker: TextChunker, text: str) -> str:
+    return clean_text(text)
+
+
+def _chunk(
+    text_chunker: TextChunker, text: str, metadata: dict[str, Any] | None
+) -> list[dict[str, Any]]:
+    return text_chunker.chunk_text(text, metadata=metadata)
+
+
+class ChunkingPool:
+    """Runs cleaning and chunking off the event loop and tracks utilisation."""
+
+    def __init__(
+        self,
+        text_chunker: TextChunker,
+        mode: ChunkingPoolMode = "thread",
+        workers: int = 4,
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Worker threads and processes start on first use.
+
+        Args:
+            text_chunker: Chunker used in-process, and whose settings worker
+                processes copy
+            mode: inline, thread or process
+            workers: Worker threads or processes (ignored inline)
+        """
+        self.text_chunker = text_chunker
+        self.mode = mode
+        self.workers = workers if mode != "inline" else 1
+
+        self._executor: Executor | None = None
+        if mode == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunking")
+        elif mode == "process":
+            # spawn: workers must not inherit the event loop or open connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process,
+                initargs=(
+                    text_chunker.model_name,
+                    text_chunker.max_tokens,
+                    text_chunker.overlap_tokens,
+                ),
+            )
+
+        self._started = time.monotonic()
+        self._active = 0
+        self._tasks = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+
+        logger.info("Chunking pool initialized", mode=mode, workers=self.workers)
+
+    async def clean(self, text: str) -> str:
+        """
+        Clean text for indexing on a pool worker.
+
+        Args:
+            text: Raw text
+
+        Returns:
+            Cleaned text
+        """
+        return await self.run(_clean, text)
+
+    async def chunk(
+        self, text: str, metadata: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Chunk text on a pool worker.
+
+        Args:
+            text: Cleaned text
+            metadata: Optional metadata attached to each chunk
+
+        Returns:
+            Chunk dictionaries, as returned by ``TextChunker.chunk_text``
+        """
+        return await self.run(_chunk, text, metadata)
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a function on a pool worker.
+
+        Args:
+            fn: Function called as ``fn(text_chunker, *args)``
+            *args: Further arguments
+
+        Returns:
+            The function's result
+        """
+        call: Callable[[], tuple[T, float]]
+        if isinstance(self._executor, ProcessPoolExecutor):
+            call = partial(_timed, _with_process_chunker, fn, *args)
+        else:
+            call = partial(_timed, fn, self.text_chunker, *args)
+
+        submitted = time.perf_counter()
+        self._active += 1
+        try:
+            if self._executor is None:
+                result, busy = call()
+            else:
+                loop = asyncio.get_running_loop()
+                result, busy = await loop.run_in_executor(self._executor, call)
+        finally:
+            self._active -= 1
+
+        self._tasks += 1
+        self._busy_seconds += busy
+        self._wait_seconds += max(0.0, time.perf_counter() - submitted - busy)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get utilisation counters.
+
+        Returns:
+            Counters since startup: tasks run, time workers were busy, time
+            tasks waited for a worker, and busy time as a fraction of the
+            workers' capacity
+        """
+        capacity = self.workers * (time.monotonic() - self._started)
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "active": self._active,
+            "queued": max(0, self._active - self.workers),
+            "tasks": self._tasks,
+            "busy_seconds": round(self._busy_seconds, 3),
+            "wait_seconds": round(self._wait_seconds, 3),
+            "utilization": self._busy_seconds / capacity if capacity > 0 else 0.0,
+        }
+
+    def publish_stats(self, redis: Redis) -> None:
+        """
+        Publish utilisation counters for the metrics API.
+
+        Args:
+            redis: Redis connection
+        """
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        redis.set(
+            f"{STATS_KEY_PREFIX}{worker}",
+            json.dumps({"worker": worker, "updated_at": time.time(), **self.stats()}),
+            ex=STATS_TTL_SECONDS,
+        )
+
+    def close(self) -> None:
+        """Stop the worker threads or processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("Chunking pool closed", **self.stats())
+
+
+def published_stats(redis: Redis) -> list[dict[str, Any]]:
+    """
+    Read the utilisation counters published by worker processes.
+
+    Args:
+        redis: Redis connection
+
+    Returns:
+        Counters of each worker process that published within
+        ``STATS_TTL_SECONDS``, ordered by worker
+    """
+    keys = sorted(redis.scan_iter(match=f"{STATS_KEY_PREFIX}*"))
+    if not keys:
+        return []
+    values = redis.mget(keys)
+    return [json.loads(value) for value in values if value is not None]
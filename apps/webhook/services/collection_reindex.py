@@ -0,0 +1,173 @@
+"""
+Blue/green reindex of the Qdrant collection.
+
+Changing the embedding model, vector size or collection layout must not
+touch the collection searches are served from. ``reindex_collection`` loads
+a shadow collection next to the live one, with HNSW indexing disabled so
+points upload at full speed, re-enables indexing once every point is in,
+waits for the optimizer, and then re-points the collection alias in one
+atomic update. Searches keep hitting the old collection until the switch.
+
+Chunks are re-embedded from the ``text`` stored in their payloads, so
+chunking parameter changes are not picked up. Documents indexed while the
+shadow loads only reach the old collection; pause the workers or re-index
+those documents after the switch.
+"""
+
+import asyncio
+from typing import Any
+
+import numpy as np
+from qdrant_client.models import PointStruct, Record
+
+from services.embedding import EmbeddingService
+from services.search_cache import IndexGeneration
+from services.vector_store import DEFAULT_INDEXING_THRESHOLD, VectorStore
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def reindex_collection(
+    vector_store: VectorStore,
+    embedding_service: EmbeddingService,
+    batch_size: int = 256,
+    concurrency: int = 4,
+    reuse_vectors: bool = False,
+    drop_old: bool = False,
+    index_timeout: float = 3600.0,
+    index_generation: IndexGeneration | None = None,
+) -> dict[str, Any]:
+    """
+    Rebuild the served collection into a new one and switch the alias to it.
+
+    Args:
+        vector_store: Vector store configured with the target layout and
+            vector size
+        embedding_service: Embedding service running the target model
+        batch_size: Points read, embedded and uploaded per batch
+        concurrency: Batches embedded and uploaded at once
+        reuse_vectors: Copy stored vectors instead of re-embedding (for
+            layout-only changes)
+        drop_old: Delete the previous collection after the switch instead
+            of keeping it for rollback
+        index_timeout: Seconds to wait for the shadow collection's indexing
+        index_generation: Optional index generation counter, bumped after
+            the switch so cached search results of the old collection are
+            invalidated
+
+    Returns:
+        Summary with the source and target collections and point counts
+
+    Raises:
+        ValueError: If there is no collection to reindex, or embeddings do
+            not match the configured vector size
+    """
+    source = await vector_store.resolve_collection()
+    if source is None:
+        raise ValueError(f"No collection or alias named {vector_store.collection_name}")
+
+    source_info = await vector_store.client.get_collection(source)
+    indexing_threshold = (
+        source_info.config.optimizer_config.indexing_threshold or DEFAULT_INDEXING_THRESHOLD
+    )
+
+    target = vector_store.new_collection_name()
+    await vector_store.create_collection(target, bulk_load=True)
+    logger.info(
+        "Reindex started",
+        source=source,
+        target=target,
+        points=source_info.points_count,
+        reuse_vectors=reuse_vectors,
+    )
+
+    semaphore = asyncio.Semaphore(concurrency)
+    copied = 0
+    skipped = 0
+
+    async def load(records: list[Record]) -> None:
+        nonlocal copied, skipped
+        try:
+            points = await _rebuild_points(
+                records, vector_store.vector_dim, embedding_service, reuse_vectors
+            )
+            if points:
+                await vector_store.client.upsert(collection_name=target, points=points, wait=True)
+            copied += len(points)
+            skipped += len(records) - len(points)
+        finally:
+            semaphore.release()
+
+    offset: Any = None
+    try:
+        async with asyncio.TaskGroup() as group:
+            while True:
+                await semaphore.acquire()
+                try:
+                    records, offset = await vector_store.client.scroll(
+                        collection_name=source,
+                        limit=batch_size,
+                        offset=offset,
+                        with_payload=True,
+                        with_vectors=reuse_vectors,
+                    )
+                except BaseException:
+                    semaphore.release()
+                    raise
+                group.create_task(load(records))
+                if offset is None:
+                    break
+    except BaseExceptionGroup as group_error:
+        # Surface the first failed batch; the shadow collection is left for inspection
+        raise group_error.exceptions[0] from None
+
+    logger.info("Reindex loaded", target=target, points=copied, skipped=skipped)
+
+    await vector_store.finish_bulk_load(
+        target, indexing_threshold=indexing_threshold, timeout=index_timeout
+    )
+    previous = await vector_store.switch_alias(target)
+    if index_generation is not None:
+        index_generation.bump()
+
+    if drop_old and previous is not None:
+        await vector_store.client.delete_collection(previous)
+        logger.info("Previous collection deleted", collection=previous)
+
+    return {
+        "source": source,
+        "target": target,
+        "points": copied,
+        "skipped": skipped,
+        "previous_kept": previous if not drop_old else None,
+    }
+
+
+async def _rebuild_points(
+    records: list[Record],
+    vector_dim: int,
+    embedding_service: EmbeddingService,
+    reuse_vectors: bool,
+) -> list[PointStruct]:
+    """Build the target points of one batch, skipping records without text."""
+    if reuse_vectors:
+        kept = [record for record in records if record.vector is not None]
+        vectors = np.asarray([record.vector for record in kept], dtype=np.float32)
+    else:
+        kept = [record for record in records if (record.payload or {}).get("text")]
+        if not kept:
+            return []
+        vectors = await embedding_service.embed_batch(
+            [record.payload["text"] for record in kept]  # type: ignore[index]
+        )
+
+    if len(kept) and vectors.shape != (len(kept), vector_dim):
+        raise ValueError(
+            f"Expected {len(kept)} vectors of dimension {vector_dim}, got {vectors.shape}"
+        )
+
+    return [
+        PointStruct(id=record.id, vector=vector.tolist(), payload=record.payload)
+        for record, vector in zip(kept, vectors)
+    ]
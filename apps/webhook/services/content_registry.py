@@ -0,0 +1,106 @@
+"""
+Registry of the content currently indexed for each document.
+
+Maps canonical URL to a SHA-256 over the cleaned markdown and document
+metadata that were last indexed successfully, so the indexing pipeline can
+skip re-chunking, re-embedding and re-upserting documents that have not
+changed.
+
+Entries live in a single Redis hash per index version. The version string
+covers everything that shapes the indexed output (collection, embedding
+model, chunking parameters, and the cleaning and chunking code itself), so
+changing any of them naturally invalidates the registry and forces a full
+re-index.
+"""
+
+from redis import Redis
+
+from config import Settings
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bump whenever cleaning, chunking or the chunk payload produce different output
+# for the same document, so documents indexed by older code are not skipped
+INDEX_PIPELINE_VERSION = 2
+
+
+def index_version(settings: Settings) -> str:
+    """
+    Build the index version the registry of a deployment is keyed by.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Version string covering the collection, embedding model, chunking
+        parameters and ``INDEX_PIPELINE_VERSION``
+    """
+    return (
+        f"{settings.qdrant_collection}:{settings.embedding_model}:"
+        f"{settings.max_chunk_tokens}:{settings.chunk_overlap_tokens}:"
+        f"v{INDEX_PIPELINE_VERSION}"
+    )
+
+
+class IndexedContentRegistry:
+    """Redis-backed canonical URL -> indexed content hash registry."""
+
+    def __init__(self, redis: Redis, index_version: str) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            redis: Redis connection
+            index_version: Identifies the index configuration the hashes belong to
+        """
+        self.redis = redis
+        self.key = f"indexed_content:{index_version}"
+
+    def get(self, canonical_url: str) -> str | None:
+        """
+        Get the content hash last indexed for a document.
+
+        Redis errors are logged and treated as a miss, so an unavailable
+        registry only costs a redundant re-index.
+
+        Args:
+            canonical_url: Canonical document URL
+
+        Returns:
+            Hex SHA-256 digest, or None if unknown
+        """
+        try:
+            value = self.redis.hget(self.key, canonical_url)
+        except Exception as e:
+            logger.warning("Content registry lookup failed", url=canonical_url, error=str(e))
+            return None
+
+        if isinstance(value, bytes):
+            return value.decode()
+        return value if isinstance(value, str) else None
+
+    def record(self, canonical_url: str, content_hash: str) -> None:
+        """
+        Record the content hash of a successfully indexed document.
+
+        Args:
+            canonical_url: Canonical document URL
+            content_hash: Hex SHA-256 digest of the indexed markdown and metadata
+        """
+        try:
+            self.redis.hset(self.key, canonical_url, content_hash)
+        except Exception as e:
+            logger.warning("Content registry update failed", url=canonical_url, error=str(e))
+
+    def forget(self, canonical_url: str) -> None:
+        """
+        Remove a document so its next indexing runs in full.
+
+        Args:
+            canonical_url: Canonical document URL
+        """
+        try:
+            self.redis.hdel(self.key, canonical_url)
+        except Exception as e:
+            logger.warning("Content registry delete failed", url=canonical_url, error=str(e))
@@ -17,6 +17,19 @@ from domain.models import ScrapedContent
 logger = logging.getLogger(__name__)
 
 
+def compute_content_hash(markdown: str) -> str:
+    """
+    Compute the deduplication hash of scraped markdown.
+
+    Args:
+        markdown: Markdown content
+
+    Returns:
+        Hex SHA-256 digest (stored as ``ScrapedContent.content_hash``)
+    """
+    return hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+
+
 async def store_scraped_content(
     session: AsyncSession,
     crawl_session_id: str,
@@ -47,7 +60,7 @@ async def store_scraped_content(
     metadata = document.get("metadata", {})
 
     # Compute content hash for deduplication
-    content_hash = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+    content_hash = compute_content_hash(markdown)
 
     # Use INSERT ... ON CONFLICT DO NOTHING with RETURNING
     # This is atomic and handles race conditions at database level
@@ -1,9 +1,14 @@
 """HuggingFace Text Embeddings Inference (TEI) client."""
 
+import asyncio
+import json
 import logging
-from typing import cast
+import warnings
+from typing import Any, cast
 
 import httpx
+import numpy as np
+import numpy.typing as npt
 from tenacity import (
     before_log,
     retry,
@@ -12,26 +17,168 @@ from tenacity import (
     wait_exponential,
 )
 
+from services.embedding_batcher import EmbeddingBatcher, estimate_tokens
+from services.embedding_cache import EmbeddingCache, text_hash
+from services.tei_endpoints import EndpointPool, TEIEndpoint, parse_endpoints
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# TEI's own defaults, used until /info reports the server's limits
+DEFAULT_MAX_CLIENT_BATCH_SIZE = 32
+DEFAULT_MAX_BATCH_TOKENS = 16384
+
+# Responses that take an endpoint out of rotation (overloaded or broken)
+EJECT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Health probes of ejected endpoints give up quickly
+PROBE_TIMEOUT_SECONDS = 2.0
+
+
+def split_batches(
+    texts: list[str],
+    max_batch_size: int,
+    max_batch_tokens: int,
+) -> list[list[str]]:
+    """
+    Split texts into consecutive sub-batches within TEI's request limits.
+
+    Args:
+        texts: Texts to split
+        max_batch_size: Maximum texts per sub-batch
+        max_batch_tokens: Estimated token budget per sub-batch; a single
+            text over the budget gets a sub-batch of its own
+
+    Returns:
+        Sub-batches, in order
+    """
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    tokens = 0
+    for text in texts:
+        text_tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_batch_size or tokens + text_tokens > max_batch_tokens):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += text_tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def decode_embeddings(body: bytes, count: int) -> npt.NDArray[np.float32]:
+    """
+    Decode a TEI ``/embed`` response body into a float32 matrix.
+
+    TEI answers with a JSON array of float arrays. With the brackets
+    stripped the body is a flat comma-separated list that NumPy parses
+    straight into a float32 buffer, without a Python float per value. The
+    fast path is only taken when the brackets show exactly ``count`` rows
+    of equal length; other bodies are decoded as JSON.
+
+    Args:
+        body: Raw response body
+        count: Number of embeddings requested
+
+    Returns:
+        Matrix of shape (count, dim)
+
+    Raises:
+        ValueError: If the body is not a rectangular array of ``count`` rows
+            of numbers
+    """
+    try:
+        flat_text = body.translate(None, b"[] \t\r\n").decode("ascii")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            flat = np.fromstring(flat_text, dtype=np.float32, sep=",")
+        # Every value must have parsed, into count rows of the same length
+        if (
+            count > 0
+            and body.count(b"[") == body.count(b"]") == count + 1
+            and flat.size == flat_text.count(",") + 1
+            and flat.size % count == 0
+        ):
+            dim = flat.size // count
+            chars = np.frombuffer(body, dtype=np.uint8)
+            row_ends = np.flatnonzero(chars == ord("]"))[:-1]
+            commas = np.flatnonzero(chars == ord(","))
+            # Values up to the end of row k: (k + 1) * dim for a rectangular body
+            values = np.searchsorted(commas, row_ends) + 1
+            if np.array_equal(values, dim * np.arange(1, count + 1)):
+                return flat.reshape(count, dim)
+    except (ValueError, DeprecationWarning):
+        pass
+
+    embeddings = np.asarray(json.loads(body), dtype=np.float32)
+    if embeddings.ndim != 2 or embeddings.shape[0] != count:
+        raise ValueError(f"Expected {count} embeddings, got an array of shape {embeddings.shape}")
+    return embeddings
+
+
+def _positive_int(info: object, key: str, default: int) -> int:
+    value = info.get(key) if isinstance(info, dict) else None
+    return value if isinstance(value, int) and value > 0 else default
+
 
 class EmbeddingService:
     """Client for HuggingFace Text Embeddings Inference API."""
 
-    def __init__(self, tei_url: str, api_key: str | None = None, timeout: float = 30.0) -> None:
+    def __init__(
+        self,
+        tei_url: str | list[str],
+        api_key: str | None = None,
+        timeout: float = 30.0,
+        cache: EmbeddingCache | None = None,
+        micro_batch_wait_ms: float = 0.0,
+        micro_batch_size: int = 32,
+        micro_batch_tokens: int = 16384,
+        max_concurrency: int = 4,
+        eject_seconds: float = 10.0,
+    ) -> None:
         """
         Initialize the embedding service.
 
         Args:
-            tei_url: TEI server URL (e.g., 'http://localhost:52104')
+            tei_url: TEI server URL (e.g., 'http://localhost:52104'), or several
+                replica URLs as a list or comma-separated string
             api_key: Optional API key for authentication
             timeout: Request timeout in seconds
+            cache: Optional embedding cache; batch texts found in it are not
+                sent to TEI
+            micro_batch_wait_ms: How long concurrent requests are held to be
+                coalesced into one TEI request (0 disables micro-batching)
+            micro_batch_size: Maximum texts per coalesced request
+            micro_batch_tokens: Estimated token budget per coalesced request
+            max_concurrency: Maximum sub-batches of one request in flight when
+                it is split to respect TEI's batch limits
+            eject_seconds: How long a failing replica is kept out of rotation
+                before it is probed via /health
         """
-        self.tei_url = tei_url.rstrip("/")
+        self.tei_urls = parse_endpoints(tei_url)
+        self._pool = EndpointPool(self.tei_urls, eject_seconds=eject_seconds)
+        self._probe_tasks: set[asyncio.Task[None]] = set()
         self.timeout = timeout
         self.api_key = api_key
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+
+        # (max_client_batch_size, max_batch_tokens), discovered from TEI /info.
+        # The lock makes concurrent first requests share one fetch; it is
+        # recreated per event loop since workers run each batch in asyncio.run()
+        self._batch_limits: tuple[int, int] | None = None
+        self._batch_limits_lock: asyncio.Lock | None = None
+        self._batch_limits_loop: asyncio.AbstractEventLoop | None = None
+
+        self._batcher: EmbeddingBatcher | None = None
+        if micro_batch_wait_ms > 0:
+            self._batcher = EmbeddingBatcher(
+                self._embed_texts,
+                max_batch_size=micro_batch_size,
+                max_batch_tokens=micro_batch_tokens,
+                max_wait_ms=micro_batch_wait_ms,
+            )
 
         # Build headers for lazy client creation
         self._headers = {}
@@ -43,8 +190,10 @@ class EmbeddingService:
 
         logger.info(
             "Embedding service initialized",
-            tei_url=self.tei_url,
+            tei_urls=self.tei_urls,
             has_api_key=bool(api_key),
+            cache=type(cache).__name__ if cache is not None else None,
+            micro_batch_wait_ms=micro_batch_wait_ms,
         )
 
     @property
@@ -70,20 +219,102 @@ class EmbeddingService:
 
     async def health_check(self) -> bool:
         """
-        Check if TEI server is healthy.
+        Check if TEI is healthy.
 
         Returns:
-            True if healthy, False otherwise
+            True if at least one TEI endpoint is healthy, False otherwise
         """
+        results = await asyncio.gather(*(self._check_endpoint(url) for url in self.tei_urls))
+        return any(results)
+
+    async def _check_endpoint(self, url: str, **kwargs: Any) -> bool:
+        """Check one TEI endpoint's /health."""
         try:
-            response = await self.client.get(f"{self.tei_url}/health")
+            response = await self.client.get(f"{url}/health", **kwargs)
             is_healthy = response.status_code == 200
-            logger.debug("TEI health check", healthy=is_healthy, status=response.status_code)
+            logger.debug(
+                "TEI health check", url=url, healthy=is_healthy, status=response.status_code
+            )
             return is_healthy
         except Exception as e:
-            logger.error("TEI health check failed", error=str(e))
+            logger.error("TEI health check failed", url=url, error=str(e))
             return False
 
+    async def _request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request to the TEI endpoint with the lowest expected wait.
+
+        Transport errors and overload/server-error responses eject the
+        endpoint from rotation until a /health probe succeeds.
+
+        Args:
+            method: HTTP method, 'get' or 'post'
+            path: Request path, e.g. '/embed'
+            **kwargs: Passed to the httpx request
+
+        Returns:
+            The response, whatever its status
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        self._start_probes()
+        endpoint = self._pool.select()
+        started = self._pool.begin(endpoint)
+        try:
+            response: httpx.Response = await getattr(self.client, method)(
+                f"{endpoint.url}{path}", **kwargs
+            )
+        except httpx.TransportError:
+            self._pool.failed(endpoint)
+            raise
+        except BaseException:
+            self._pool.release(endpoint)
+            raise
+
+        if response.status_code in EJECT_STATUS_CODES:
+            self._pool.failed(endpoint)
+        else:
+            self._pool.succeeded(endpoint, started)
+        return response
+
+    def _start_probes(self) -> None:
+        """Probe ejected endpoints whose cooldown expired, in the background."""
+        for endpoint in self._pool.due_for_probe():
+            task = asyncio.get_running_loop().create_task(self._probe(endpoint))
+            self._probe_tasks.add(task)
+            task.add_done_callback(self._probe_tasks.discard)
+
+    async def _probe(self, endpoint: TEIEndpoint) -> None:
+        """Return an ejected endpoint to rotation once its /health succeeds."""
+        if await self._check_endpoint(endpoint.url, timeout=PROBE_TIMEOUT_SECONDS):
+            self._pool.readmit(endpoint)
+
+    async def embed_single(self, text: str) -> list[float]:
+        """
+        Embed a single text with automatic retry on HTTP errors.
+
+        With micro-batching enabled the text joins the next coalesced batch.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+
+        Raises:
+            ValueError: If text is empty or TEI returns empty embedding
+            httpx.HTTPError: If request fails after 3 retry attempts
+        """
+        if not text or not text.strip():
+            error_msg = "Empty text provided for embedding"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        if self._batcher is not None:
+            return cast(list[float], (await self._batcher.submit([text]))[0].tolist())
+        return await self._embed_one(text)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -91,9 +322,9 @@ class EmbeddingService:
         before=before_log(logger, logging.WARNING),  # type: ignore[arg-type]
         reraise=True,
     )
-    async def embed_single(self, text: str) -> list[float]:
+    async def _embed_one(self, text: str) -> list[float]:
         """
-        Embed a single text with automatic retry on HTTP errors.
+        Send a single non-empty text to TEI with automatic retry on HTTP errors.
 
         Args:
             text: Text to embed
@@ -102,23 +333,15 @@ class EmbeddingService:
             Embedding vector
 
         Raises:
-            ValueError: If text is empty or TEI returns empty embedding
+            ValueError: If TEI returns empty embedding
             httpx.HTTPError: If request fails after 3 retry attempts
 
         Notes:
             Retries up to 3 times with exponential backoff (2-10 seconds)
             on HTTP errors. Logs a warning before each retry attempt.
         """
-        if not text or not text.strip():
-            error_msg = "Empty text provided for embedding"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-
         try:
-            response = await self.client.post(
-                f"{self.tei_url}/embed",
-                json={"inputs": text},
-            )
+            response = await self._request("post", "/embed", json={"inputs": text})
             response.raise_for_status()
 
             raw_result = cast(list[list[float]], response.json())
@@ -146,30 +369,24 @@ class EmbeddingService:
             )
             raise
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type(httpx.HTTPError),
-        before=before_log(logger, logging.WARNING),  # type: ignore[arg-type]
-        reraise=True,
-    )
-    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    async def embed_batch(self, texts: list[str]) -> npt.NDArray[np.float32]:
         """
-        Embed multiple texts in a batch with automatic retry on HTTP errors.
+        Embed multiple texts in a batch, serving repeated texts from the cache.
+
+        Only texts missing from the cache (deduplicated) are sent to TEI,
+        coalesced with concurrent callers when micro-batching is enabled;
+        results are merged back in input order and written to the cache.
 
         Args:
             texts: List of texts to embed
 
         Returns:
-            List of embedding vectors
+            Contiguous float32 matrix with one row per text (empty texts are
+            dropped)
 
         Raises:
             ValueError: If texts are empty or TEI returns empty embeddings
             httpx.HTTPError: If request fails after 3 retry attempts
-
-        Notes:
-            Retries up to 3 times with exponential backoff (2-10 seconds)
-            on HTTP errors. Logs a warning before each retry attempt.
         """
         if not texts:
             error_msg = "Empty text list provided for batch embedding"
@@ -183,24 +400,173 @@ class EmbeddingService:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+        if self.cache is None:
+            return await self._send(valid_texts)
+
+        hashes = [text_hash(text) for text in valid_texts]
+        cached = await asyncio.to_thread(self.cache.get_many, hashes)
+
+        misses = {key: text for key, text in zip(hashes, valid_texts) if key not in cached}
+        if misses:
+            embedded = await self._send(list(misses.values()))
+            if len(embedded) != len(misses):
+                error_msg = "TEI returned wrong number of embeddings for batch"
+                logger.error(error_msg, batch_size=len(misses), received=len(embedded))
+                raise ValueError(error_msg)
+            computed = dict(zip(misses, embedded))
+            await asyncio.to_thread(self.cache.put_many, computed)
+            cached = {**cached, **computed}
+
+        logger.debug(
+            "Embedding cache lookup",
+            batch_size=len(valid_texts),
+            hits=sum(1 for key in hashes if key not in misses),
+            misses=len(misses),
+        )
+
+        return np.stack([cached[key] for key in hashes])
+
+    async def _send(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """Embed texts through the micro-batcher when enabled, else directly."""
+        if self._batcher is not None:
+            return await self._batcher.submit(texts)
+        return await self._embed_texts(texts)
+
+    async def _embed_texts(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """
+        Send non-empty texts to TEI, split into sub-batches within its limits.
+
+        Sub-batches run with bounded concurrency and are retried
+        independently, so a failure never resends the whole request.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            Float32 matrix with one row per text, in order
+
+        Raises:
+            ValueError: If TEI returns empty embeddings
+            httpx.HTTPError: If a sub-batch fails after 3 retry attempts
+        """
+        max_batch_size, max_batch_tokens = await self._get_batch_limits()
+        batches = split_batches(texts, max_batch_size, max_batch_tokens)
+        if len(batches) == 1:
+            return await self._post_batch(batches[0])
+
+        logger.info(
+            "Splitting embedding request",
+            batch_size=len(texts),
+            sub_batches=len(batches),
+            max_client_batch_size=max_batch_size,
+            max_batch_tokens=max_batch_tokens,
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(batch: list[str]) -> npt.NDArray[np.float32]:
+            async with semaphore:
+                return await self._post_batch(batch)
+
+        tasks = [asyncio.ensure_future(run(batch)) for batch in batches]
         try:
-            response = await self.client.post(
-                f"{self.tei_url}/embed",
-                json={"inputs": valid_texts},
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return np.concatenate(results)
+
+    async def _get_batch_limits(self) -> tuple[int, int]:
+        """
+        Get TEI's request limits, fetching ``/info`` on first use.
+
+        Returns:
+            Tuple of (max_client_batch_size, max_batch_tokens); TEI defaults
+            until ``/info`` answers successfully
+        """
+        if self._batch_limits is not None:
+            return self._batch_limits
+
+        loop = asyncio.get_running_loop()
+        lock = self._batch_limits_lock
+        if lock is None or self._batch_limits_loop is not loop:
+            lock = self._batch_limits_lock = asyncio.Lock()
+            self._batch_limits_loop = loop
+
+        async with lock:
+            if self._batch_limits is not None:
+                return self._batch_limits
+
+            defaults = (DEFAULT_MAX_CLIENT_BATCH_SIZE, DEFAULT_MAX_BATCH_TOKENS)
+            try:
+                response = await self._request("get", "/info")
+            except httpx.HTTPError as e:
+                # Not cached, so the next request tries again
+                logger.warning("TEI /info unavailable, using default batch limits", error=str(e))
+                return defaults
+
+            if response.status_code != 200:
+                # Not cached either: a restarting or misrouted TEI must not pin the defaults
+                logger.warning(
+                    "TEI /info failed, using default batch limits",
+                    status_code=response.status_code,
+                )
+                return defaults
+
+            info = response.json()
+            self._batch_limits = (
+                _positive_int(info, "max_client_batch_size", defaults[0]),
+                _positive_int(info, "max_batch_tokens", defaults[1]),
+            )
+            logger.info(
+                "TEI batch limits",
+                max_client_batch_size=self._batch_limits[0],
+                max_batch_tokens=self._batch_limits[1],
             )
+            return self._batch_limits
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(httpx.HTTPError),
+        before=before_log(logger, logging.WARNING),  # type: ignore[arg-type]
+        reraise=True,
+    )
+    async def _post_batch(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """
+        Post one limit-compliant batch to TEI with automatic retry on HTTP errors.
+
+        Args:
+            texts: Non-empty texts to embed
+
+        Returns:
+            Float32 matrix with one row per text
+
+        Raises:
+            ValueError: If TEI returns empty embeddings
+            httpx.HTTPError: If request fails after 3 retry attempts
+
+        Notes:
+            Retries up to 3 times with exponential backoff (2-10 seconds)
+            on HTTP errors. Logs a warning before each retry attempt.
+        """
+        try:
+            response = await self._request("post", "/embed", json={"inputs": texts})
             response.raise_for_status()
 
-            embeddings = cast(list[list[float]], response.json())
+            embeddings = decode_embeddings(response.content, len(texts))
 
-            if not embeddings or any(not emb for emb in embeddings):
+            if embeddings.ndim != 2 or len(embeddings) != len(texts) or not embeddings.size:
                 error_msg = "TEI returned empty embeddings for batch"
-                logger.error(error_msg, batch_size=len(valid_texts))
+                logger.error(error_msg, batch_size=len(texts), shape=embeddings.shape)
                 raise ValueError(error_msg)
 
             logger.info(
                 "Generated batch embeddings",
-                batch_size=len(valid_texts),
-                embedding_dim=len(embeddings[0]),
+                batch_size=len(texts),
+                embedding_dim=embeddings.shape[1],
             )
 
             return embeddings
@@ -208,13 +574,13 @@ class EmbeddingService:
         except httpx.HTTPError as e:
             logger.error(
                 "Failed to generate batch embeddings",
-                batch_size=len(valid_texts),
+                batch_size=len(texts),
                 error=str(e),
                 status=e.response.status_code if hasattr(e, "response") else None,
             )
             raise
 
-    async def embed(self, text_or_texts: str | list[str]) -> list[float] | list[list[float]]:
+    async def embed(self, text_or_texts: str | list[str]) -> list[float] | npt.NDArray[np.float32]:
         """
         Embed text(s) - auto-detects single vs batch.
 
@@ -222,7 +588,7 @@ class EmbeddingService:
             text_or_texts: Single text string or list of texts
 
         Returns:
-            Single embedding vector or list of vectors
+            Single embedding vector or float32 matrix of vectors
         """
         if isinstance(text_or_texts, str):
             return await self.embed_single(text_or_texts)
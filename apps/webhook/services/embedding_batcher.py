@@ -0,0 +1,196 @@
+"""
+Dynamic micro-batching of embedding requests.
+
+Each indexing job embeds only its own document's chunks, so concurrent jobs
+send TEI many small requests. ``EmbeddingBatcher`` coalesces texts submitted
+by concurrent coroutines into requests bounded by a maximum batch size and a
+token budget, flushing as soon as a request is full or after a short
+deadline, and fans the resulting matrix back to each caller in order as
+row slices (views, not copies).
+
+State is kept per event loop, since the RQ worker runs each batch of jobs
+under its own ``asyncio.run()``.
+"""
+
+import asyncio
+import weakref
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+import numpy.typing as npt
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Roughly one token per four characters, at least one
+    """
+    return len(text) // 4 + 1
+
+
+@dataclass(slots=True)
+class _Request:
+    """Texts submitted by one caller and the future its vectors resolve."""
+
+    texts: list[str]
+    tokens: int
+    future: asyncio.Future[npt.NDArray[np.float32]]
+
+
+@dataclass(slots=True)
+class _LoopState:
+    """Pending requests and in-flight flushes of one event loop."""
+
+    pending: list[_Request] = field(default_factory=list)
+    pending_texts: int = 0
+    pending_tokens: int = 0
+    timer: asyncio.TimerHandle | None = None
+    tasks: set[asyncio.Task[None]] = field(default_factory=set)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into well-packed batches."""
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], Awaitable[npt.NDArray[np.float32]]],
+        max_batch_size: int = 32,
+        max_batch_tokens: int = 16384,
+        max_wait_ms: float = 5.0,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ) -> None:
+        """
+        Initialize the batcher.
+
+        Args:
+            embed: Coroutine embedding a list of texts into a float32 matrix,
+                one row per text
+            max_batch_size: Maximum texts per flushed request
+            max_batch_tokens: Token budget per flushed request
+            max_wait_ms: How long a partial batch waits for more texts
+            token_counter: Token count of a text, used against the budget
+        """
+        self._embed = embed
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait_ms / 1000
+        self._token_counter = token_counter
+        self._states: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def submit(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        """
+        Embed texts as part of the next flushed batch.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One row per text, in order, viewing the flushed batch's matrix
+
+        Raises:
+            Exception: Whatever the embed coroutine raised for the batch
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+
+        request = _Request(
+            texts=texts,
+            tokens=sum(self._token_counter(text) for text in texts),
+            future=loop.create_future(),
+        )
+        state.pending.append(request)
+        state.pending_texts += len(texts)
+        state.pending_tokens += request.tokens
+
+        if (
+            state.pending_texts >= self.max_batch_size
+            or state.pending_tokens >= self.max_batch_tokens
+        ):
+            self._flush(loop, state)
+        elif state.timer is None:
+            state.timer = loop.call_later(self.max_wait, self._flush, loop, state)
+
+        return await request.future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, state: _LoopState) -> None:
+        """Send all pending requests, packed into batches within the limits."""
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+        pending, state.pending = state.pending, []
+        state.pending_texts = state.pending_tokens = 0
+
+        batch: list[_Request] = []
+        texts = tokens = 0
+        for request in pending:
+            if request.future.done():  # caller cancelled while waiting
+                continue
+            # A request is never split; one over the limits is sent on its own
+            if batch and (
+                texts + len(request.texts) > self.max_batch_size
+                or tokens + request.tokens > self.max_batch_tokens
+            ):
+                self._start(loop, state, batch)
+                batch, texts, tokens = [], 0, 0
+            batch.append(request)
+            texts += len(request.texts)
+            tokens += request.tokens
+        if batch:
+            self._start(loop, state, batch)
+
+    def _start(
+        self, loop: asyncio.AbstractEventLoop, state: _LoopState, batch: list[_Request]
+    ) -> None:
+        task = loop.create_task(self._run(batch))
+        state.tasks.add(task)
+        task.add_done_callback(state.tasks.discard)
+
+    async def _run(self, batch: list[_Request]) -> None:
+        """Embed one batch and resolve its callers' futures."""
+        # Callers cancelled since the flush are not sent
+        batch = [request for request in batch if not request.future.done()]
+        if not batch:
+            return
+
+        texts = [text for request in batch for text in request.texts]
+        try:
+            vectors = await self._embed(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings for batch, got {len(vectors)}")
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        except BaseException:
+            # The flush was cancelled: cancel its callers instead of leaving
+            # them waiting for vectors that will never arrive
+            for request in batch:
+                request.future.cancel()
+            raise
+
+        logger.debug("Flushed embedding batch", requests=len(batch), texts=len(texts))
+
+        offset = 0
+        for request in batch:
+            if not request.future.done():  # caller may have been cancelled
+                request.future.set_result(vectors[offset : offset + len(request.texts)])
+            offset += len(request.texts)
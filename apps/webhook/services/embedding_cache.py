@@ -0,0 +1,337 @@
+"""
+Content-addressed cache of embedding vectors.
+
+Boilerplate chunks (navigation, footers, cookie banners) repeat across many
+pages of the same site, so vectors are cached by (model name, SHA-256 of the
+chunk text) and only cache misses are sent to TEI.
+
+Vectors are stored as packed little-endian float32, a quarter of the size of
+their JSON representation, and read back as NumPy views over the stored
+bytes. Two size-bounded LRU backends are provided:
+
+- ``SQLiteEmbeddingCache``: local file, shared by all workers on a host
+- ``RedisEmbeddingCache``: shared by all hosts using the same Redis
+
+Cache errors are logged and treated as misses, so an unavailable cache only
+costs redundant TEI requests.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Protocol, cast
+
+import numpy as np
+import numpy.typing as npt
+from redis import Redis
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash a text for cache lookup.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex SHA-256 digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def pack_vector(vector: npt.ArrayLike) -> bytes:
+    """
+    Pack a vector as little-endian float32.
+
+    Args:
+        vector: Embedding vector
+
+    Returns:
+        Packed bytes (4 bytes per dimension)
+    """
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def unpack_vector(data: bytes) -> npt.NDArray[np.float32]:
+    """
+    Unpack a vector packed by ``pack_vector``.
+
+    Args:
+        data: Packed bytes
+
+    Returns:
+        Read-only float32 embedding vector (a view over ``data`` on
+        little-endian hosts)
+    """
+    return np.frombuffer(data, dtype="<f4").astype(np.float32, copy=False)
+
+
+class EmbeddingCache(Protocol):
+    """Interface shared by the embedding cache backends."""
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """Return cached vectors by text hash, omitting misses."""
+        ...
+
+    def put_many(self, vectors: Mapping[str, npt.NDArray[np.float32]]) -> None:
+        """Store vectors by text hash."""
+        ...
+
+
+class SQLiteEmbeddingCache:
+    """Embedding cache in a local SQLite database with LRU eviction."""
+
+    def __init__(
+        self,
+        path: str,
+        model: str,
+        max_entries: int = 1_000_000,
+        evict_interval: int = 1000,
+    ) -> None:
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            path: Database file path
+            model: Embedding model name; entries of other models are never returned
+            max_entries: Entries kept across all models before the least
+                recently used are evicted
+            evict_interval: Vectors written between checks of the bound.
+                Counting entries scans the table, so the cache may exceed
+                ``max_entries`` by this much per process sharing the file
+        """
+        self.path = Path(path)
+        self.model = model
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """
+        Look up cached vectors and mark them as recently used.
+
+        Args:
+            hashes: Text hashes to look up
+
+        Returns:
+            Mapping of text hash to vector for the hits
+        """
+        keys = list(dict.fromkeys(hashes))
+        if not keys:
+            return {}
+
+        found: dict[str, npt.NDArray[np.float32]] = {}
+        try:
+            with self._lock:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    batch = keys[start : start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings "
+                        f"WHERE model = ? AND text_hash IN ({placeholders})",
+                        [self.model, *batch],
+                    ).fetchall()
+                    found.update((key, unpack_vector(blob)) for key, blob in rows)
+
+                if found:
+                    now = time.time()
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                        [(now, self.model, key) for key in found],
+                    )
+                    self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache lookup failed", path=str(self.path), error=str(e))
+            return {}
+
+        return found
+
+    def put_many(self, vectors: Mapping[str, npt.NDArray[np.float32]]) -> None:
+        """
+        Store vectors, evicting least recently used entries beyond the bound.
+
+        Args:
+            vectors: Mapping of text hash to vector
+        """
+        if not vectors:
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (self.model, key, pack_vector(vector), now)
+                        for key, vector in vectors.items()
+                    ],
+                )
+                self._writes_since_evict += len(vectors)
+                if self._writes_since_evict >= self.evict_interval:
+                    self._writes_since_evict = 0
+                    self._evict()
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache update failed", path=str(self.path), error=str(e))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries beyond the bound (caller holds the lock)."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+                "SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class RedisEmbeddingCache:
+    """Embedding cache in Redis with LRU eviction tracked in a sorted set."""
+
+    def __init__(self, redis: Redis, model: str, max_entries: int = 1_000_000) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            redis: Redis connection (binary responses, i.e. decode_responses=False)
+            model: Embedding model name; entries of other models are never returned
+            max_entries: Entries kept for this model before the least recently
+                used are evicted
+        """
+        self.redis = redis
+        self.model = model
+        self.max_entries = max_entries
+        self._prefix = f"embedding:{model}:"
+        self._lru_key = f"embedding_lru:{model}"
+
+    def get_many(self, hashes: Iterable[str]) -> dict[str, npt.NDArray[np.float32]]:
+        """
+        Look up cached vectors and mark them as recently used.
+
+        Args:
+            hashes: Text hashes to look up
+
+        Returns:
+            Mapping of text hash to vector for the hits
+        """
+        keys = list(dict.fromkeys(hashes))
+        if not keys:
+            return {}
+
+        try:
+            values = cast(list[bytes | None], self.redis.mget([self._prefix + key for key in keys]))
+            found = {
+                key: unpack_vector(value)
+                for key, value in zip(keys, values, strict=True)
+                if value is not None
+            }
+            if found:
+                now = time.time()
+                self.redis.zadd(self._lru_key, dict.fromkeys(found, now), xx=True)
+        except Exception as e:
+            logger.warning("Embedding cache lookup failed", error=str(e))
+            return {}
+
+        return found
+
+    def put_many(self, vectors: Mapping[str, npt.NDArray[np.float32]]) -> None:
+        """
+        Store vectors, evicting least recently used entries beyond the bound.
+
+        Args:
+            vectors: Mapping of text hash to vector
+        """
+        if not vectors:
+            return
+
+        try:
+            now = time.time()
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.mset({self._prefix + key: pack_vector(vector) for key, vector in vectors.items()})
+            pipe.zadd(self._lru_key, dict.fromkeys(vectors, now))
+            pipe.zcard(self._lru_key)
+            count = pipe.execute()[-1]
+
+            if count > self.max_entries:
+                evicted = cast(
+                    list[tuple[bytes | str, float]],
+                    self.redis.zpopmin(self._lru_key, count - self.max_entries),
+                )
+                if evicted:
+                    self.redis.delete(
+                        *(
+                            self._prefix + (key.decode() if isinstance(key, bytes) else key)
+                            for key, _ in evicted
+                        )
+                    )
+        except Exception as e:
+            logger.warning("Embedding cache update failed", error=str(e))
+
+
+def create_embedding_cache(
+    backend: str,
+    model: str,
+    path: str,
+    redis_url: str,
+    max_entries: int,
+) -> EmbeddingCache | None:
+    """
+    Create the configured embedding cache backend.
+
+    Args:
+        backend: "none", "sqlite" or "redis"
+        model: Embedding model name
+        path: SQLite database path
+        redis_url: Redis URL
+        max_entries: LRU bound
+
+    Returns:
+        Cache instance, or None when disabled or the backend is unavailable
+    """
+    try:
+        if backend == "sqlite":
+            return SQLiteEmbeddingCache(path=path, model=model, max_entries=max_entries)
+        if backend == "redis":
+            # Vectors are binary, so the connection must not decode responses
+            return RedisEmbeddingCache(
+                redis=Redis.from_url(redis_url), model=model, max_entries=max_entries
+            )
+    except Exception:
+        # Optional optimization - embed everything rather than fail startup
+        logger.exception("Embedding cache unavailable, all chunks will be sent to TEI")
+    return None
@@ -0,0 +1,408 @@
+"""
+Rebuild of the search indexes from stored scraped content.
+
+Every scraped page is kept in ``webhook.scraped_content``, so both indexes
+can be rebuilt without scraping again. ``IndexRebuilder`` streams the latest
+row of each URL through a server-side cursor, one page at a time:
+
+1. Clean and chunk the page's documents in a process pool (the tokenizer is
+   loaded once per worker process, see ``services.chunking_pool``)
+2. Embed all chunks of the page in one call, which TEI receives as large
+   batches split to its limits
+3. Upsert the points into a new Qdrant collection loaded with HNSW indexing
+   disabled, and write the documents to BM25 as a single segment
+
+Chunking of the next page overlaps loading of the current one. After each
+page the last row ID is written to a checkpoint file, so an interrupted
+rebuild resumes from where it stopped into the same collection. Once every
+page is loaded, indexing is re-enabled and the collection alias is switched
+as in a blue/green reindex (see ``services.collection_reindex``).
+
+BM25 is written in place: rebuilt documents replace their earlier versions,
+but documents whose rows were deleted from Postgres stay in BM25.
+
+Document metadata comes from the row's ``extra_metadata``. Rows written by
+``IndexingService`` record everything the indexed chunks carry; Firecrawl
+rows have no mobile flag, so documents rebuilt from them have none either.
+"""
+
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from qdrant_client.models import PointStruct
+from sqlalchemy import func, select
+
+from domain.models import ScrapedContent
+from infra.database import get_db_context
+from services.bm25_engine import BM25Engine
+from services.chunking_pool import ChunkingPool
+from services.content_storage import compute_content_hash
+from services.embedding import EmbeddingService
+from services.search_cache import IndexGeneration
+from services.vector_store import (
+    DEFAULT_INDEXING_THRESHOLD,
+    VectorStore,
+    chunk_payload,
+    chunk_point_id,
+)
+from utils.logging import get_logger
+from utils.text_processing import TextChunker, clean_text, extract_domain
+from utils.url import normalize_url
+
+logger = get_logger(__name__)
+
+# (id, url, markdown, metadata) of a scraped_content row
+ContentRow = tuple[int, str, str | None, dict[str, Any] | None]
+
+
+@dataclass
+class PreparedDocument:
+    """A cleaned and chunked document, ready to embed and index."""
+
+    url: str
+    text: str
+    metadata: dict[str, Any]
+    chunks: list[dict[str, Any]]
+
+
+@dataclass
+class RebuildCheckpoint:
+    """Progress of a rebuild, persisted after every page."""
+
+    target: str
+    indexing_threshold: int = DEFAULT_INDEXING_THRESHOLD
+    last_id: int = 0
+    documents: int = 0
+    chunks: int = 0
+    skipped: int = 0
+
+    @classmethod
+    def load(cls, path: Path) -> "RebuildCheckpoint | None":
+        """
+        Read a checkpoint.
+
+        Args:
+            path: Checkpoint file
+
+        Returns:
+            The checkpoint, or None if the file does not exist
+        """
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+    def save(self, path: Path) -> None:
+        """
+        Atomically replace the checkpoint file.
+
+        Args:
+            path: Checkpoint file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps(asdict(self)), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def prepare_document(row: ContentRow, text_chunker: TextChunker) -> PreparedDocument | None:
+    """
+    Clean and chunk a scraped_content row the way ``IndexingService`` does.
+
+    Args:
+        row: (id, url, markdown, metadata) of the row
+        text_chunker: Text chunker
+
+    Returns:
+        The prepared document, or None if nothing is left after cleaning
+    """
+    content_id, url, markdown, scrape_metadata = row
+    text = clean_text(markdown or "")
+    if not text:
+        return None
+
+    scrape_metadata = scrape_metadata or {}
+    metadata: dict[str, Any] = {
+        "url": url,
+        "canonical_url": normalize_url(url, remove_tracking=True),
+        "domain": extract_domain(url),
+        "title": scrape_metadata.get("title"),
+        "description": scrape_metadata.get("description"),
+        "language": scrape_metadata.get("language"),
+        "country": scrape_metadata.get("country"),
+    }
+    if "isMobile" in scrape_metadata:
+        metadata["isMobile"] = scrape_metadata["isMobile"]
+    metadata["content_id"] = content_id
+
+    chunks = text_chunker.chunk_text(text, metadata=metadata)
+    for chunk in chunks:
+        chunk["chunk_hash"] = compute_content_hash(chunk["text"])
+    return PreparedDocument(url=url, text=text, metadata=metadata, chunks=chunks)
+
+
+def _prepare_rows(
+    text_chunker: TextChunker, rows: list[ContentRow]
+) -> list[PreparedDocument | None]:
+    """Prepare a slice of rows on a pool worker; failed documents become None."""
+    prepared: list[PreparedDocument | None] = []
+    for row in rows:
+        try:
+            prepared.append(prepare_document(row, text_chunker))
+        except Exception as e:
+            logger.warning("Failed to prepare document", content_id=row[0], error=str(e))
+            prepared.append(None)
+    return prepared
+
+
+class IndexRebuilder:
+    """Rebuilds Qdrant and BM25 from the scraped_content table."""
+
+    def __init__(
+        self,
+        text_chunker: TextChunker,
+        embedding_service: EmbeddingService,
+        vector_store: VectorStore,
+        bm25_engine: BM25Engine,
+        index_generation: IndexGeneration | None = None,
+        workers: int | None = None,
+        page_size: int = 512,
+        upsert_batch_size: int = 256,
+        upsert_concurrency: int = 4,
+    ) -> None:
+        """
+        Initialize the rebuilder.
+
+        Args:
+            text_chunker: Text chunker whose settings the pool workers copy
+            embedding_service: Embedding service
+            vector_store: Vector store configured with the target layout
+            bm25_engine: BM25 engine
+            index_generation: Optional index generation counter, bumped after
+                every page so cached search results are invalidated
+            workers: Chunking processes (default: CPU count)
+            page_size: Rows fetched, chunked and embedded per page
+            upsert_batch_size: Points per Qdrant upsert request
+            upsert_concurrency: Upsert requests in flight at once
+        """
+        self.text_chunker = text_chunker
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.bm25_engine = bm25_engine
+        self.index_generation = index_generation
+        self.workers = workers or os.cpu_count() or 1
+        self.page_size = page_size
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_concurrency = upsert_concurrency
+
+    async def run(
+        self,
+        checkpoint_path: Path,
+        index_timeout: float = 3600.0,
+        drop_old: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Rebuild both indexes, resuming from the checkpoint if one exists.
+
+        Args:
+            checkpoint_path: Checkpoint file; removed once the rebuild completes
+            index_timeout: Seconds to wait for the new collection's indexing
+            drop_old: Delete the previous collection after the switch instead
+                of keeping it for rollback
+
+        Returns:
+            Summary with the collections and document, chunk and skip counts
+
+        Raises:
+            ValueError: If the checkpointed collection no longer exists, or
+                embeddings do not match the configured vector size
+        """
+        checkpoint = await self._start(checkpoint_path)
+
+        chunking_pool = ChunkingPool(self.text_chunker, mode="process", workers=self.workers)
+        pending: tuple[asyncio.Future[list[PreparedDocument | None]], int] | None = None
+        try:
+            async for rows in self._stream_rows(checkpoint.last_id):
+                # Chunk this page while the previous one is embedded and loaded
+                ready = pending
+                prepared = asyncio.ensure_future(self._prepare_page(chunking_pool, rows))
+                pending = (prepared, rows[-1][0])
+                if ready is not None:
+                    await self._load_page(checkpoint, checkpoint_path, *ready)
+            if pending is not None:
+                await self._load_page(checkpoint, checkpoint_path, *pending)
+                pending = None
+        finally:
+            if pending is not None:
+                pending[0].cancel()
+            chunking_pool.close()
+
+        logger.info(
+            "Index rebuild loaded",
+            target=checkpoint.target,
+            documents=checkpoint.documents,
+            chunks=checkpoint.chunks,
+            skipped=checkpoint.skipped,
+            chunking_utilization=chunking_pool.stats()["utilization"],
+        )
+
+        await self.vector_store.finish_bulk_load(
+            checkpoint.target,
+            indexing_threshold=checkpoint.indexing_threshold,
+            timeout=index_timeout,
+        )
+        previous = await self.vector_store.switch_alias(checkpoint.target)
+        if drop_old and previous is not None:
+            await self.vector_store.client.delete_collection(previous)
+            logger.info("Previous collection deleted", collection=previous)
+
+        # Compact the segments written page by page
+        merges = await asyncio.to_thread(self.bm25_engine.merge_segments)
+        if self.index_generation is not None:
+            self.index_generation.bump()
+        checkpoint_path.unlink(missing_ok=True)
+
+        logger.info("Index rebuild complete", target=checkpoint.target, bm25_merges=merges)
+        return {
+            "target": checkpoint.target,
+            "documents": checkpoint.documents,
+            "chunks": checkpoint.chunks,
+            "skipped": checkpoint.skipped,
+            "previous_kept": previous if not drop_old else None,
+        }
+
+    async def _start(self, checkpoint_path: Path) -> RebuildCheckpoint:
+        """Resume the checkpointed rebuild, or create the collection of a new one."""
+        checkpoint = RebuildCheckpoint.load(checkpoint_path)
+        if checkpoint is not None:
+            if not await self.vector_store.client.collection_exists(checkpoint.target):
+                raise ValueError(
+                    f"Checkpointed collection {checkpoint.target} does not exist; "
+                    f"remove {checkpoint_path} to start over"
+                )
+            logger.info(
+                "Resuming index rebuild",
+                target=checkpoint.target,
+                last_id=checkpoint.last_id,
+                documents=checkpoint.documents,
+            )
+            return checkpoint
+
+        indexing_threshold = DEFAULT_INDEXING_THRESHOLD
+        source = await self.vector_store.resolve_collection()
+        if source is not None:
+            source_info = await self.vector_store.client.get_collection(source)
+            indexing_threshold = (
+                source_info.config.optimizer_config.indexing_threshold or indexing_threshold
+            )
+
+        target = self.vector_store.new_collection_name()
+        await self.vector_store.create_collection(target, bulk_load=True)
+        checkpoint = RebuildCheckpoint(target=target, indexing_threshold=indexing_threshold)
+        checkpoint.save(checkpoint_path)
+        logger.info("Index rebuild started", source=source, target=target)
+        return checkpoint
+
+    async def _stream_rows(self, after_id: int) -> AsyncIterator[list[ContentRow]]:
+        """Yield pages of the latest row per URL with ID above ``after_id``, in ID order."""
+        latest = select(func.max(ScrapedContent.id)).group_by(ScrapedContent.url)
+        statement = (
+            select(
+                ScrapedContent.id,
+                ScrapedContent.url,
+                ScrapedContent.markdown,
+                ScrapedContent.extra_metadata,
+            )
+            .where(ScrapedContent.id > after_id, ScrapedContent.id.in_(latest))
+            .order_by(ScrapedContent.id)
+            .execution_options(yield_per=self.page_size)
+        )
+        async with get_db_context() as session:
+            result = await session.stream(statement)
+            async for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+
+    async def _prepare_page(
+        self, chunking_pool: ChunkingPool, rows: list[ContentRow]
+    ) -> list[PreparedDocument | None]:
+        """Spread a page over the pool, one slice per worker."""
+        slice_size = -(-len(rows) // self.workers)
+        slices = await asyncio.gather(
+            *(
+                chunking_pool.run(_prepare_rows, rows[start : start + slice_size])
+                for start in range(0, len(rows), slice_size)
+            )
+        )
+        return [document for prepared in slices for document in prepared]
+
+    async def _load_page(
+        self,
+        checkpoint: RebuildCheckpoint,
+        checkpoint_path: Path,
+        prepared_page: asyncio.Future[list[PreparedDocument | None]],
+        last_id: int,
+    ) -> None:
+        """Embed and index a prepared page, then advance the checkpoint past it."""
+        prepared = await prepared_page
+        documents = [document for document in prepared if document and document.chunks]
+
+        pairs = [(document, chunk) for document in documents for chunk in document.chunks]
+        texts = [chunk["text"] for _, chunk in pairs]
+        if texts:
+            vectors = await self.embedding_service.embed_batch(texts)
+            if vectors.shape != (len(texts), self.vector_store.vector_dim):
+                raise ValueError(
+                    f"Expected {len(texts)} vectors of dimension "
+                    f"{self.vector_store.vector_dim}, got {vectors.shape}"
+                )
+
+            points = [
+                PointStruct(
+                    id=chunk_point_id(document.metadata["canonical_url"], chunk["chunk_index"]),
+                    vector=vector.tolist(),
+                    payload=chunk_payload(chunk, document.url),
+                )
+                for (document, chunk), vector in zip(pairs, vectors)
+            ]
+            await self._upsert(checkpoint.target, points)
+
+        await asyncio.to_thread(
+            self.bm25_engine.index_documents,
+            [(document.text, document.metadata) for document in documents],
+        )
+
+        checkpoint.last_id = last_id
+        checkpoint.documents += len(documents)
+        checkpoint.chunks += len(texts)
+        checkpoint.skipped += len(prepared) - len(documents)
+        checkpoint.save(checkpoint_path)
+        if self.index_generation is not None:
+            self.index_generation.bump()
+
+        logger.info(
+            "Index rebuild page loaded",
+            last_id=last_id,
+            documents=checkpoint.documents,
+            chunks=checkpoint.chunks,
+        )
+
+    async def _upsert(self, target: str, points: list[PointStruct]) -> None:
+        """Upsert points in batches, a bounded number at a time."""
+        semaphore = asyncio.Semaphore(self.upsert_concurrency)
+
+        async def upsert(batch: list[PointStruct]) -> None:
+            async with semaphore:
+                await self.vector_store.client.upsert(
+                    collection_name=target, points=batch, wait=True
+                )
+
+        await asyncio.gather(
+            *(
+                upsert(points[start : start + self.upsert_batch_size])
+                for start in range(0, len(points), self.upsert_batch_size)
+            )
+        )
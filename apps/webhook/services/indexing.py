@@ -2,23 +2,32 @@
 Document indexing service.
 
 Orchestrates the complete indexing pipeline:
+0. Skip documents whose content and metadata are unchanged since last indexed
 1. Chunk document text (token-based)
-2. Generate embeddings via TEI
+2. Generate embeddings via TEI for new or changed chunks
 3. Index vectors in Qdrant
 4. Index full document in BM25
 """
 
+import asyncio
+import json
 import os
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
+
 from api.schemas.indexing import IndexDocumentRequest
 from infra.database import get_db_context
 from services.bm25_engine import BM25Engine
-from services.content_storage import store_scraped_content
+from services.chunking_pool import ChunkingPool
+from services.content_registry import IndexedContentRegistry
+from services.content_storage import compute_content_hash, store_scraped_content
 from services.embedding import EmbeddingService
+from services.search_cache import IndexGeneration
 from services.vector_store import VectorStore
 from utils.logging import get_logger
-from utils.text_processing import TextChunker, clean_text, extract_domain
+from utils.text_processing import TextChunker, extract_domain
 from utils.timing import TimingContext
 from utils.url import normalize_url
 
@@ -34,6 +43,9 @@ class IndexingService:
         embedding_service: EmbeddingService,
         vector_store: VectorStore,
         bm25_engine: BM25Engine,
+        content_registry: IndexedContentRegistry | None = None,
+        index_generation: IndexGeneration | None = None,
+        chunking_pool: ChunkingPool | None = None,
     ) -> None:
         """
         Initialize indexing service.
@@ -43,11 +55,20 @@ class IndexingService:
             embedding_service: Embedding service
             vector_store: Vector store
             bm25_engine: BM25 engine
+            content_registry: Optional registry of indexed content hashes;
+                when set, unchanged documents are skipped
+            index_generation: Optional index generation counter, bumped after
+                every write so cached search results are invalidated
+            chunking_pool: Optional pool cleaning and chunking off the event
+                loop; without one they run inline
         """
         self.text_chunker = text_chunker
         self.embedding_service = embedding_service
         self.vector_store = vector_store
         self.bm25_engine = bm25_engine
+        self.content_registry = content_registry
+        self.index_generation = index_generation
+        self.chunking_pool = chunking_pool or ChunkingPool(text_chunker, mode="inline")
 
         logger.info("Indexing service initialized")
 
@@ -66,7 +87,10 @@ class IndexingService:
             crawl_id: Optional crawl ID for lifecycle correlation
 
         Returns:
-            Indexing result with statistics
+            Indexing result with statistics. Documents whose cleaned content
+            and metadata are identical to the last indexed version are stored
+            for the crawl but not re-indexed, and return with
+            ``status="skipped_unchanged"`` and ``chunks_indexed=0``.
         """
         logger.info(
             "Starting document indexing",
@@ -77,7 +101,7 @@ class IndexingService:
         )
 
         # Clean markdown text
-        cleaned_markdown = clean_text(document.markdown)
+        cleaned_markdown = await self.chunking_pool.clean(document.markdown)
 
         if not cleaned_markdown:
             logger.warning("Document has no content after cleaning", url=document.url)
@@ -117,7 +141,16 @@ class IndexingService:
                         document={
                             "markdown": cleaned_markdown,
                             "html": document.html,
-                            "metadata": {"sourceURL": document.resolved_url or document.url},
+                            # The document metadata the chunks carry, so a rebuild
+                            # from this row reproduces the indexed payloads
+                            "metadata": {
+                                "sourceURL": document.resolved_url or document.url,
+                                "title": document.title,
+                                "description": document.description,
+                                "language": document.language,
+                                "country": document.country,
+                                "isMobile": document.is_mobile,
+                            },
                         },
                         content_source="search_index",
                     )
@@ -135,6 +168,26 @@ class IndexingService:
                     error_type=type(e).__name__,
                 )
 
+        # Step 0: Skip indexing when neither content nor metadata changed since
+        # the last successful run (the content is still stored for this crawl)
+        content_hash = self._index_hash(cleaned_markdown, chunk_metadata)
+        if self.content_registry is not None and (
+            await asyncio.to_thread(self.content_registry.get, canonical_url) == content_hash
+        ):
+            logger.info(
+                "Skipping unchanged document",
+                url=document.url,
+                canonical_url=canonical_url,
+                content_hash=content_hash,
+            )
+            return {
+                "success": True,
+                "status": "skipped_unchanged",
+                "url": document.url,
+                "chunks_indexed": 0,
+                "total_tokens": 0,
+            }
+
         # Step 1: Chunk text (token-based)
         try:
             async with TimingContext(
@@ -145,7 +198,7 @@ class IndexingService:
                 document_url=document.url,
                 request_id=None,  # Worker operations have no HTTP request context
             ) as ctx:
-                chunks = self.text_chunker.chunk_text(cleaned_markdown, metadata=chunk_metadata)
+                chunks = await self.chunking_pool.chunk(cleaned_markdown, chunk_metadata)
                 ctx.metadata = {
                     "chunks_created": len(chunks),
                     "text_length": len(cleaned_markdown),
@@ -169,7 +222,16 @@ class IndexingService:
                 "error": "No chunks generated",
             }
 
-        # Step 2: Generate embeddings (batch for efficiency)
+        # Step 2: Generate embeddings for new or changed chunks only
+        for chunk in chunks:
+            chunk["chunk_hash"] = compute_content_hash(chunk["text"])
+        unchanged, reused = await self._existing_vectors(canonical_url, chunks)
+        to_embed = [
+            position
+            for position in range(len(chunks))
+            if position not in unchanged and position not in reused
+        ]
+
         try:
             async with TimingContext(
                 "embedding",
@@ -179,18 +241,31 @@ class IndexingService:
                 document_url=document.url,
                 request_id=None,  # Worker operations have no HTTP request context
             ) as ctx:
-                chunk_texts = [chunk["text"] for chunk in chunks]
-                embeddings = await self.embedding_service.embed_batch(chunk_texts)
+                chunk_texts = [chunks[position]["text"] for position in to_embed]
+                new_embeddings = np.asarray(
+                    await self.embedding_service.embed_batch(chunk_texts)
+                    if chunk_texts
+                    else np.empty((0, self.vector_store.vector_dim)),
+                    dtype=np.float32,
+                )
                 ctx.metadata = {
                     "batch_size": len(chunk_texts),
-                    "embedding_dim": len(embeddings[0]) if embeddings else 0,
+                    "chunks_unchanged": len(unchanged),
+                    "chunks_reused": len(reused),
+                    "embedding_dim": new_embeddings.shape[1] if len(new_embeddings) else 0,
                 }
-            logger.info("Embeddings generated", url=document.url, count=len(embeddings))
+            logger.info(
+                "Embeddings generated",
+                url=document.url,
+                count=len(new_embeddings),
+                unchanged=len(unchanged),
+                reused=len(reused),
+            )
 
             # Validate embedding dimensions match expected vector dimension
-            if embeddings and len(embeddings[0]) != self.vector_store.vector_dim:
+            if len(new_embeddings) and new_embeddings.shape[1] != self.vector_store.vector_dim:
                 error_msg = (
-                    f"Embedding dimension mismatch: got {len(embeddings[0])}, "
+                    f"Embedding dimension mismatch: got {new_embeddings.shape[1]}, "
                     f"expected {self.vector_store.vector_dim}. "
                     f"Check SEARCH_BRIDGE_VECTOR_DIM configuration."
                 )
@@ -201,6 +276,8 @@ class IndexingService:
                     "chunks_indexed": 0,
                     "error": error_msg,
                 }
+            if len(new_embeddings) != len(to_embed):
+                raise ValueError(f"Expected {len(to_embed)} embeddings, got {len(new_embeddings)}")
         except Exception as e:
             logger.error("Failed to generate embeddings", url=document.url, error=str(e))
             return {
@@ -210,6 +287,14 @@ class IndexingService:
                 "error": f"Embedding failed: {str(e)}",
             }
 
+        # None marks a chunk whose point is already indexed as-is; the rest are
+        # row views of the float32 embedding matrices, never copied to lists
+        embeddings: list[npt.NDArray[np.float32] | None] = [None] * len(chunks)
+        for position, vector in reused.items():
+            embeddings[position] = vector
+        for position, vector in zip(to_embed, new_embeddings):
+            embeddings[position] = vector
+
         # Step 3: Index vectors in Qdrant
         try:
             async with TimingContext(
@@ -270,11 +355,19 @@ class IndexingService:
                     "text_length": len(cleaned_markdown),
                 }
             logger.info("Document indexed in BM25", url=document.url)
+
+            # Only a fully indexed document may be skipped next time
+            if self.content_registry is not None:
+                await asyncio.to_thread(self.content_registry.record, canonical_url, content_hash)
         except Exception as e:
             logger.error("Failed to index in BM25", url=document.url, error=str(e))
             # Not fatal - vector search will still work
             logger.warning("Continuing despite BM25 indexing failure")
 
+        # The index changed: retire search results cached against it
+        if self.index_generation is not None:
+            self.index_generation.bump()
+
         # Success
         logger.info(
             "Document indexing complete",
@@ -286,5 +379,120 @@ class IndexingService:
             "success": True,
             "url": document.url,
             "chunks_indexed": indexed_count,
+            "chunks_embedded": len(to_embed),
             "total_tokens": sum(chunk["token_count"] for chunk in chunks),
         }
+
+    async def delete_document(self, url: str) -> dict[str, Any]:
+        """
+        Remove a document from the vector and BM25 indexes.
+
+        Args:
+            url: Document URL (normalized to its canonical URL)
+
+        Returns:
+            Deletion result with the number of BM25 versions tombstoned
+        """
+        canonical_url = normalize_url(url, remove_tracking=True)
+
+        try:
+            await self.vector_store.delete_document(canonical_url)
+            bm25_deleted = self.bm25_engine.delete_document(canonical_url)
+        except Exception as e:
+            logger.error("Failed to delete document", url=url, error=str(e))
+            return {
+                "success": False,
+                "url": url,
+                "error": f"Deletion failed: {str(e)}",
+            }
+
+        # A re-added document must be indexed in full, even with the same content
+        if self.content_registry is not None:
+            await asyncio.to_thread(self.content_registry.forget, canonical_url)
+
+        if self.index_generation is not None:
+            self.index_generation.bump()
+
+        logger.info("Document deleted", url=url, canonical_url=canonical_url)
+
+        return {
+            "success": True,
+            "url": url,
+            "canonical_url": canonical_url,
+            "bm25_versions_deleted": bm25_deleted,
+        }
+
+    @staticmethod
+    def _index_hash(cleaned_markdown: str, metadata: dict[str, Any]) -> str:
+        """
+        Hash everything a document contributes to the indexes.
+
+        Metadata is part of every chunk payload and of the BM25 document, so
+        a changed title or language must re-index even when the text is the same.
+
+        Args:
+            cleaned_markdown: Cleaned document text
+            metadata: Document-level chunk metadata (without content_id, which
+                differs per crawl for the same content)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        indexed_metadata = {key: value for key, value in metadata.items() if key != "content_id"}
+        return compute_content_hash(
+            json.dumps(indexed_metadata, sort_keys=True, default=str) + "\0" + cleaned_markdown
+        )
+
+    async def _existing_vectors(
+        self,
+        canonical_url: str,
+        chunks: list[dict[str, Any]],
+    ) -> tuple[set[int], dict[int, npt.NDArray[np.float32]]]:
+        """
+        Match chunks against what is already indexed for the document.
+
+        A chunk whose hash is stored at the same index is unchanged and its
+        point is left alone. A chunk whose hash is stored at another index
+        (e.g. shifted by an inserted paragraph) reuses the stored vector
+        under its new index. Lookup failures fall back to embedding everything.
+
+        Args:
+            canonical_url: Canonical URL of the document
+            chunks: Chunks of the new version, with ``chunk_hash`` set
+
+        Returns:
+            Tuple of (positions of unchanged chunks, position -> reused vector)
+        """
+        try:
+            stored = await self.vector_store.get_chunk_hashes(canonical_url)
+            if not stored:
+                return set(), {}
+
+            unchanged: set[int] = set()
+            moved: dict[int, int] = {}  # position -> stored chunk index
+            index_by_hash = {chunk_hash: index for index, chunk_hash in stored.items()}
+            for position, chunk in enumerate(chunks):
+                chunk_hash = chunk["chunk_hash"]
+                if stored.get(chunk["chunk_index"]) == chunk_hash:
+                    unchanged.add(position)
+                elif chunk_hash in index_by_hash:
+                    moved[position] = index_by_hash[chunk_hash]
+
+            reused: dict[int, npt.NDArray[np.float32]] = {}
+            if moved:
+                vectors = await self.vector_store.get_chunk_vectors(
+                    canonical_url, sorted(set(moved.values()))
+                )
+                reused = {
+                    position: vectors[index]
+                    for position, index in moved.items()
+                    if index in vectors
+                }
+            return unchanged, reused
+        except Exception as e:
+            logger.warning(
+                "Chunk hash lookup failed, re-embedding all chunks",
+                url=canonical_url,
+                error=str(e),
+            )
+            return set(), {}
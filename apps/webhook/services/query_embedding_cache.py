@@ -0,0 +1,160 @@
+"""
+Cache of search query embeddings.
+
+Dashboards and agents repeat the same queries, and each semantic or hybrid
+search would otherwise wait on a TEI round trip. ``QueryEmbeddingCache``
+keeps recent query vectors in a bounded, TTL'd in-process LRU, optionally
+backed by a Redis tier shared by every API process.
+
+Keys are the model name plus the SHA-256 of the whitespace-normalised query.
+Case is kept: embedding models are case-sensitive, so "Python" and "python"
+are different queries. Redis errors are logged and treated as misses.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, cast
+
+from redis import Redis
+
+from services.embedding_cache import pack_vector, text_hash, unpack_vector
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalise a query for cache lookup.
+
+    Args:
+        query: Raw query text
+
+    Returns:
+        Query with surrounding whitespace stripped and inner runs of
+        whitespace collapsed to single spaces
+    """
+    return " ".join(query.split())
+
+
+class QueryEmbeddingCache:
+    """Bounded, TTL'd LRU of query embeddings with an optional Redis tier."""
+
+    def __init__(
+        self,
+        model: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        redis: Redis | None = None,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            model: Embedding model name; part of every key
+            max_entries: Queries kept in process before the least recently
+                used are evicted
+            ttl_seconds: How long a query vector is served before it is
+                embedded again, in both tiers
+            redis: Optional shared tier (binary responses, i.e.
+                decode_responses=False)
+        """
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis
+        # Vectors are kept as tuples so no caller can mutate a cached entry
+        self._entries: OrderedDict[str, tuple[float, tuple[float, ...]]] = OrderedDict()
+        self._prefix = f"query_embedding:{model}:"
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, query: str) -> list[float] | None:
+        """
+        Look up a query's embedding, in process first, then in Redis.
+
+        Args:
+            query: Raw query text
+
+        Returns:
+            A new list holding the embedding vector, or None on a miss
+        """
+        key = self._key(query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, vector = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(vector)
+            del self._entries[key]
+
+        if self.redis is not None:
+            try:
+                data = cast(
+                    bytes | None, await asyncio.to_thread(self.redis.get, self._prefix + key)
+                )
+            except Exception as e:
+                logger.warning("Query embedding cache lookup failed", error=str(e))
+                data = None
+            if data is not None:
+                vector = tuple(float(value) for value in unpack_vector(data))
+                self._store(key, vector)
+                self.redis_hits += 1
+                return list(vector)
+
+        self.misses += 1
+        return None
+
+    async def put(self, query: str, vector: list[float]) -> None:
+        """
+        Store a query's embedding in both tiers.
+
+        Args:
+            query: Raw query text
+            vector: Embedding vector
+        """
+        key = self._key(query)
+        self._store(key, tuple(vector))
+
+        if self.redis is not None:
+            try:
+                await asyncio.to_thread(
+                    self.redis.set,
+                    self._prefix + key,
+                    pack_vector(vector),
+                    px=max(1, int(self.ttl_seconds * 1000)),
+                )
+            except Exception as e:
+                logger.warning("Query embedding cache update failed", error=str(e))
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get hit and miss counters.
+
+        Returns:
+            Counters since startup, the in-process size and the overall hit rate
+        """
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": self.redis is not None,
+        }
+
+    def _key(self, query: str) -> str:
+        return text_hash(normalize_query(query))
+
+    def _store(self, key: str, vector: tuple[float, ...]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -4,11 +4,15 @@ Hybrid search orchestrator.
 Combines vector similarity and BM25 keyword search using Reciprocal Rank Fusion (RRF).
 """
 
+import asyncio
+from collections.abc import Awaitable, Iterable
 from typing import Any
 
-from api.schemas.search import SearchMode
+from api.schemas.search import CountMode, SearchMode
 from services.bm25_engine import BM25Engine
 from services.embedding import EmbeddingService
+from services.query_embedding_cache import QueryEmbeddingCache, normalize_query
+from services.search_cache import SearchResultCache
 from services.vector_store import VectorStore
 from utils.logging import get_logger
 
@@ -86,6 +90,31 @@ def reciprocal_rank_fusion(
     return results
 
 
+class SearchResults(list[dict[str, Any]]):
+    """
+    Result list that records how it was produced.
+
+    Hybrid search returns fused results from the legs that finished in time;
+    ``partial`` is set when a leg timed out or failed, and ``failed_legs``
+    names it. ``count_mode`` records how the accompanying total was counted.
+    """
+
+    def __init__(
+        self,
+        results: Iterable[dict[str, Any]] = (),
+        failed_legs: tuple[str, ...] = (),
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> None:
+        super().__init__(results)
+        self.failed_legs = failed_legs
+        self.count_mode = count_mode
+
+    @property
+    def partial(self) -> bool:
+        """Whether any search leg was dropped."""
+        return bool(self.failed_legs)
+
+
 class SearchOrchestrator:
     """Orchestrates hybrid search across vector and keyword search."""
 
@@ -95,6 +124,11 @@ class SearchOrchestrator:
         vector_store: VectorStore,
         bm25_engine: BM25Engine,
         rrf_k: int = 60,
+        query_cache: QueryEmbeddingCache | None = None,
+        semantic_timeout: float | None = None,
+        keyword_timeout: float | None = None,
+        result_cache: SearchResultCache | None = None,
+        count_mode: CountMode = CountMode.NONE,
     ) -> None:
         """
         Initialize search orchestrator.
@@ -104,13 +138,36 @@ class SearchOrchestrator:
             vector_store: Vector store instance
             bm25_engine: BM25 engine instance
             rrf_k: RRF k constant
+            query_cache: Optional cache of query embeddings; repeated queries
+                found in it skip TEI
+            semantic_timeout: Seconds the vector leg of a hybrid search may
+                take before it is dropped (None waits indefinitely)
+            keyword_timeout: Seconds the BM25 leg of a hybrid search may take
+                before it is dropped (None waits indefinitely)
+            result_cache: Optional shared cache of complete search results,
+                invalidated when the index generation changes
+            count_mode: How vector search totals are counted unless a search
+                asks otherwise
         """
         self.embedding_service = embedding_service
         self.vector_store = vector_store
         self.bm25_engine = bm25_engine
         self.rrf_k = rrf_k
+        self.query_cache = query_cache
+        self.semantic_timeout = semantic_timeout
+        self.keyword_timeout = keyword_timeout
+        self.result_cache = result_cache
+        self.count_mode = count_mode
 
-        logger.info("Search orchestrator initialized", rrf_k=rrf_k)
+        logger.info(
+            "Search orchestrator initialized",
+            rrf_k=rrf_k,
+            query_cache=query_cache is not None,
+            semantic_timeout=semantic_timeout,
+            keyword_timeout=keyword_timeout,
+            result_cache=result_cache is not None,
+            count_mode=count_mode.value,
+        )
 
     async def search(
         self,
@@ -122,6 +179,7 @@ class SearchOrchestrator:
         language: str | None = None,
         country: str | None = None,
         is_mobile: bool | None = None,
+        count_mode: CountMode | None = None,
     ) -> tuple[list[dict[str, Any]], int]:
         """
         Execute search with specified mode.
@@ -135,9 +193,13 @@ class SearchOrchestrator:
             language: Filter by language
             country: Filter by country
             is_mobile: Filter by mobile flag
+            count_mode: How the vector total is counted (default: the
+                orchestrator's ``count_mode``)
 
         Returns:
-            Tuple of (results, total_count)
+            Tuple of (results, total_count). Results are a ``SearchResults``
+            recording the count mode used, flagged ``partial`` when a hybrid
+            search leg was dropped.
         """
         logger.info(
             "Executing search",
@@ -153,13 +215,57 @@ class SearchOrchestrator:
             },
         )
 
+        if mode in (SearchMode.KEYWORD, SearchMode.BM25):
+            count_mode = CountMode.EXACT  # BM25 totals are always exact
+        elif count_mode is None:
+            count_mode = self.count_mode
+
+        if self.result_cache is None:
+            results, total = await self._search(
+                query, mode, limit, offset, domain, language, country, is_mobile, count_mode
+            )
+        else:
+            request = {
+                "query": query,
+                "mode": SearchMode(mode).value,
+                "limit": limit,
+                "offset": offset,
+                "domain": domain,
+                "language": language,
+                "country": country,
+                "is_mobile": is_mobile,
+                "count_mode": count_mode.value,
+            }
+            results, total = await self.result_cache.get_or_compute(
+                request,
+                lambda: self._search(
+                    query, mode, limit, offset, domain, language, country, is_mobile, count_mode
+                ),
+                cacheable=lambda outcome: not getattr(outcome[0], "partial", False),
+            )
+
+        return SearchResults(results, getattr(results, "failed_legs", ()), count_mode), total
+
+    async def _search(
+        self,
+        query: str,
+        mode: SearchMode,
+        limit: int,
+        offset: int,
+        domain: str | None,
+        language: str | None,
+        country: str | None,
+        is_mobile: bool | None,
+        count_mode: CountMode,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Dispatch a search to the implementation for its mode."""
         if mode == SearchMode.HYBRID:
             return await self._hybrid_search(
-                query, limit, offset, domain, language, country, is_mobile
+                query, limit, offset, domain, language, country, is_mobile, count_mode
             )
         elif mode == SearchMode.SEMANTIC:
             return await self._semantic_search(
-                query, limit, offset, domain, language, country, is_mobile
+                query, limit, offset, domain, language, country, is_mobile, count_mode
             )
         elif mode in (SearchMode.KEYWORD, SearchMode.BM25):
             return await self._keyword_search(
@@ -177,9 +283,15 @@ class SearchOrchestrator:
         language: str | None,
         country: str | None,
         is_mobile: bool | None,
+        count_mode: CountMode = CountMode.NONE,
     ) -> tuple[list[dict[str, Any]], int]:
         """
         Hybrid search: Vector + BM25 with RRF fusion.
+
+        Both legs run concurrently, each under its own timeout. A leg that
+        times out or fails is dropped and the other leg's results are
+        returned, flagged as partial; only if both are dropped does the
+        search fail.
         """
         # Fetch enough results before fusion to maintain ranking accuracy across pages
         # We need to fetch (limit + offset) results from each search to ensure proper ranking
@@ -187,36 +299,78 @@ class SearchOrchestrator:
         dedup_buffer_factor = 1.5
         fetch_limit = int((limit + offset) * dedup_buffer_factor)
 
-        # Run both searches with expanded limit
-        vector_results, vector_total = await self._semantic_search(
-            query=query,
-            limit=fetch_limit,
-            offset=0,  # Fetch from beginning, apply offset after fusion
-            domain=domain,
-            language=language,
-            country=country,
-            is_mobile=is_mobile,
+        # Run both searches concurrently with expanded limit
+        legs = await asyncio.gather(
+            self._run_leg(
+                "semantic",
+                self._semantic_search(
+                    query=query,
+                    limit=fetch_limit,
+                    offset=0,  # Fetch from beginning, apply offset after fusion
+                    domain=domain,
+                    language=language,
+                    country=country,
+                    is_mobile=is_mobile,
+                    count_mode=count_mode,
+                ),
+                self.semantic_timeout,
+            ),
+            self._run_leg(
+                "keyword",
+                self._keyword_search(
+                    query=query,
+                    limit=fetch_limit,
+                    offset=0,  # Fetch from beginning, apply offset after fusion
+                    domain=domain,
+                    language=language,
+                    country=country,
+                    is_mobile=is_mobile,
+                ),
+                self.keyword_timeout,
+            ),
         )
-        keyword_results, keyword_total = await self._keyword_search(
-            query=query,
-            limit=fetch_limit,
-            offset=0,  # Fetch from beginning, apply offset after fusion
-            domain=domain,
-            language=language,
-            country=country,
-            is_mobile=is_mobile,
+
+        finished = [leg for leg in legs if not isinstance(leg, Exception)]
+        failed_legs = tuple(
+            name for name, leg in zip(("semantic", "keyword"), legs) if isinstance(leg, Exception)
         )
+        if not finished:
+            raise legs[0]  # type: ignore[misc]
 
         # Apply RRF fusion on full result sets
         fused_results = reciprocal_rank_fusion(
-            [vector_results, keyword_results],
+            [results for results, _ in finished],
             k=self.rrf_k,
         )
 
-        total = max(vector_total, keyword_total)
+        total = max(leg_total for _, leg_total in finished)
 
         # Apply pagination after fusion to maintain ranking accuracy
-        return fused_results[offset : offset + limit], total
+        return SearchResults(fused_results[offset : offset + limit], failed_legs), total
+
+    async def _run_leg(
+        self,
+        name: str,
+        leg: Awaitable[tuple[list[dict[str, Any]], int]],
+        timeout: float | None,
+    ) -> tuple[list[dict[str, Any]], int] | Exception:
+        """
+        Await one hybrid search leg within its timeout.
+
+        A timed-out leg is cancelled (a BM25 search already running in the
+        thread executor still runs to completion in the background).
+
+        Returns:
+            The leg's (results, total), or the exception that dropped it
+        """
+        try:
+            return await asyncio.wait_for(leg, timeout)
+        except TimeoutError as e:
+            logger.warning("Hybrid search leg timed out", leg=name, timeout=timeout)
+            return e
+        except Exception as e:
+            logger.warning("Hybrid search leg failed", leg=name, error=str(e))
+            return e
 
     async def _semantic_search(
         self,
@@ -227,12 +381,13 @@ class SearchOrchestrator:
         language: str | None,
         country: str | None,
         is_mobile: bool | None,
+        count_mode: CountMode = CountMode.NONE,
     ) -> tuple[list[dict[str, Any]], int]:
         """
         Semantic search: Vector similarity only.
         """
         # Embed query
-        query_vector = await self.embedding_service.embed_single(query)
+        query_vector = await self._embed_query(query)
 
         if not query_vector:
             logger.warning("Failed to generate query embedding")
@@ -247,6 +402,7 @@ class SearchOrchestrator:
             language=language,
             country=country,
             is_mobile=is_mobile,
+            count_mode=count_mode,
         )
 
         results, total = self._normalize_results(result)
@@ -254,6 +410,24 @@ class SearchOrchestrator:
         logger.info("Semantic search completed", results=len(results), total=total)
         return results, total
 
+    async def _embed_query(self, query: str) -> list[float]:
+        """
+        Embed a query, serving repeated queries from the query cache.
+
+        The whitespace-normalised query is embedded, so every spelling that
+        shares a cache key also shares the vector it was cached with.
+        """
+        query = normalize_query(query)
+        if self.query_cache is None:
+            return await self.embedding_service.embed_single(query)
+
+        query_vector = await self.query_cache.get(query)
+        if query_vector is None:
+            query_vector = await self.embedding_service.embed_single(query)
+            if query_vector:
+                await self.query_cache.put(query, query_vector)
+        return query_vector
+
     async def _keyword_search(
         self,
         query: str,
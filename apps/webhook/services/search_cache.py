@@ -0,0 +1,221 @@
+"""
+Shared cache of search results, invalidated by index generation.
+
+Identical search requests (same query, mode, filters and page) are answered
+from Redis, so every API replica shares the cache. Each entry's key embeds
+the index generation: a Redis counter that ``IndexingService`` bumps after
+every write. A write therefore makes all earlier entries unreachable at
+once, and the TTL only bounds how long the orphans occupy memory.
+
+Concurrent identical requests are coalesced: within a process they await a
+single computation, and across replicas a short Redis lock lets one replica
+compute while the others poll for its result.
+
+Redis errors are logged and the search is computed directly, so an
+unavailable cache never fails a search.
+"""
+
+import asyncio
+import hashlib
+import json
+import secrets
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis import Redis
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SearchOutcome = tuple[list[dict[str, Any]], int]
+
+
+class IndexGeneration:
+    """Redis counter identifying the current state of the search index."""
+
+    def __init__(self, redis: Redis, collection: str) -> None:
+        """
+        Initialize the counter.
+
+        Args:
+            redis: Redis connection
+            collection: Qdrant collection the index belongs to
+        """
+        self.redis = redis
+        self.key = f"search_generation:{collection}"
+
+    def current(self) -> int:
+        """
+        Get the current generation.
+
+        Returns:
+            Generation number (0 before the first write)
+        """
+        value = self.redis.get(self.key)
+        return int(value) if value is not None else 0
+
+    def bump(self) -> None:
+        """Advance the generation after an index write, invalidating cached results."""
+        try:
+            self.redis.incr(self.key)
+        except Exception as e:
+            logger.warning("Index generation bump failed", key=self.key, error=str(e))
+
+
+class SearchResultCache:
+    """Redis cache of search results with single-flight computation."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        generation: IndexGeneration,
+        ttl_seconds: int = 3600,
+        lock_seconds: float = 30.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            redis: Redis connection
+            generation: Index generation counter entries are tagged with
+            ttl_seconds: Expiry of entries, bounding memory held by entries of
+                superseded generations
+            lock_seconds: How long other replicas wait on a computation
+                before computing themselves
+            poll_interval: Seconds between checks for another replica's result
+        """
+        self.redis = redis
+        self.generation = generation
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.poll_interval = poll_interval
+        self._inflight: dict[str, asyncio.Future[SearchOutcome]] = {}
+
+    async def get_or_compute(
+        self,
+        request: dict[str, Any],
+        compute: Callable[[], Awaitable[SearchOutcome]],
+        cacheable: Callable[[SearchOutcome], bool] = lambda outcome: True,
+    ) -> SearchOutcome:
+        """
+        Get the results of a search request, computing them at most once.
+
+        Args:
+            request: Search parameters identifying the request
+            compute: Coroutine function running the search
+            cacheable: Whether an outcome may be stored (e.g. not partial)
+
+        Returns:
+            Tuple of (results, total_count)
+        """
+        digest = hashlib.sha256(
+            json.dumps(request, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+        inflight = self._inflight.get(digest)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[SearchOutcome] = asyncio.get_running_loop().create_future()
+        self._inflight[digest] = future
+        try:
+            outcome = await self._lookup_or_compute(digest, compute, cacheable)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            future.set_result(outcome)
+            return outcome
+        finally:
+            del self._inflight[digest]
+
+    async def _lookup_or_compute(
+        self,
+        digest: str,
+        compute: Callable[[], Awaitable[SearchOutcome]],
+        cacheable: Callable[[SearchOutcome], bool],
+    ) -> SearchOutcome:
+        """Serve a request from Redis, wait for another replica, or compute it."""
+        try:
+            generation = await asyncio.to_thread(self.generation.current)
+            key = f"search_result:{generation}:{digest}"
+            cached = await asyncio.to_thread(self.redis.get, key)
+            if cached is not None:
+                logger.debug("Search result cache hit", generation=generation)
+                return self._decode(cached)
+
+            token = secrets.token_hex(8)
+            lock_key = f"{key}:lock"
+            locked = await asyncio.to_thread(
+                self.redis.set, lock_key, token, nx=True, px=int(self.lock_seconds * 1000)
+            )
+            if not locked:
+                waited = await self._wait_for(key, lock_key)
+                if waited is not None:
+                    return waited
+        except Exception as e:
+            logger.warning("Search result cache unavailable", error=str(e))
+            return await compute()
+
+        try:
+            outcome = await compute()
+            if cacheable(outcome):
+                try:
+                    await asyncio.to_thread(
+                        self.redis.set, key, self._encode(outcome), ex=self.ttl_seconds
+                    )
+                except Exception as e:
+                    logger.warning("Search result cache update failed", error=str(e))
+            return outcome
+        finally:
+            if locked:
+                await asyncio.to_thread(self._release, lock_key, token)
+
+    async def _wait_for(self, key: str, lock_key: str) -> SearchOutcome | None:
+        """
+        Poll for the result another replica is computing.
+
+        Returns:
+            The result, or None if the lock was released without one or
+            the wait timed out
+        """
+        deadline = asyncio.get_running_loop().time() + self.lock_seconds
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            cached, lock_held = await asyncio.to_thread(self._poll, key, lock_key)
+            if cached is not None:
+                return self._decode(cached)
+            if not lock_held:
+                return None
+        return None
+
+    def _poll(self, key: str, lock_key: str) -> tuple[bytes | None, bool]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.exists(lock_key)
+        cached, lock_held = pipe.execute()
+        return cached, bool(lock_held)
+
+    def _release(self, lock_key: str, token: str) -> None:
+        try:
+            value = self.redis.get(lock_key)
+            if (
+                value is not None
+                and (value.decode() if isinstance(value, bytes) else value) == token
+            ):
+                self.redis.delete(lock_key)
+        except Exception as e:
+            logger.warning("Search result lock release failed", error=str(e))
+
+    @staticmethod
+    def _encode(outcome: SearchOutcome) -> bytes:
+        results, total = outcome
+        return json.dumps({"results": list(results), "total": total}, default=str).encode()
+
+    @staticmethod
+    def _decode(data: bytes | str) -> SearchOutcome:
+        decoded = json.loads(data)
+        return decoded["results"], int(decoded["total"])
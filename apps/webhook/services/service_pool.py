@@ -14,10 +14,17 @@ Performance Impact:
 import threading
 from typing import ClassVar
 
+from redis import Redis
+
 from config import settings
+from infra.redis import get_redis_connection
 from services.bm25_engine import BM25Engine
+from services.chunking_pool import ChunkingPool
+from services.content_registry import IndexedContentRegistry, index_version
 from services.embedding import EmbeddingService
+from services.embedding_cache import create_embedding_cache
 from services.indexing import IndexingService
+from services.search_cache import IndexGeneration
 from services.vector_store import VectorStore
 from utils.logging import get_logger
 from utils.text_processing import TextChunker
@@ -31,15 +38,17 @@ class ServicePool:
 
     This pool maintains persistent instances of:
     - TextChunker: Tokenizer loaded once, reused for all jobs
+    - ChunkingPool: Threads or processes cleaning and chunking off the event loop
     - EmbeddingService: HTTP client with connection pooling
     - VectorStore: Qdrant client with persistent connections
-    - BM25Engine: BM25 index loaded once
+    - BM25Engine: memory-mapped BM25 segments (page cache shared across processes)
+    - IndexedContentRegistry: Redis hash of indexed content hashes (optional)
 
     Thread-safety:
     - Singleton creation uses double-checked locking pattern.
     - EmbeddingService (HTTP client) and VectorStore (Qdrant client) are thread-safe and use connection pooling.
     - TextChunker uses semantic-text-splitter (Rust-based), which is thread-safe by design.
-    - BM25Engine uses file locking for concurrent read/write safety.
+    - BM25Engine reads immutable mmap'd segments lock-free and only locks to publish writes.
 
     Concurrency:
     - This implementation is safe for both single-threaded and multi-threaded RQ workers.
@@ -73,11 +82,36 @@ class ServicePool:
         )
         logger.info("Text chunker initialized")
 
+        # Chunking pool (worker processes load their own tokenizer on first use)
+        self.chunking_pool = ChunkingPool(
+            self.text_chunker,
+            mode=settings.chunking_pool_mode,
+            workers=settings.chunking_pool_workers,
+        )
+        # Connection the chunking pool's stats are published on (connects on first use)
+        self.redis: Redis | None = None
+        try:
+            self.redis = get_redis_connection()
+        except Exception:
+            logger.exception("Redis unavailable, chunking pool stats will not be published")
+
         # Initialize embedding service (creates HTTP client with connection pooling)
         logger.info("Initializing embedding service...")
         self.embedding_service = EmbeddingService(
             tei_url=settings.tei_url,
             api_key=settings.tei_api_key,
+            cache=create_embedding_cache(
+                backend=settings.embedding_cache_backend,
+                model=settings.embedding_model,
+                path=settings.embedding_cache_path,
+                redis_url=settings.redis_url,
+                max_entries=settings.embedding_cache_max_entries,
+            ),
+            micro_batch_wait_ms=settings.embedding_micro_batch_wait_ms,
+            micro_batch_size=settings.embedding_micro_batch_size,
+            micro_batch_tokens=settings.embedding_micro_batch_tokens,
+            max_concurrency=settings.tei_max_concurrent_requests,
+            eject_seconds=settings.tei_eject_seconds,
         )
         logger.info("Embedding service initialized")
 
@@ -88,10 +122,17 @@ class ServicePool:
             collection_name=settings.qdrant_collection,
             vector_dim=settings.vector_dim,
             timeout=int(settings.qdrant_timeout),
+            quantization=settings.qdrant_quantization,
+            oversampling=settings.qdrant_oversampling,
+            rescore=settings.qdrant_rescore,
+            vectors_on_disk=settings.qdrant_vectors_on_disk,
+            payload_on_disk=settings.qdrant_payload_on_disk,
+            hnsw_m=settings.qdrant_hnsw_m,
+            hnsw_ef_construct=settings.qdrant_hnsw_ef_construct,
         )
         logger.info("Vector store initialized")
 
-        # Initialize BM25 engine (loads index if exists)
+        # Initialize BM25 engine (maps existing segments read-only)
         logger.info("Initializing BM25 engine...")
         self.bm25_engine = BM25Engine(
             k1=settings.bm25_k1,
@@ -99,6 +140,30 @@ class ServicePool:
         )
         logger.info("BM25 engine initialized")
 
+        # Content hash registry for skipping unchanged documents (lazy Redis connection)
+        self.content_registry: IndexedContentRegistry | None = None
+        if settings.skip_unchanged_documents:
+            try:
+                self.content_registry = IndexedContentRegistry(
+                    redis=get_redis_connection(),
+                    index_version=index_version(settings),
+                )
+            except Exception:
+                # Optional optimization - index everything rather than fail startup
+                logger.exception(
+                    "Content registry unavailable, unchanged documents will be re-indexed"
+                )
+
+        # Generation counter bumped on every write, invalidating cached search results
+        self.index_generation: IndexGeneration | None = None
+        if settings.search_result_cache_enabled:
+            try:
+                self.index_generation = IndexGeneration(
+                    redis=get_redis_connection(), collection=settings.qdrant_collection
+                )
+            except Exception:
+                logger.exception("Index generation unavailable, cached search results may go stale")
+
         logger.info("Service pool initialization complete")
 
     @classmethod
@@ -158,6 +223,9 @@ class ServicePool:
             embedding_service=self.embedding_service,
             vector_store=self.vector_store,
             bm25_engine=self.bm25_engine,
+            content_registry=self.content_registry,
+            index_generation=self.index_generation,
+            chunking_pool=self.chunking_pool,
         )
 
     async def close(self) -> None:
@@ -180,6 +248,11 @@ class ServicePool:
         except Exception:
             logger.exception("Failed to close vector store")
 
+        try:
+            self.chunking_pool.close()
+        except Exception:
+            logger.exception("Failed to close chunking pool")
+
         # Reset singleton so new instance can be created
         ServicePool._instance = None
         logger.info("Service pool closed and reset")
@@ -0,0 +1,158 @@
+"""
+Health-aware routing across TEI replicas.
+
+``EndpointPool`` tracks each TEI endpoint's outstanding requests and an
+exponentially weighted moving average (EWMA) of its response latency, and
+routes every request to the endpoint with the lowest expected wait. An
+endpoint that fails is ejected for a cooldown; once the cooldown expires it
+is handed out for a ``/health`` probe and rejoins the pool when the probe
+succeeds.
+
+The pool only keeps the bookkeeping; ``EmbeddingService`` performs the
+requests and probes.
+"""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Weight of the newest latency sample in the moving average
+EWMA_ALPHA = 0.3
+
+
+def parse_endpoints(tei_url: str | list[str]) -> list[str]:
+    """
+    Normalise TEI endpoint configuration into a list of base URLs.
+
+    Args:
+        tei_url: One URL, comma-separated URLs, or a list of URLs
+
+    Returns:
+        Base URLs without trailing slashes, duplicates removed
+
+    Raises:
+        ValueError: If no URL is given
+    """
+    raw = tei_url.split(",") if isinstance(tei_url, str) else tei_url
+    urls = list(dict.fromkeys(url.strip().rstrip("/") for url in raw if url.strip()))
+    if not urls:
+        raise ValueError("At least one TEI URL is required")
+    return urls
+
+
+@dataclass(slots=True)
+class TEIEndpoint:
+    """Routing state of one TEI replica."""
+
+    url: str
+    outstanding: int = 0
+    latency: float | None = None
+    ejected_until: float = 0.0
+    failures: int = 0
+
+
+class EndpointPool:
+    """Routes requests to the least-loaded healthy TEI endpoint."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        eject_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            urls: TEI base URLs
+            eject_seconds: How long a failed endpoint is kept out of rotation
+                before it is probed
+            clock: Monotonic time source, in seconds
+        """
+        self.endpoints = [TEIEndpoint(url) for url in urls]
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+
+    def select(self) -> TEIEndpoint:
+        """
+        Pick the endpoint with the lowest expected wait.
+
+        The expected wait is the latency EWMA times the requests that would
+        be outstanding; endpoints without a sample yet are tried first. When
+        every endpoint is ejected, the one returning soonest is used.
+
+        Returns:
+            Endpoint to send the next request to
+        """
+        now = self._clock()
+        available = [e for e in self.endpoints if e.ejected_until <= now]
+        if not available:
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        return min(
+            available,
+            key=lambda e: ((e.outstanding + 1) * (e.latency or 0.0), e.outstanding),
+        )
+
+    def due_for_probe(self) -> list[TEIEndpoint]:
+        """
+        Claim ejected endpoints whose cooldown has expired for probing.
+
+        Each claimed endpoint stays ejected for another cooldown, so only one
+        caller probes it and a lost probe is simply retried later.
+
+        Returns:
+            Endpoints to probe via ``/health``
+        """
+        now = self._clock()
+        due = [e for e in self.endpoints if e.failures and e.ejected_until <= now]
+        for endpoint in due:
+            endpoint.ejected_until = now + self.eject_seconds
+        return due
+
+    def begin(self, endpoint: TEIEndpoint) -> float:
+        """
+        Record a request sent to an endpoint.
+
+        Returns:
+            Start time, to pass to ``succeeded``
+        """
+        endpoint.outstanding += 1
+        return self._clock()
+
+    def succeeded(self, endpoint: TEIEndpoint, started: float) -> None:
+        """Record a completed request and fold its latency into the EWMA."""
+        endpoint.outstanding -= 1
+        elapsed = self._clock() - started
+        if endpoint.latency is None:
+            endpoint.latency = elapsed
+        else:
+            endpoint.latency += EWMA_ALPHA * (elapsed - endpoint.latency)
+
+    def release(self, endpoint: TEIEndpoint) -> None:
+        """Record a request abandoned without an outcome, e.g. cancelled."""
+        endpoint.outstanding -= 1
+
+    def failed(self, endpoint: TEIEndpoint) -> None:
+        """Record a failed request and eject the endpoint for a cooldown."""
+        endpoint.outstanding -= 1
+        if len(self.endpoints) == 1:
+            return  # nowhere else to route
+
+        endpoint.failures += 1
+        endpoint.ejected_until = self._clock() + self.eject_seconds
+        logger.warning(
+            "Ejected TEI endpoint",
+            url=endpoint.url,
+            failures=endpoint.failures,
+            eject_seconds=self.eject_seconds,
+        )
+
+    def readmit(self, endpoint: TEIEndpoint) -> None:
+        """Return a probed endpoint to rotation."""
+        endpoint.failures = 0
+        endpoint.ejected_until = 0.0
+        logger.info("TEI endpoint healthy again", url=endpoint.url)
@@ -2,22 +2,61 @@
 Qdrant vector store client.
 
 Handles all interactions with the Qdrant vector database.
+
+The configured collection name is a Qdrant alias over a physical collection
+named ``<alias>_<UTC timestamp>``. A blue/green reindex loads a new physical
+collection next to the live one and then re-points the alias atomically.
+Collections created before aliases were introduced keep being used under
+their own name until their first reindex.
+
+Point IDs are deterministic (UUIDv5 of canonical URL and chunk index), so
+re-indexing a page overwrites its points in place instead of adding a
+duplicate set of vectors.
 """
 
+import asyncio
 import logging
+import time
 from collections.abc import Sequence
-from typing import Any
-from uuid import uuid4
+from datetime import UTC, datetime
+from typing import Any, Literal
+from uuid import UUID, uuid5
 
 import httpx
+import numpy as np
+import numpy.typing as npt
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionInfo,
+    CollectionParamsDiff,
+    CollectionStatus,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
     Distance,
     FieldCondition,
     Filter,
+    FilterSelector,
+    HasIdCondition,
+    HnswConfigDiff,
     MatchValue,
+    OptimizersConfigDiff,
+    PayloadSchemaType,
     PointStruct,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SetPayload,
+    SetPayloadOperation,
     VectorParams,
+    VectorParamsDiff,
 )
 from tenacity import (
     before_log,
@@ -27,10 +66,88 @@ from tenacity import (
     wait_exponential,
 )
 
+from api.schemas.search import CountMode
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Payload keys fixed by a chunk's hash and position, so an unchanged chunk keeps
+# them; its offsets and the document metadata are refreshed on re-indexing
+_UNCHANGED_CHUNK_PAYLOAD_KEYS = frozenset({"text", "chunk_index", "token_count", "chunk_hash"})
+
+# Payload fields searches and document lookups filter on, with their index types
+PAYLOAD_INDEXES: dict[str, PayloadSchemaType] = {
+    "domain": PayloadSchemaType.KEYWORD,
+    "language": PayloadSchemaType.KEYWORD,
+    "country": PayloadSchemaType.KEYWORD,
+    "isMobile": PayloadSchemaType.BOOL,
+    "canonical_url": PayloadSchemaType.KEYWORD,
+    "content_id": PayloadSchemaType.INTEGER,
+}
+
+# Qdrant's default segment size (KB) above which vectors are HNSW-indexed
+DEFAULT_INDEXING_THRESHOLD = 10000
+
+# Filter sets whose cached totals are kept before the oldest are dropped
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+# Namespace for point IDs; changing it would orphan every indexed point
+POINT_ID_NAMESPACE = UUID("6f1c5b0e-8d7a-5c47-9a43-2f6f0c1e9b52")
+
+
+def chunk_point_id(canonical_url: str, chunk_index: int) -> str:
+    """
+    Derive the Qdrant point ID of a document chunk.
+
+    Args:
+        canonical_url: Canonical URL of the source document
+        chunk_index: Position of the chunk within the document
+
+    Returns:
+        UUIDv5 string, stable across re-indexes of the same chunk
+    """
+    return str(uuid5(POINT_ID_NAMESPACE, f"{canonical_url}#{chunk_index}"))
+
+
+def chunk_payload(chunk: dict[str, Any], document_url: str) -> dict[str, Any]:
+    """
+    Build the Qdrant payload of a document chunk.
+
+    Args:
+        chunk: Chunk dictionary from TextChunker, with document metadata
+        document_url: Source document URL
+
+    Returns:
+        Payload with the chunk text and position plus document metadata
+    """
+    payload = {
+        "url": document_url,
+        "canonical_url": chunk.get("canonical_url") or document_url,
+        "text": chunk["text"],
+        "chunk_index": chunk["chunk_index"],
+        "token_count": chunk["token_count"],
+    }
+    for key in ["chunk_hash", "char_start", "char_end"]:
+        if key in chunk:
+            payload[key] = chunk[key]
+
+    # Add optional metadata
+    for key in [
+        "title",
+        "description",
+        "domain",
+        "language",
+        "country",
+        "isMobile",
+        "content_id",
+    ]:
+        if key in chunk:
+            payload[key] = chunk[key]
+    return payload
+
+
+QuantizationMode = Literal["none", "scalar", "binary"]
+
 
 class VectorStore:
     """Qdrant vector store client."""
@@ -41,6 +158,14 @@ class VectorStore:
         collection_name: str,
         vector_dim: int,
         timeout: int = 60,
+        count_cache_ttl: float = 60.0,
+        quantization: QuantizationMode = "none",
+        oversampling: float = 2.0,
+        rescore: bool = True,
+        vectors_on_disk: bool | None = None,
+        payload_on_disk: bool | None = None,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 100,
     ) -> None:
         """
         Initialize the vector store.
@@ -50,11 +175,40 @@ class VectorStore:
             collection_name: Name of the collection
             vector_dim: Vector dimensions
             timeout: Request timeout in seconds (default: 60)
+            count_cache_ttl: Seconds an exact total is reused for searches
+                with the same filters under ``CountMode.CACHED``
+            quantization: Vector quantization kept in RAM: none, scalar
+                (int8, 4x smaller) or binary (1 bit per dimension, 32x smaller)
+            oversampling: Candidates fetched per requested result when
+                searching a quantized collection
+            rescore: Re-rank quantized candidates with the original vectors
+            vectors_on_disk: Keep original vectors on disk (memory-mapped);
+                None leaves it to the Qdrant server default
+            payload_on_disk: Keep payloads on disk; None leaves it to the
+                Qdrant server default
+            hnsw_m: Edges per node of the HNSW graph
+            hnsw_ef_construct: Candidate list size while building the HNSW graph
         """
         self.url = url
         self.collection_name = collection_name
         self.vector_dim = vector_dim
         self.timeout = timeout
+        self.count_cache_ttl = count_cache_ttl
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.rescore = rescore
+        self.vectors_on_disk = vectors_on_disk
+        self.payload_on_disk = payload_on_disk
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self._count_cache: dict[tuple[Any, ...], tuple[float, int]] = {}
+        self._search_params = (
+            SearchParams(
+                quantization=QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+            )
+            if quantization != "none"
+            else None
+        )
 
         # Lazy initialization - client created on first use
         self._client: AsyncQdrantClient | None = None
@@ -64,6 +218,8 @@ class VectorStore:
             url=url,
             collection=collection_name,
             dim=vector_dim,
+            quantization=quantization,
+            vectors_on_disk=vectors_on_disk,
         )
 
     @property
@@ -112,7 +268,16 @@ class VectorStore:
     )
     async def ensure_collection(self) -> None:
         """
-        Ensure the collection exists, create if it doesn't.
+        Ensure the collection exists with the configured storage layout and payload indexes.
+
+        If neither the alias nor a collection of that name exists, a new
+        physical collection is created with the configured quantization,
+        on-disk storage and HNSW parameters, and the alias is pointed at it.
+        An existing collection whose layout differs is updated in place;
+        Qdrant's optimizer then rebuilds its segments in the background while
+        it keeps serving searches.
+        Missing indexes in ``PAYLOAD_INDEXES`` are created and indexes of the
+        wrong type are recreated.
 
         Raises:
             Exception: If collection operations fail after 3 retry attempts
@@ -122,28 +287,282 @@ class VectorStore:
             on HTTP errors. Logs a warning before each retry attempt.
         """
         try:
-            collections = await self.client.get_collections()
-            collection_names = [c.name for c in collections.collections]
+            current = await self.resolve_collection()
+
+            if current is not None:
+                logger.info(
+                    "Collection already exists", collection=self.collection_name, target=current
+                )
+                await self._migrate_collection()
+                await self._ensure_payload_indexes()
+            else:
+                name = self.new_collection_name()
+                await self.create_collection(name)
+                await self.client.update_collection_aliases(
+                    change_aliases_operations=[
+                        CreateAliasOperation(
+                            create_alias=CreateAlias(
+                                collection_name=name, alias_name=self.collection_name
+                            )
+                        )
+                    ]
+                )
+                logger.info("Collection alias created", alias=self.collection_name, target=name)
+
+        except Exception as e:
+            error_message = str(e) or repr(e)
+            logger.error("Failed to ensure collection", error=error_message)
+            raise
+
+    async def resolve_collection(self) -> str | None:
+        """
+        Get the physical collection searches are served from.
+
+        Returns:
+            The collection the alias points at, the configured name itself
+            for a collection that predates aliases, or None if neither exists
+        """
+        aliases = await self.client.get_aliases()
+        for alias in aliases.aliases:
+            if alias.alias_name == self.collection_name:
+                return str(alias.collection_name)
+
+        collections = await self.client.get_collections()
+        if self.collection_name in [c.name for c in collections.collections]:
+            return self.collection_name
+        return None
+
+    def new_collection_name(self) -> str:
+        """Name a new physical collection behind the alias."""
+        return f"{self.collection_name}_{datetime.now(UTC):%Y%m%d%H%M%S}"
 
-            if self.collection_name in collection_names:
-                logger.info("Collection already exists", collection=self.collection_name)
+    async def create_collection(self, name: str, bulk_load: bool = False) -> None:
+        """
+        Create a physical collection with the configured layout and payload indexes.
+
+        Args:
+            name: Collection name
+            bulk_load: Disable HNSW indexing so points can be uploaded at full
+                speed; call ``finish_bulk_load`` once they are in
+        """
+        await self.client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(
+                size=self.vector_dim,
+                distance=Distance.COSINE,
+                on_disk=self.vectors_on_disk,
+            ),
+            on_disk_payload=self.payload_on_disk,
+            hnsw_config=HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct),
+            quantization_config=self._quantization_config(),
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0) if bulk_load else None,
+        )
+        await self._ensure_payload_indexes(name)
+
+        logger.info(
+            "Collection created",
+            collection=name,
+            quantization=self.quantization,
+            vectors_on_disk=self.vectors_on_disk,
+            payload_on_disk=self.payload_on_disk,
+            bulk_load=bulk_load,
+        )
+
+    async def finish_bulk_load(
+        self,
+        name: str,
+        indexing_threshold: int = DEFAULT_INDEXING_THRESHOLD,
+        timeout: float = 3600.0,
+        poll_interval: float = 5.0,
+    ) -> None:
+        """
+        Re-enable indexing on a bulk-loaded collection and wait until it is built.
+
+        Args:
+            name: Collection name
+            indexing_threshold: Segment size (KB) above which vectors are indexed
+            timeout: Seconds to wait for the optimizer
+            poll_interval: Seconds between status checks
+
+        Raises:
+            TimeoutError: If the collection is not optimized within the timeout
+        """
+        await self.client.update_collection(
+            collection_name=name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold),
+        )
+
+        deadline = time.monotonic() + timeout
+        while True:
+            info = await self.client.get_collection(name)
+            if info.status == CollectionStatus.GREEN:
+                logger.info("Collection indexed", collection=name, points=info.points_count)
                 return
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Collection {name} still {info.status} after {timeout}s")
+            logger.info("Waiting for collection indexing", collection=name, status=info.status)
+            await asyncio.sleep(poll_interval)
 
-            # Create collection
-            await self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_dim,
-                    distance=Distance.COSINE,
-                ),
+    async def switch_alias(self, name: str) -> str | None:
+        """
+        Point the alias at another physical collection in one atomic update.
+
+        A collection that predates aliases occupies the alias name, so it is
+        deleted first and searches fail until the alias exists.
+
+        Args:
+            name: Collection to serve searches from
+
+        Returns:
+            The collection previously served, or None if there was none or it
+            was deleted to free the alias name
+        """
+        previous = await self.resolve_collection()
+        operations: list[CreateAliasOperation | DeleteAliasOperation] = []
+
+        if previous == self.collection_name:
+            logger.warning("Deleting pre-alias collection to free its name", collection=previous)
+            await self.client.delete_collection(previous)
+            previous = None
+        elif previous is not None:
+            operations.append(
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=self.collection_name))
             )
 
-            logger.info("Collection created", collection=self.collection_name)
+        operations.append(
+            CreateAliasOperation(
+                create_alias=CreateAlias(collection_name=name, alias_name=self.collection_name)
+            )
+        )
+        await self.client.update_collection_aliases(change_aliases_operations=operations)
+        logger.info(
+            "Collection alias switched", alias=self.collection_name, target=name, previous=previous
+        )
+        return previous
+
+    def _quantization_config(self) -> QuantizationConfig | None:
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    async def _migrate_collection(self) -> None:
+        """Bring an existing collection's storage layout in line with the configuration."""
+        info = await self.client.get_collection(self.collection_name)
+        changes = self._layout_changes(info)
+        if not changes:
+            return
+
+        quantization = self._quantization_config()
+        await self.client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config=(
+                {"": VectorParamsDiff(on_disk=self.vectors_on_disk)}
+                if self.vectors_on_disk is not None
+                else None
+            ),
+            collection_params=(
+                CollectionParamsDiff(on_disk_payload=self.payload_on_disk)
+                if self.payload_on_disk is not None
+                else None
+            ),
+            hnsw_config=HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct),
+            quantization_config=quantization if quantization is not None else Disabled.DISABLED,
+        )
+        logger.warning(
+            "Collection layout updated; Qdrant rebuilds segments in the background",
+            collection=self.collection_name,
+            changes=changes,
+        )
 
-        except Exception as e:
-            error_message = str(e) or repr(e)
-            logger.error("Failed to ensure collection", error=error_message)
-            raise
+    def _layout_changes(self, info: CollectionInfo) -> dict[str, tuple[Any, Any]]:
+        """
+        Compare a collection's storage layout with the configuration.
+
+        Returns:
+            Mapping of setting name to (current, configured) for each difference
+        """
+        params = info.config.params
+        vectors = params.vectors
+        quantization = info.config.quantization_config
+        current = {
+            "quantization": (
+                "scalar"
+                if isinstance(quantization, ScalarQuantization)
+                else "binary"
+                if isinstance(quantization, BinaryQuantization)
+                else "none"
+            ),
+            "vectors_on_disk": bool(getattr(vectors, "on_disk", False)),
+            "payload_on_disk": bool(params.on_disk_payload),
+            "hnsw_m": info.config.hnsw_config.m,
+            "hnsw_ef_construct": info.config.hnsw_config.ef_construct,
+        }
+        configured = {
+            "quantization": self.quantization,
+            "vectors_on_disk": self.vectors_on_disk,
+            "payload_on_disk": self.payload_on_disk,
+            "hnsw_m": self.hnsw_m,
+            "hnsw_ef_construct": self.hnsw_ef_construct,
+        }
+        return {
+            name: (current[name], configured[name])
+            for name in configured
+            if configured[name] is not None and current[name] != configured[name]
+        }
+
+    async def _ensure_payload_indexes(self, name: str | None = None) -> None:
+        """Create missing payload indexes and recreate those of the wrong type."""
+        name = name or self.collection_name
+        status = await self.payload_index_status(name)
+        for field, schema in PAYLOAD_INDEXES.items():
+            if status[field] == "indexed":
+                continue
+            if status[field] != "missing":
+                await self.client.delete_payload_index(collection_name=name, field_name=field)
+            # Built in the background; searches fall back to scans until it is ready
+            await self.client.create_payload_index(
+                collection_name=name,
+                field_name=field,
+                field_schema=schema,
+                wait=False,
+            )
+            logger.info(
+                "Payload index created",
+                collection=name,
+                field=field,
+                schema=schema.value,
+                previous=status[field],
+            )
+
+    async def payload_index_status(self, name: str | None = None) -> dict[str, str]:
+        """
+        Get the state of each declared payload index.
+
+        Args:
+            name: Collection to inspect (default: the served collection)
+
+        Returns:
+            Mapping of field name to "indexed", "missing", or
+            "wrong type: <type>" for an index of another type
+        """
+        info = await self.client.get_collection(name or self.collection_name)
+        existing = info.payload_schema or {}
+        status: dict[str, str] = {}
+        for field, schema in PAYLOAD_INDEXES.items():
+            index = existing.get(field)
+            if index is None:
+                status[field] = "missing"
+            elif index.data_type != schema:
+                status[field] = f"wrong type: {getattr(index.data_type, 'value', index.data_type)}"
+            else:
+                status[field] = "indexed"
+        return status
 
     @retry(
         stop=stop_after_attempt(3),
@@ -155,15 +574,25 @@ class VectorStore:
     async def index_chunks(
         self,
         chunks: list[dict[str, Any]],
-        embeddings: list[list[float]],
+        embeddings: Sequence[npt.ArrayLike | None],
         document_url: str,
     ) -> int:
         """
         Index document chunks with embeddings with automatic retry on HTTP errors.
 
+        Re-indexing is idempotent: points are keyed by (canonical URL, chunk
+        index), so existing chunks are overwritten, and any other points for
+        the same canonical URL (higher-index chunks left over from a longer
+        version of the page, or legacy random-ID points) are deleted after the
+        upsert.
+
         Args:
             chunks: List of chunk dictionaries from TextChunker
-            embeddings: List of embedding vectors
+            embeddings: Embedding vector per chunk (typically float32 rows of
+                the embedding matrix), or None for a chunk that is already
+                indexed unchanged at its position; such points keep their
+                vector and text, and only get their offsets and document
+                metadata refreshed
             document_url: Source document URL
 
         Returns:
@@ -183,59 +612,167 @@ class VectorStore:
             )
 
         points: list[PointStruct] = []
+        refreshes: list[SetPayloadOperation] = []
+        keep_ids: dict[str, list[str]] = {}  # canonical URL -> point IDs it still owns
         for chunk, embedding in zip(chunks, embeddings):
-            point_id = str(uuid4())
-
-            # Build payload from chunk metadata
-            payload = {
-                "url": document_url,
-                "text": chunk["text"],
-                "chunk_index": chunk["chunk_index"],
-                "token_count": chunk["token_count"],
-            }
-
-            # Add optional metadata
-            for key in [
-                "canonical_url",
-                "title",
-                "description",
-                "domain",
-                "language",
-                "country",
-                "isMobile",
-                "content_id",
-            ]:
-                if key in chunk:
-                    payload[key] = chunk[key]
+            payload = chunk_payload(chunk, document_url)
+            canonical_url = payload["canonical_url"]
+            point_id = chunk_point_id(canonical_url, chunk["chunk_index"])
+            keep_ids.setdefault(canonical_url, []).append(point_id)
+
+            if embedding is None:
+                refresh = {
+                    key: value
+                    for key, value in payload.items()
+                    if key not in _UNCHANGED_CHUNK_PAYLOAD_KEYS
+                }
+                refreshes.append(
+                    SetPayloadOperation(set_payload=SetPayload(payload=refresh, points=[point_id]))
+                )
+                continue
 
+            # The client's point model needs plain floats; converting here, one
+            # point at a time, keeps the rest of the pipeline on float32 arrays
             point = PointStruct(
                 id=point_id,
-                vector=embedding,
+                vector=np.asarray(embedding, dtype=np.float32).tolist(),
                 payload=payload,
             )
             points.append(point)
 
-        # Upsert points
+        # Upsert points, then drop whatever the new version no longer covers
         try:
-            await self.client.upsert(
-                collection_name=self.collection_name,
-                points=points,
-            )
+            if points:
+                await self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                )
+
+            if refreshes:
+                # Offsets differ per chunk, so each point gets its own payload
+                # update, all sent in one request
+                await self.client.batch_update_points(
+                    collection_name=self.collection_name,
+                    update_operations=refreshes,
+                )
+
+            for canonical_url, ids in (keep_ids or {document_url: []}).items():
+                await self._delete_stale_points(canonical_url, keep_ids=ids)
 
             logger.info(
                 "Indexed chunks",
                 collection=self.collection_name,
-                chunks=len(points),
+                chunks=len(chunks),
+                upserted=len(points),
+                unchanged=len(chunks) - len(points),
                 url=document_url,
             )
 
-            return len(points)
+            return len(chunks)
 
         except Exception as e:
             error_message = str(e) or repr(e)
             logger.error("Failed to index chunks", error=error_message, url=document_url)
             raise
 
+    async def get_chunk_hashes(self, canonical_url: str) -> dict[int, str]:
+        """
+        Get the content hashes of a document's indexed chunks.
+
+        Args:
+            canonical_url: Canonical URL of the document
+
+        Returns:
+            Mapping of chunk index to chunk hash (chunks indexed without a
+            hash, or under legacy random IDs, are omitted)
+        """
+        hashes: dict[int, str] = {}
+        offset: Any = None
+        while True:
+            records, offset = await self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=Filter(
+                    must=[
+                        FieldCondition(key="canonical_url", match=MatchValue(value=canonical_url))
+                    ]
+                ),
+                limit=256,
+                offset=offset,
+                with_payload=["chunk_index", "chunk_hash"],
+                with_vectors=False,
+            )
+            for record in records:
+                payload = record.payload or {}
+                if "chunk_hash" not in payload:
+                    continue
+                chunk_index = int(payload["chunk_index"])
+                if str(record.id) == chunk_point_id(canonical_url, chunk_index):
+                    hashes[chunk_index] = str(payload["chunk_hash"])
+            if offset is None:
+                return hashes
+
+    async def get_chunk_vectors(
+        self, canonical_url: str, chunk_indexes: Sequence[int]
+    ) -> dict[int, npt.NDArray[np.float32]]:
+        """
+        Fetch the stored vectors of specific chunks of a document.
+
+        Args:
+            canonical_url: Canonical URL of the document
+            chunk_indexes: Chunk positions to fetch
+
+        Returns:
+            Mapping of chunk index to float32 vector for the chunks that exist
+        """
+        records = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[chunk_point_id(canonical_url, index) for index in chunk_indexes],
+            with_payload=["chunk_index"],
+            with_vectors=True,
+        )
+        return {
+            int((record.payload or {})["chunk_index"]): np.asarray(record.vector, dtype=np.float32)
+            for record in records
+            if record.vector is not None
+        }
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_exception_type(httpx.HTTPError),
+        before=before_log(logger, logging.WARNING),  # type: ignore[arg-type]
+        reraise=True,
+    )
+    async def delete_document(self, canonical_url: str) -> None:
+        """
+        Delete every point of a document.
+
+        Args:
+            canonical_url: Canonical URL of the document
+        """
+        await self._delete_stale_points(canonical_url, keep_ids=[])
+        logger.info("Deleted document points", collection=self.collection_name, url=canonical_url)
+
+    async def _delete_stale_points(self, canonical_url: str, keep_ids: list[Any]) -> None:
+        """
+        Delete points of a document that are not part of its current version.
+
+        Args:
+            canonical_url: Canonical URL of the document
+            keep_ids: Point IDs just upserted for the document
+        """
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[
+                        FieldCondition(key="canonical_url", match=MatchValue(value=canonical_url))
+                    ],
+                    must_not=[HasIdCondition(has_id=keep_ids)] if keep_ids else None,
+                )
+            ),
+        )
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -252,6 +789,7 @@ class VectorStore:
         language: str | None = None,
         country: str | None = None,
         is_mobile: bool | None = None,
+        count_mode: CountMode = CountMode.NONE,
     ) -> tuple[list[dict[str, Any]], int]:
         """
         Search for similar vectors with optional filters and automatic retry on HTTP errors.
@@ -264,6 +802,10 @@ class VectorStore:
             language: Filter by language code
             country: Filter by country code
             is_mobile: Filter by mobile flag
+            count_mode: How the total is obtained. ``NONE`` skips the count
+                request and reports the lower bound ``offset + len(results)``;
+                ``APPROXIMATE`` and ``EXACT`` count in Qdrant alongside the
+                search; ``CACHED`` reuses an exact count per filter set
 
         Returns:
             Tuple of (results, total_count)
@@ -304,28 +846,42 @@ class VectorStore:
 
         query_filter = Filter(must=list(must_conditions)) if must_conditions else None
 
-        # Search
+        filter_key = (domain, language, country, is_mobile)
+        cached_total = self._cached_count(filter_key) if count_mode == CountMode.CACHED else None
+        count_needed = count_mode != CountMode.NONE and cached_total is None
+
+        # Search, counting concurrently when the total is needed
         try:
-            results = await self.client.search(
+            search_request = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
                 query_filter=query_filter,
                 limit=limit,
                 offset=offset,
+                search_params=self._search_params,
             )
-
-            total_resp = await self.client.count(
-                collection_name=self.collection_name,
-                filter=query_filter,
-                exact=True,
-            )
-            total_count = int(getattr(total_resp, "count", len(results)))
+            if count_needed:
+                results, total_resp = await asyncio.gather(
+                    search_request,
+                    self.client.count(
+                        collection_name=self.collection_name,
+                        filter=query_filter,
+                        exact=count_mode != CountMode.APPROXIMATE,
+                    ),
+                )
+                total_count = int(getattr(total_resp, "count", len(results)))
+                if count_mode == CountMode.CACHED:
+                    self._store_count(filter_key, total_count)
+            else:
+                results = await search_request
+                total_count = cached_total if cached_total is not None else offset + len(results)
 
             logger.info(
                 "Vector search completed",
                 results=len(results),
                 filters=len(must_conditions),
                 total=total_count,
+                count_mode=count_mode.value,
             )
 
             # Convert to dict format
@@ -344,6 +900,22 @@ class VectorStore:
             logger.error("Vector search failed", error=error_message)
             raise
 
+    def _cached_count(self, filter_key: tuple[Any, ...]) -> int | None:
+        entry = self._count_cache.get(filter_key)
+        if entry is None:
+            return None
+        expires, total = entry
+        if expires <= time.monotonic():
+            del self._count_cache[filter_key]
+            return None
+        return total
+
+    def _store_count(self, filter_key: tuple[Any, ...], total: int) -> None:
+        self._count_cache.pop(filter_key, None)
+        self._count_cache[filter_key] = (time.monotonic() + self.count_cache_ttl, total)
+        while len(self._count_cache) > _COUNT_CACHE_MAX_ENTRIES:
+            del self._count_cache[next(iter(self._count_cache))]
+
     async def count_points(self) -> int:
         """
         Get total number of points in collection.
@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import Any, ClassVar
 from uuid import uuid4
 
+import numpy as np
 import pytest
 import pytest_asyncio
 from dotenv import dotenv_values, load_dotenv
@@ -253,10 +254,10 @@ class InMemoryEmbeddingService:
     async def embed_single(self, text: str) -> list[float]:
         return self._embed_text(text)
 
-    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        return [self._embed_text(text) for text in texts]
+    async def embed_batch(self, texts: list[str]) -> np.ndarray:
+        return np.array([self._embed_text(text) for text in texts], dtype=np.float32)
 
-    async def embed(self, text_or_texts: str | list[str]) -> list[float] | list[list[float]]:
+    async def embed(self, text_or_texts: str | list[str]) -> list[float] | np.ndarray:
         if isinstance(text_or_texts, list):
             return await self.embed_batch(text_or_texts)
         return await self.embed_single(text_or_texts)
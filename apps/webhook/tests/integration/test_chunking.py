@@ -102,6 +102,16 @@ def test_chunk_token_count_accuracy(chunker: TextChunker) -> None:
     assert chunks[0]["token_count"] < 50
 
 
+def test_chunk_token_counts_and_offsets(chunker: TextChunker, long_text: str) -> None:
+    """Test token counts match tokenizing each chunk and offsets locate it in the text."""
+    chunks = chunker.chunk_text(long_text)
+
+    for chunk in chunks:
+        assert long_text[chunk["char_start"] : chunk["char_end"]] == chunk["text"]
+        encoding = chunker.tokenizer.encode(chunk["text"], add_special_tokens=False)
+        assert chunk["token_count"] == len(encoding.ids)
+
+
 def test_chunk_overlap(chunker: TextChunker) -> None:
     """Test that overlap works correctly."""
     # Create text that will span multiple chunks
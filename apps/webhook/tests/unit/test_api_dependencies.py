@@ -15,6 +15,7 @@ import api.deps as deps
 def reset_singletons() -> Generator[None]:
     """Reset all singleton instances between tests."""
     deps._text_chunker = None
+    deps._chunking_pool = None
     deps._embedding_service = None
     deps._vector_store = None
     deps._bm25_engine = None
@@ -25,6 +26,7 @@ def reset_singletons() -> Generator[None]:
     yield
     # Reset again after test
     deps._text_chunker = None
+    deps._chunking_pool = None
     deps._embedding_service = None
     deps._vector_store = None
     deps._bm25_engine = None
@@ -95,13 +97,15 @@ def test_get_indexing_service_singleton() -> None:
     """Test IndexingService (stubbed in test_mode) is a singleton."""
 
     chunker = deps.get_text_chunker()
+    chunking_pool = deps.get_chunking_pool(chunker)
     embedding = deps.get_embedding_service()
     vector_store = deps.get_vector_store()
     bm25 = deps.get_bm25_engine()
 
-    service1 = deps.get_indexing_service(chunker, embedding, vector_store, bm25)
-    service2 = deps.get_indexing_service(chunker, embedding, vector_store, bm25)
+    service1 = deps.get_indexing_service(chunker, embedding, vector_store, bm25, chunking_pool)
+    service2 = deps.get_indexing_service(chunker, embedding, vector_store, bm25, chunking_pool)
 
+    assert deps.get_chunking_pool(chunker) is chunking_pool
     assert service1 is service2
 
 
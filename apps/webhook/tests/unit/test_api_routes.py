@@ -57,6 +57,7 @@ def mock_services() -> dict[str, Any]:
 
     vector_store = AsyncMock()
     vector_store.health_check.return_value = True
+    vector_store.payload_index_status.return_value = {"domain": "indexed"}
     vector_store.count_points.return_value = 100
     vector_store.collection_name = "test_collection"  # Add this for stats
 
@@ -291,6 +292,24 @@ async def test_health_check_partial_failure(mock_services: dict[str, Any]) -> No
         assert response.services["tei"] == "unhealthy"
 
 
+@pytest.mark.asyncio
+async def test_health_check_reports_missing_payload_indexes(mock_services: dict[str, Any]) -> None:
+    """Test missing Qdrant payload indexes degrade the health status."""
+    mock_services["vector_store"].payload_index_status.return_value = {
+        "domain": "indexed",
+        "content_id": "missing",
+    }
+
+    with patch("api.deps.get_redis_connection"):
+        response = await health.health_check(
+            mock_services["embedding"],
+            mock_services["vector_store"],
+        )
+
+    assert response.status == "degraded"
+    assert response.services["qdrant_payload_indexes"] == "unhealthy: content_id missing"
+
+
 @pytest.mark.asyncio
 async def test_get_stats_success(mock_services: dict[str, Any]) -> None:
     """Test stats endpoint success."""
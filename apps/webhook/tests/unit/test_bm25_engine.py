@@ -2,11 +2,16 @@
 Unit tests for BM25Engine.
 """
 
+import json
+import pickle
+import random
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from services.bm25_engine import BM25Engine
+from services.bm25_segments import read_manifest, write_segment
 
 
 @pytest.fixture
@@ -15,13 +20,43 @@ def temp_index_path(tmp_path: Path) -> str:
     return str(tmp_path / "test_index.pkl")
 
 
+def _postings(engine: BM25Engine, term: str) -> dict[int, int]:
+    """Collect a term's postings across segments as global id -> term frequency."""
+    view = engine._view
+    postings: dict[int, int] = {}
+    for segment, base in zip(view.segments, view.bases, strict=True):
+        start, end = segment.postings_range(term)
+        for local_id, tf in zip(segment.doc_ids[start:end], segment.tfs[start:end], strict=True):
+            postings[base + local_id] = tf
+    return postings
+
+
 def test_init_creates_directory(temp_index_path: str) -> None:
     """Test initialization creates data directory."""
     engine = BM25Engine(index_path=temp_index_path)
 
     assert Path(temp_index_path).parent.exists()
-    assert engine.corpus == []
-    assert engine.bm25 is None
+    assert len(engine.corpus) == 0
+    assert engine.get_document_count() == 0
+
+
+def test_unsupported_manifest_version_starts_empty(temp_index_path: str) -> None:
+    """Test an index from another format version neither fails startup nor is overwritten."""
+    BM25Engine(index_path=temp_index_path).index_document(
+        text="Machine learning", metadata={"url": "https://example.com"}
+    )
+    manifest_path = Path(temp_index_path).with_suffix("") / "manifest.json"
+    data = json.loads(manifest_path.read_text())
+    data["version"] = 99
+    manifest_path.write_text(json.dumps(data))
+
+    engine = BM25Engine(index_path=temp_index_path)
+
+    assert engine.get_document_count() == 0
+    assert engine.search("machine")[0] == []
+    # Writes are refused rather than replacing the newer index
+    engine.index_document(text="Other", metadata={"url": "https://other.com"})
+    assert json.loads(manifest_path.read_text()) == data
 
 
 def test_tokenize() -> None:
@@ -45,7 +80,8 @@ def test_index_first_document(temp_index_path: str) -> None:
     assert len(engine.corpus) == 1
     assert engine.corpus[0] == "Machine learning is awesome"
     assert engine.metadata[0]["url"] == "https://example.com"
-    assert engine.bm25 is not None
+    assert _postings(engine, "machine") == {0: 1}
+    assert engine._view.total_length == 4
 
 
 def test_index_multiple_documents(temp_index_path: str) -> None:
@@ -107,6 +143,35 @@ def test_search_no_matches(temp_index_path: str) -> None:
     assert isinstance(results, list)
 
 
+def test_index_updates_postings_incrementally(temp_index_path: str) -> None:
+    """Test indexing adds a new segment without touching existing ones."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_document("alpha beta beta", {"url": "url1"})
+    first_segment = engine._view.segments[0]
+
+    engine.index_document("beta gamma", {"url": "url2"})
+
+    assert engine._view.segments[0] is first_segment
+    assert _postings(engine, "alpha") == {0: 1}
+    assert _postings(engine, "beta") == {0: 2, 1: 1}
+    assert _postings(engine, "gamma") == {1: 1}
+    assert engine._view.total_length == 5
+
+
+def test_search_only_matches_documents_with_query_terms(temp_index_path: str) -> None:
+    """Test documents without any query term are not scored or counted."""
+    engine = BM25Engine(index_path=temp_index_path)
+    engine.index_document("machine learning basics", {"url": "url1"})
+    engine.index_document("cooking recipes", {"url": "url2"})
+    engine.index_document("machine shop tools", {"url": "url3"})
+
+    results, total = engine.search("machine", limit=10)
+
+    assert total == 2
+    assert {r["metadata"]["url"] for r in results} == {"url1", "url3"}
+    assert all(r["score"] > 0 for r in results)
+
+
 def test_search_with_domain_filter(temp_index_path: str) -> None:
     """Test search with domain filter."""
     engine = BM25Engine(index_path=temp_index_path)
@@ -158,6 +223,7 @@ def test_persistence(temp_index_path: str) -> None:
     assert len(engine2.corpus) == 1
     assert engine2.corpus[0] == "test document"
     assert engine2.get_document_count() == 1
+    assert _postings(engine2, "document") == {0: 1}
 
 
 def test_get_document_count(temp_index_path: str) -> None:
@@ -171,3 +237,319 @@ def test_get_document_count(temp_index_path: str) -> None:
 
     engine.index_document("doc2", {"url": "url2"})
     assert engine.get_document_count() == 2
+
+
+def test_index_document_appends_small_segment(temp_index_path: str) -> None:
+    """Test each document is persisted as its own segment, not a full rewrite."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_document("first document", {"url": "url1"})
+    engine.index_document("second document", {"url": "url2"})
+
+    manifest = read_manifest(engine.index_dir)
+
+    assert manifest is not None
+    assert [segment.doc_count for segment in manifest.segments] == [1, 1]
+    assert manifest.generation == 2
+    assert not Path(temp_index_path).exists()
+
+
+def test_merge_segments_compacts_and_preserves_order(temp_index_path: str) -> None:
+    """Test merging replaces small segments with one and keeps document order."""
+    engine = BM25Engine(index_path=temp_index_path, merge_factor=3, background_merge=False)
+    for i in range(3):
+        engine.index_document(f"document number{i}", {"url": f"url{i}"})
+    old_files = {segment.name for segment in read_manifest(engine.index_dir).segments}
+
+    assert engine.merge_segments() == 1
+
+    manifest = read_manifest(engine.index_dir)
+    assert [segment.doc_count for segment in manifest.segments] == [3]
+    assert not any((engine.index_dir / name).exists() for name in old_files)
+
+    reloaded = BM25Engine(index_path=temp_index_path, background_merge=False)
+    assert [meta["url"] for meta in reloaded.metadata] == ["url0", "url1", "url2"]
+
+
+def test_background_merge_runs_after_save(temp_index_path: str) -> None:
+    """Test a background merge is triggered once enough segments accumulate."""
+    engine = BM25Engine(index_path=temp_index_path, merge_factor=2)
+    engine.index_document("doc one", {"url": "url1"})
+    engine.index_document("doc two", {"url": "url2"})
+
+    assert engine._merge_thread is not None
+    engine._merge_thread.join(timeout=5)
+
+    manifest = read_manifest(engine.index_dir)
+    assert [segment.doc_count for segment in manifest.segments] == [2]
+
+
+def test_legacy_pickle_is_migrated(temp_index_path: str) -> None:
+    """Test an existing pickle index is converted into a segment on load."""
+    with open(temp_index_path, "wb") as f:
+        pickle.dump(
+            {
+                "corpus": ["legacy document"],
+                "tokenized_corpus": [["legacy", "document"]],
+                "metadata": [{"url": "url1"}],
+            },
+            f,
+        )
+
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+
+    assert list(engine.corpus) == ["legacy document"]
+    assert _postings(engine, "legacy") == {0: 1}
+    assert read_manifest(engine.index_dir) is not None
+    assert not Path(temp_index_path).exists()
+    assert Path(f"{temp_index_path}.migrated").exists()
+
+
+def test_save_retries_pending_segment_after_lock_timeout(temp_index_path: str) -> None:
+    """Test a segment that missed the manifest swap is published on the next save."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+
+    with patch.object(engine, "_acquire_lock", side_effect=TimeoutError):
+        engine.index_document("first document", {"url": "url1"})
+    assert read_manifest(engine.index_dir) is None
+
+    engine.index_document("second document", {"url": "url2"})
+
+    manifest = read_manifest(engine.index_dir)
+    assert manifest is not None
+    assert manifest.doc_count == 2
+
+
+def test_sees_documents_indexed_by_other_process(temp_index_path: str) -> None:
+    """Test a second engine on the same index picks up new segments without reloading."""
+    reader = BM25Engine(index_path=temp_index_path, background_merge=False)
+    writer = BM25Engine(index_path=temp_index_path, background_merge=False)
+
+    writer.index_document("shared document", {"url": "url1"})
+
+    with patch.object(reader, "_load_index") as mock_load:
+        results, total = reader.search("shared")
+
+    mock_load.assert_not_called()
+    assert total == 1
+    assert results[0]["metadata"]["url"] == "url1"
+
+
+def test_search_survives_concurrent_merge(temp_index_path: str) -> None:
+    """Test segments stay readable after another engine merges and deletes them."""
+    reader = BM25Engine(index_path=temp_index_path, merge_factor=2, background_merge=False)
+    writer = BM25Engine(index_path=temp_index_path, merge_factor=2, background_merge=False)
+    writer.index_document("first doc", {"url": "url1"})
+    writer.index_document("second doc", {"url": "url2"})
+    reader.get_document_count()
+    old_view = reader._view
+
+    assert writer.merge_segments() == 1
+
+    assert [old_view.locate(i)[0].text(old_view.locate(i)[1]) for i in range(2)] == [
+        "first doc",
+        "second doc",
+    ]
+    results, total = reader.search("doc")
+    assert total == 2
+    assert len(reader._view.segments) == 1
+
+
+def _zipf_corpus(doc_count: int, seed: int = 7) -> list[tuple[str, dict[str, str]]]:
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(200)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    return [
+        (
+            " ".join(rng.choices(vocab, weights, k=rng.randint(5, 40))),
+            {"url": f"url{i}", "language": "en" if i % 3 else "de"},
+        )
+        for i in range(doc_count)
+    ]
+
+
+def test_pruned_search_matches_exhaustive_ranking(temp_index_path: str) -> None:
+    """Test MaxScore pruning returns the same top-k as exhaustive scoring."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    corpus = _zipf_corpus(600)
+    engine.index_documents(corpus[:250])
+    engine.index_documents(corpus[250:])
+
+    for query in ["w0 w5 w120", "w3 w3 w77", "w1 w2 w3 w4", "w199"]:
+        for offset in (0, 7):
+            pruned, _ = engine.search(query, limit=10, offset=offset)
+            exact, _ = engine.search(query, limit=10, offset=offset, exact_total=True)
+
+            assert [r["index"] for r in pruned] == [r["index"] for r in exact]
+            assert [r["score"] for r in pruned] == pytest.approx([r["score"] for r in exact])
+
+        filtered, _ = engine.search(query, limit=5, language="de")
+        filtered_exact, _ = engine.search(query, limit=5, language="de", exact_total=True)
+        assert [r["index"] for r in filtered] == [r["index"] for r in filtered_exact]
+
+
+def test_total_is_exact_when_fewer_matches_than_limit(temp_index_path: str) -> None:
+    """Test total counts every match when the top-k never fills."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_documents(_zipf_corpus(300))
+    engine.index_document("needle haystack", {"url": "a"})
+    engine.index_document("needle", {"url": "b"})
+
+    results, total = engine.search("needle", limit=10)
+
+    assert total == 2
+    assert len(results) == 2
+
+
+def test_estimated_total_is_bounded_by_document_frequencies(temp_index_path: str) -> None:
+    """Test the estimated total stays between max and sum of term frequencies."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_documents(_zipf_corpus(500))
+
+    _, estimated = engine.search("w0 w40", limit=5)
+    _, exact = engine.search("w0 w40", limit=5, exact_total=True)
+    doc_freqs = [len(_postings(engine, term)) for term in ("w0", "w40")]
+
+    assert max(doc_freqs) <= estimated <= sum(doc_freqs)
+    assert abs(estimated - exact) <= 0.1 * exact
+
+
+def test_index_documents_writes_single_segment(temp_index_path: str) -> None:
+    """Test bulk indexing appends one segment and skips empty texts."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+
+    indexed = engine.index_documents([("one", {}), ("  ", {}), ("two", {})])
+
+    assert indexed == 2
+    assert engine.get_document_count() == 2
+    assert len(engine._view.segments) == 1
+
+
+def test_filtered_search_matches_exhaustive_ranking(temp_index_path: str) -> None:
+    """Test filter-postings search agrees with exhaustive scoring for broad and narrow filters."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    corpus = [
+        (
+            text,
+            {**meta, "domain": "rare.com" if i % 50 == 0 else "common.com", "isMobile": i % 2 == 0},
+        )
+        for i, (text, meta) in enumerate(_zipf_corpus(600))
+    ]
+    engine.index_documents(corpus[:300])
+    engine.index_documents(corpus[300:])
+
+    for filters in (
+        {"domain": "common.com"},
+        {"domain": "rare.com"},
+        {"domain": "common.com", "language": "de", "is_mobile": True},
+        {"domain": "missing.com"},
+    ):
+        for query in ("w0 w5 w120", "w1 w2 w3"):
+            pruned, pruned_total = engine.search(query, limit=5, **filters)
+            exact, exact_total = engine.search(query, limit=5, exact_total=True, **filters)
+
+            assert [r["index"] for r in pruned] == [r["index"] for r in exact]
+            assert all(r["metadata"]["domain"] == filters["domain"] for r in pruned)
+            if len(pruned) < 5:
+                assert pruned_total == exact_total
+
+
+def test_filtered_search_does_not_decode_metadata_of_candidates(temp_index_path: str) -> None:
+    """Test filters are resolved from filter postings, not per-document metadata."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_documents(
+        [(f"shared doc {i}", {"url": f"url{i}", "domain": f"d{i % 10}.com"}) for i in range(100)]
+    )
+    segment = engine._view.segments[0]
+
+    with patch.object(
+        type(segment), "metadata", autospec=True, wraps=type(segment).metadata
+    ) as meta:
+        results, total = engine.search("shared", limit=3, domain="d3.com")
+
+    assert total == 10
+    assert meta.call_count == len(results) == 3
+
+
+def test_reindexing_url_replaces_previous_version(temp_index_path: str) -> None:
+    """Test re-crawling a canonical URL keeps only the latest version searchable."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_document(
+        "stale pricing page", {"url": "https://a.com/p?utm=x", "canonical_url": "https://a.com/p"}
+    )
+    engine.index_document(
+        "fresh pricing page", {"url": "https://a.com/p", "canonical_url": "https://a.com/p"}
+    )
+    engine.index_document("other page", {"url": "https://a.com/q"})
+
+    assert engine.get_document_count() == 2
+    assert engine.search("stale") == ([], 0)
+    results, total = engine.search("pricing")
+    assert total == 1
+    assert results[0]["text"] == "fresh pricing page"
+
+
+def test_batch_upsert_keeps_last_version_of_key(temp_index_path: str) -> None:
+    """Test duplicates within one batch collapse to the last document."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+
+    engine.index_documents([("first draft", {"url": "url1"}), ("final draft", {"url": "url1"})])
+
+    assert engine.get_document_count() == 1
+    results, _ = engine.search("draft")
+    assert [r["text"] for r in results] == ["final draft"]
+
+
+def test_delete_document_tombstones_all_versions(temp_index_path: str) -> None:
+    """Test deleting a URL hides it from search and counts."""
+    engine = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_document("keep me", {"url": "url1"})
+    engine.index_document("drop me", {"url": "url2"})
+
+    assert engine.delete_document("url2") == 1
+    assert engine.delete_document("url2") == 0
+
+    assert engine.get_document_count() == 1
+    assert engine.search("drop") == ([], 0)
+    assert engine.search("me", exact_total=True)[1] == 1
+
+
+def test_merge_drops_tombstoned_documents(temp_index_path: str) -> None:
+    """Test compaction physically removes dead documents and their sidecars."""
+    engine = BM25Engine(index_path=temp_index_path, merge_factor=10, background_merge=False)
+    for version in range(3):
+        engine.index_document(f"version {version}", {"url": "url1"})
+    engine.index_document("another document", {"url": "url2"})
+
+    while engine.merge_segments():
+        pass
+
+    manifest = read_manifest(engine.index_dir)
+    assert manifest.doc_count == manifest.live_count == 2
+    assert not list(engine.index_dir.glob("*.del"))
+    assert [meta["url"] for meta in engine.metadata] == ["url1", "url2"]
+    assert engine.search("version")[0][0]["text"] == "version 2"
+
+
+def test_merge_carries_over_concurrent_deletes(temp_index_path: str) -> None:
+    """Test documents deleted while a merge runs stay deleted after it."""
+    engine = BM25Engine(
+        index_path=temp_index_path, merge_factor=2, background_merge=False, max_deleted_ratio=1.0
+    )
+    other = BM25Engine(index_path=temp_index_path, background_merge=False)
+    engine.index_document("doc one", {"url": "url1"})
+    engine.index_document("doc two", {"url": "url2"})
+
+    original_write_segment = write_segment
+
+    def write_then_delete(*args, **kwargs):  # type: ignore[no-untyped-def]
+        info = original_write_segment(*args, **kwargs)
+        other.delete_document("url1")
+        return info
+
+    with patch("services.bm25_engine.write_segment", side_effect=write_then_delete):
+        assert engine.merge_segments() == 1
+
+    manifest = read_manifest(engine.index_dir)
+    assert len(manifest.segments) == 1
+    assert (manifest.doc_count, manifest.live_count) == (2, 1)
+    assert [r["metadata"]["url"] for r in engine.search("doc")[0]] == ["url2"]
@@ -0,0 +1,191 @@
+"""
+Unit tests for the BM25 segment storage format.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from services.bm25_segments import (
+    Manifest,
+    Segment,
+    SegmentInfo,
+    read_deletes,
+    read_manifest,
+    select_expunge,
+    select_merge,
+    write_deletes,
+    write_manifest,
+    write_segment,
+)
+
+
+def _segments(*doc_counts: int) -> list[SegmentInfo]:
+    return [
+        SegmentInfo(name=f"seg_{i}", doc_count=n, size_bytes=0) for i, n in enumerate(doc_counts)
+    ]
+
+
+def test_write_and_read_segment_roundtrip(tmp_path: Path) -> None:
+    """Test documents survive a segment roundtrip in order."""
+    documents = [("first doc", {"url": "url1"}), ("zweites Dokument ü", {"url": "url2"})]
+
+    info = write_segment(tmp_path, documents, str.split)
+    segment = Segment(tmp_path / info.name)
+
+    assert info.doc_count == 2
+    assert info.size_bytes == (tmp_path / info.name).stat().st_size
+    assert list(segment.documents()) == documents
+    assert list(segment.doc_lengths) == [2, 3]
+    assert segment.total_length == 5
+
+
+def test_segment_postings_are_memory_mapped(tmp_path: Path) -> None:
+    """Test postings are zero-copy views over the mapped file."""
+    documents = [("b a a", {}), ("c a", {}), ("d", {})]
+    info = write_segment(tmp_path, documents, str.split)
+
+    segment = Segment(tmp_path / info.name)
+    start, end = segment.postings_range("a")
+
+    assert isinstance(segment.doc_ids, memoryview)
+    assert segment.doc_ids.readonly
+    assert list(segment.doc_ids[start:end]) == [0, 1]
+    assert list(segment.tfs[start:end]) == [2, 1]
+    assert segment.postings_range("zzz") == (0, 0)
+    assert [segment.find_term(t) for t in ("a", "b", "c", "d", "0", "e")] == [
+        0,
+        1,
+        2,
+        3,
+        None,
+        None,
+    ]
+
+
+def test_segment_lookup_returns_score_bound_stats(tmp_path: Path) -> None:
+    """Test lookup reports the max term frequency and min length per term."""
+    documents = [("a a b", {}), ("a c c c d", {}), ("b", {})]
+
+    segment = Segment(tmp_path / write_segment(tmp_path, documents, str.split).name)
+
+    assert segment.lookup("a") == (0, 2, 2, 3)
+    assert segment.lookup("b") == (2, 4, 1, 1)
+    assert segment.lookup("missing") is None
+
+
+def test_segment_filter_postings(tmp_path: Path) -> None:
+    """Test filter postings list matching local ids per metadata value."""
+    documents = [
+        ("a", {"domain": "x.com", "isMobile": True}),
+        ("b", {"domain": "y.com", "isMobile": False}),
+        ("c", {"domain": "x.com", "language": "en"}),
+    ]
+
+    segment = Segment(tmp_path / write_segment(tmp_path, documents, str.split).name)
+
+    assert list(segment.filter_postings("domain", "x.com")) == [0, 2]
+    assert list(segment.filter_postings("isMobile", True)) == [0]
+    assert list(segment.filter_postings("isMobile", "true")) == []
+    assert list(segment.filter_postings("language", "de")) == []
+
+
+def test_segment_filter_bitmap_is_cached(tmp_path: Path) -> None:
+    """Test filter bitmaps mark matching local ids and are built once per value."""
+    documents = [
+        ("a", {"domain": "x.com"}),
+        ("b", {"domain": "y.com"}),
+        ("c", {"domain": "x.com"}),
+    ]
+
+    segment = Segment(tmp_path / write_segment(tmp_path, documents, str.split).name)
+
+    bitmap = segment.filter_bitmap("domain", "x.com")
+    assert bitmap == b"\x01\x00\x01"
+    assert segment.filter_bitmap("domain", "x.com") is bitmap
+    assert segment.filter_bitmap("domain", "z.com") == b"\x00\x00\x00"
+
+
+def test_segment_document_keys_prefer_canonical_url(tmp_path: Path) -> None:
+    """Test documents are keyed by canonical URL, falling back to URL."""
+    documents = [
+        ("a", {"url": "https://x.com/a?ref=1", "canonical_url": "https://x.com/a"}),
+        ("b", {"url": "https://x.com/b"}),
+        ("c", {"url": "https://x.com/a", "canonical_url": "https://x.com/a"}),
+        ("d", {}),
+    ]
+
+    segment = Segment(tmp_path / write_segment(tmp_path, documents, str.split).name)
+
+    assert {key: list(ids) for key, ids in segment.document_keys()} == {
+        "https://x.com/a": [0, 2],
+        "https://x.com/b": [1],
+    }
+
+
+def test_deletes_roundtrip(tmp_path: Path) -> None:
+    """Test tombstone sidecars are versioned by generation and reflected in the manifest entry."""
+    info = write_segment(tmp_path, [("a", {}), ("b", {}), ("c", {})], str.split)
+
+    updated = write_deletes(tmp_path, info, {2, 0}, generation=5)
+
+    assert updated.deletes == f"{info.name}.5.del"
+    assert updated.live_count == 1
+    assert list(read_deletes(tmp_path, updated)) == [0, 2]
+    assert list(read_deletes(tmp_path, info)) == []
+    assert SegmentInfo.from_dict(updated.to_dict()) == updated
+
+
+def test_manifest_roundtrip(tmp_path: Path) -> None:
+    """Test manifest is persisted atomically with no temp files left behind."""
+    assert read_manifest(tmp_path) is None
+
+    write_manifest(tmp_path, Manifest(generation=3, segments=_segments(1, 2)))
+
+    manifest = read_manifest(tmp_path)
+    assert manifest is not None
+    assert manifest.generation == 3
+    assert manifest.doc_count == 3
+    assert [p.name for p in tmp_path.iterdir()] == ["manifest.json"]
+
+
+def test_manifest_rejects_unknown_version(tmp_path: Path) -> None:
+    """Test a manifest from another format version is refused instead of misread."""
+    write_manifest(tmp_path, Manifest(generation=1, segments=_segments(1)))
+    path = tmp_path / "manifest.json"
+    data = json.loads(path.read_text())
+    data["version"] = 99
+    path.write_text(json.dumps(data))
+
+    with pytest.raises(ValueError, match="manifest version 99"):
+        read_manifest(tmp_path)
+
+
+def test_select_merge_waits_for_merge_factor() -> None:
+    """Test no merge is selected until enough same-tier segments exist."""
+    assert select_merge(_segments(1, 1), merge_factor=3) is None
+    assert select_merge(_segments(1, 1, 1), merge_factor=3) == (0, 3)
+
+
+def test_select_merge_only_merges_trailing_tier() -> None:
+    """Test larger segments are left alone while small ones are merged."""
+    segments = _segments(100, 1, 1, 1)
+
+    assert select_merge(segments, merge_factor=3) == (1, 4)
+
+
+def test_select_merge_cascades_to_higher_tiers() -> None:
+    """Test merged segments of the same tier are merged again."""
+    assert select_merge(_segments(3, 3, 3), merge_factor=3) == (0, 3)
+    assert select_merge(_segments(9, 3, 3), merge_factor=3) is None
+
+
+def test_select_expunge_picks_most_deleted_segment() -> None:
+    """Test segments over the tombstone ratio are rewritten, worst first."""
+    segments = _segments(10, 10, 10)
+    segments[0].deleted_count = 3
+    segments[2].deleted_count = 8
+
+    assert select_expunge(segments, 0.3) == (2, 3)
+    assert select_expunge(segments, 0.9) is None
@@ -0,0 +1,98 @@
+"""
+Unit tests for the chunking pool.
+"""
+
+import os
+import threading
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.chunking_pool import STATS_TTL_SECONDS, ChunkingPool, published_stats
+
+
+def _chunker() -> MagicMock:
+    """Chunker recording the thread each call ran on."""
+    chunker = MagicMock()
+    chunker.threads = []
+
+    def chunk_text(text: str, metadata: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        chunker.threads.append(threading.current_thread().name)
+        return [{"text": text, "chunk_index": 0, **(metadata or {})}]
+
+    chunker.chunk_text.side_effect = chunk_text
+    return chunker
+
+
+def _shout(text_chunker: Any, text: str) -> str:
+    return text.upper()
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_runs_off_the_event_loop() -> None:
+    """Test cleaning and chunking run on pool threads with the shared chunker."""
+    chunker = _chunker()
+    pool = ChunkingPool(chunker, mode="thread", workers=2)
+    try:
+        cleaned = await pool.clean("  hello \n\n world  ")
+        chunks = await pool.chunk(cleaned, {"url": "https://example.com"})
+    finally:
+        pool.close()
+
+    assert cleaned == "hello world"
+    assert chunks == [{"text": "hello world", "chunk_index": 0, "url": "https://example.com"}]
+    assert chunker.threads[0].startswith("chunking")
+
+
+@pytest.mark.asyncio
+async def test_inline_pool_runs_on_the_caller() -> None:
+    """Test inline mode calls the chunker directly and passes it to run() functions."""
+    chunker = _chunker()
+    pool = ChunkingPool(chunker, mode="inline", workers=8)
+
+    await pool.chunk("text")
+
+    assert chunker.threads == [threading.current_thread().name]
+    assert await pool.run(_shout, "abc") == "ABC"
+    assert pool.workers == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_report_utilisation() -> None:
+    """Test stats count finished tasks and keep utilisation within capacity."""
+    pool = ChunkingPool(_chunker(), mode="thread", workers=2)
+    try:
+        for _ in range(3):
+            await pool.run(_shout, "abc")
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert stats["mode"] == "thread"
+    assert stats["workers"] == 2
+    assert stats["tasks"] == 3
+    assert stats["active"] == 0
+    assert stats["queued"] == 0
+    assert 0.0 <= stats["utilization"] <= 1.0
+
+
+def test_worker_stats_are_published_for_the_metrics_api() -> None:
+    """Test each worker process publishes its counters under an expiring key."""
+    store: dict[str, str] = {}
+    redis = MagicMock()
+    redis.set.side_effect = lambda key, value, ex: store.__setitem__(key, value)
+    redis.scan_iter.side_effect = lambda match: iter(
+        [key for key in store if key.startswith(match.rstrip("*"))]
+    )
+    redis.mget.side_effect = lambda keys: [store.get(key) for key in keys]
+    assert published_stats(redis) == []
+
+    pool = ChunkingPool(_chunker(), mode="inline")
+    pool.publish_stats(redis)
+
+    assert redis.set.call_args.kwargs["ex"] == STATS_TTL_SECONDS
+    (stats,) = published_stats(redis)
+    assert stats["worker"].endswith(f":{os.getpid()}")
+    assert stats["mode"] == "inline"
+    assert stats["tasks"] == 0
@@ -0,0 +1,104 @@
+"""
+Unit tests for the blue/green collection reindex.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from qdrant_client.models import Record
+
+from services.collection_reindex import reindex_collection
+
+
+@pytest.fixture
+def vector_store() -> MagicMock:
+    """Vector store serving a two-page collection."""
+    store = MagicMock()
+    store.collection_name = "docs"
+    store.vector_dim = 2
+    store.resolve_collection = AsyncMock(return_value="docs_old")
+    store.new_collection_name.return_value = "docs_new"
+    store.create_collection = AsyncMock()
+    store.finish_bulk_load = AsyncMock()
+    store.switch_alias = AsyncMock(return_value="docs_old")
+    store.client = AsyncMock()
+    store.client.get_collection.return_value = MagicMock(points_count=3)
+    store.client.get_collection.return_value.config.optimizer_config.indexing_threshold = 20000
+    store.client.scroll.side_effect = [
+        (
+            [
+                Record(id=1, payload={"text": "a", "url": "u1"}, vector=[1.0, 0.0]),
+                Record(id=2, payload={"url": "u2"}, vector=[0.0, 1.0]),
+            ],
+            "next",
+        ),
+        ([Record(id=3, payload={"text": "c", "url": "u3"}, vector=[0.5, 0.5])], None),
+    ]
+    return store
+
+
+@pytest.mark.asyncio
+async def test_reindex_loads_shadow_then_switches_alias(vector_store: MagicMock) -> None:
+    """Test points are re-embedded into a bulk-loaded shadow before the alias flips."""
+    embedding_service = AsyncMock()
+    embedding_service.embed_batch.side_effect = lambda texts: np.full(
+        (len(texts), 2), 0.25, dtype=np.float32
+    )
+
+    index_generation = MagicMock()
+
+    def switch_alias(target: str) -> str:
+        # Cached results must stay valid until the alias actually moves
+        index_generation.bump.assert_not_called()
+        return "docs_old"
+
+    vector_store.switch_alias.side_effect = switch_alias
+
+    summary = await reindex_collection(
+        vector_store, embedding_service, batch_size=2, index_generation=index_generation
+    )
+
+    assert summary == {
+        "source": "docs_old",
+        "target": "docs_new",
+        "points": 2,
+        "skipped": 1,
+        "previous_kept": "docs_old",
+    }
+    vector_store.create_collection.assert_awaited_once_with("docs_new", bulk_load=True)
+    upserted = [
+        point
+        for call in vector_store.client.upsert.call_args_list
+        for point in call.kwargs["points"]
+    ]
+    assert sorted(point.id for point in upserted) == [1, 3]
+    assert all(point.vector == [0.25, 0.25] for point in upserted)
+    vector_store.finish_bulk_load.assert_awaited_once_with(
+        "docs_new", indexing_threshold=20000, timeout=3600.0
+    )
+    vector_store.switch_alias.assert_awaited_once_with("docs_new")
+    index_generation.bump.assert_called_once_with()
+    vector_store.client.delete_collection.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reindex_reuses_vectors_and_rejects_wrong_dimension(
+    vector_store: MagicMock,
+) -> None:
+    """Test layout-only reindexes copy vectors and a size mismatch aborts before the switch."""
+    summary = await reindex_collection(
+        vector_store, AsyncMock(), batch_size=2, reuse_vectors=True, drop_old=True
+    )
+
+    assert summary["points"] == 3
+    vector_store.client.delete_collection.assert_awaited_once_with("docs_old")
+
+    vector_store.vector_dim = 3
+    vector_store.switch_alias.reset_mock()
+    vector_store.client.scroll.side_effect = [
+        ([Record(id=1, payload={"text": "a"}, vector=[1.0, 0.0])], None)
+    ]
+    with pytest.raises(ValueError, match="dimension 3"):
+        await reindex_collection(vector_store, AsyncMock(), reuse_vectors=True)
+    vector_store.switch_alias.assert_not_called()
@@ -0,0 +1,124 @@
+"""
+Unit tests for EmbeddingBatcher.
+"""
+
+import asyncio
+
+import pytest
+
+from services.embedding_batcher import EmbeddingBatcher
+
+
+class _FakeTEI:
+    """Records each request and embeds a text as [len(text)]."""
+
+    def __init__(self) -> None:
+        self.requests: list[list[str]] = []
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        self.requests.append(texts)
+        await asyncio.sleep(0)
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_are_coalesced() -> None:
+    """Test concurrent callers share one request and get their own vectors back."""
+    tei = _FakeTEI()
+    batcher = EmbeddingBatcher(tei.embed, max_batch_size=32, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher.submit(["a", "bb"]),
+        batcher.submit(["ccc"]),
+        batcher.submit(["dddd", "e"]),
+    )
+
+    assert tei.requests == [["a", "bb", "ccc", "dddd", "e"]]
+    assert results == [[[1.0], [2.0]], [[3.0]], [[4.0], [1.0]]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting() -> None:
+    """Test reaching the size limit flushes immediately and packs within limits."""
+    tei = _FakeTEI()
+    batcher = EmbeddingBatcher(tei.embed, max_batch_size=3, max_wait_ms=10_000)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit(["a", "b"]), batcher.submit(["c", "d"])),
+        timeout=1,
+    )
+
+    assert tei.requests == [["a", "b"], ["c", "d"]]
+    assert results == [[[1.0], [1.0]], [[1.0], [1.0]]]
+
+
+@pytest.mark.asyncio
+async def test_token_budget_bounds_batches() -> None:
+    """Test the token budget splits batches between requests."""
+    tei = _FakeTEI()
+    batcher = EmbeddingBatcher(tei.embed, max_batch_tokens=10, max_wait_ms=5, token_counter=len)
+
+    await asyncio.gather(batcher.submit(["x" * 6]), batcher.submit(["y" * 6]))
+
+    assert len(tei.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller() -> None:
+    """Test an embedding error is raised to all callers of the batch."""
+
+    async def failing(texts: list[str]) -> list[list[float]]:
+        raise RuntimeError("tei down")
+
+    batcher = EmbeddingBatcher(failing, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        batcher.submit(["a"]), batcher.submit(["b"]), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_cancels_its_callers() -> None:
+    """Test callers of a cancelled flush are cancelled instead of hanging."""
+    started = asyncio.Event()
+
+    async def embed(texts: list[str]) -> list[list[float]]:
+        started.set()
+        await asyncio.sleep(10)
+        return [[0.0] for _ in texts]
+
+    batcher = EmbeddingBatcher(embed, max_batch_size=1)
+    caller = asyncio.ensure_future(batcher.submit(["a"]))
+    await started.wait()
+
+    (flush,) = next(iter(batcher._states.values())).tasks
+    flush.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_texts_are_not_sent() -> None:
+    """Test a caller cancelled before the flush does not reach TEI."""
+    tei = _FakeTEI()
+    batcher = EmbeddingBatcher(tei.embed, max_batch_size=32, max_wait_ms=20)
+
+    cancelled = asyncio.ensure_future(batcher.submit(["gone"]))
+    kept = asyncio.ensure_future(batcher.submit(["kept"]))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    assert await kept == [[4.0]]
+    assert tei.requests == [["kept"]]
+
+
+def test_batcher_survives_event_loop_changes() -> None:
+    """Test the batcher works across asyncio.run() calls, as used by RQ jobs."""
+    tei = _FakeTEI()
+    batcher = EmbeddingBatcher(tei.embed, max_wait_ms=5)
+
+    assert asyncio.run(batcher.submit(["a"])) == [[1.0]]
+    assert asyncio.run(batcher.submit(["bb"])) == [[2.0]]
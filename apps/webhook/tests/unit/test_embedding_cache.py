@@ -0,0 +1,103 @@
+"""
+Unit tests for the embedding cache backends.
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import numpy as np
+import pytest
+
+from services.embedding import EmbeddingService
+from services.embedding_cache import (
+    RedisEmbeddingCache,
+    SQLiteEmbeddingCache,
+    pack_vector,
+    text_hash,
+    unpack_vector,
+)
+
+
+def test_pack_vector_roundtrip_float32() -> None:
+    """Test vectors are packed as 4-byte floats and restored."""
+    packed = pack_vector([0.5, -1.25, 3.0])
+
+    assert len(packed) == 12
+    assert pack_vector(np.array([0.5, -1.25, 3.0], dtype=np.float32)) == packed
+    vector = unpack_vector(packed)
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [0.5, -1.25, 3.0]
+
+
+def test_sqlite_cache_is_scoped_by_model(tmp_path: Path) -> None:
+    """Test entries are only returned for the model that produced them."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteEmbeddingCache(path=path, model="model-a")
+    cache.put_many({text_hash("footer"): np.array([0.5, 0.25], dtype=np.float32)})
+
+    found = cache.get_many([text_hash("footer"), text_hash("other")])
+    assert {key: vector.tolist() for key, vector in found.items()} == {
+        text_hash("footer"): [0.5, 0.25]
+    }
+    assert SQLiteEmbeddingCache(path=path, model="model-b").get_many([text_hash("footer")]) == {}
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    """Test the bound evicts entries that were not read recently."""
+    cache = SQLiteEmbeddingCache(
+        path=str(tmp_path / "cache.sqlite3"), model="m", max_entries=2, evict_interval=1
+    )
+    cache.put_many({"a": np.array([1.0], dtype=np.float32)})
+    cache.put_many({"b": np.array([2.0], dtype=np.float32)})
+    cache.get_many(["a"])
+    cache.put_many({"c": np.array([3.0], dtype=np.float32)})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+def test_sqlite_cache_checks_bound_every_evict_interval(tmp_path: Path) -> None:
+    """Test the bound is enforced once per evict_interval writes, not on every write."""
+    cache = SQLiteEmbeddingCache(
+        path=str(tmp_path / "cache.sqlite3"), model="m", max_entries=1, evict_interval=3
+    )
+    cache.put_many({"a": np.array([1.0], dtype=np.float32)})
+    cache.put_many({"b": np.array([2.0], dtype=np.float32)})
+
+    assert set(cache.get_many(["a", "b"])) == {"a", "b"}
+
+    cache.put_many({"c": np.array([3.0], dtype=np.float32)})
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"c"}
+
+
+def test_redis_cache_treats_errors_as_miss() -> None:
+    """Test an unavailable Redis never fails embedding."""
+    redis = MagicMock()
+    redis.mget.side_effect = ConnectionError("redis down")
+    redis.pipeline.side_effect = ConnectionError("redis down")
+    cache = RedisEmbeddingCache(redis=redis, model="m")
+
+    assert cache.get_many(["a"]) == {}
+    cache.put_many({"a": np.array([1.0], dtype=np.float32)})
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_only_sends_misses(tmp_path: Path) -> None:
+    """Test cached texts are skipped, duplicates sent once and order preserved."""
+    cache = SQLiteEmbeddingCache(path=str(tmp_path / "cache.sqlite3"), model="m")
+    cache.put_many({text_hash("nav"): np.array([0.5, 0.5], dtype=np.float32)})
+    service = EmbeddingService(tei_url="http://tei", cache=cache)
+    service._client = AsyncMock()
+    service._client.post.return_value = httpx.Response(
+        200, json=[[0.25, 0.75]], request=httpx.Request("POST", "http://tei/embed")
+    )
+
+    embeddings = await service.embed_batch(["body", "nav", "body"])
+
+    assert embeddings.tolist() == [[0.25, 0.75], [0.5, 0.5], [0.25, 0.75]]
+    assert service._client.post.call_args[1]["json"]["inputs"] == ["body"]
+
+    service._client.post.reset_mock()
+    assert (await service.embed_batch(["nav", "body"])).tolist() == [[0.5, 0.5], [0.25, 0.75]]
+    service._client.post.assert_not_called()
@@ -2,12 +2,14 @@
 Unit tests for EmbeddingService.
 """
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
+import numpy as np
 import pytest
 
-from services.embedding import EmbeddingService
+from services.embedding import EmbeddingService, decode_embeddings
 from tests.utils.db_fixtures import (  # noqa: F401
     cleanup_database_engine,
     initialize_test_database,
@@ -15,6 +17,11 @@ from tests.utils.db_fixtures import (  # noqa: F401
 from tests.utils.service_endpoints import get_tei_base_url
 
 
+def _embed_response(vectors: list[list[float]]) -> httpx.Response:
+    """Build a TEI /embed response carrying the given vectors."""
+    return httpx.Response(200, json=vectors, request=httpx.Request("POST", "http://tei/embed"))
+
+
 @pytest.fixture
 def mock_httpx_client() -> AsyncMock:
     """Create mocked httpx.AsyncClient."""
@@ -86,15 +93,16 @@ async def test_embed_single_empty_text(
 async def test_embed_batch_success(
     embedding_service: EmbeddingService, mock_httpx_client: AsyncMock
 ) -> None:
-    """Test successful batch embedding."""
-    mock_response = MagicMock()
-    mock_response.json.return_value = [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]]
-    mock_httpx_client.post.return_value = mock_response
+    """Test successful batch embedding returns a contiguous float32 matrix."""
+    mock_httpx_client.post.return_value = _embed_response([[0.5, 0.25], [0.75, -1.5], [2.0, 1e-3]])
 
     embeddings = await embedding_service.embed_batch(["text1", "text2", "text3"])
 
-    assert len(embeddings) == 3
-    assert embeddings[0] == [0.1, 0.2]
+    assert embeddings.dtype == np.float32
+    assert embeddings.shape == (3, 2)
+    assert embeddings.flags["C_CONTIGUOUS"]
+    assert embeddings[:2].tolist() == [[0.5, 0.25], [0.75, -1.5]]
+    assert embeddings[2, 1] == np.float32(1e-3)
 
 
 @pytest.mark.asyncio
@@ -113,9 +121,7 @@ async def test_embed_batch_filters_empty_texts(
     embedding_service: EmbeddingService, mock_httpx_client: AsyncMock
 ) -> None:
     """Test batch embedding filters out empty texts."""
-    mock_response = MagicMock()
-    mock_response.json.return_value = [[0.1, 0.2]]
-    mock_httpx_client.post.return_value = mock_response
+    mock_httpx_client.post.return_value = _embed_response([[0.1, 0.2]])
 
     await embedding_service.embed_batch(["valid text", "", "  "])
 
@@ -144,13 +150,11 @@ async def test_embed_dispatcher_batch(
     embedding_service: EmbeddingService, mock_httpx_client: AsyncMock
 ) -> None:
     """Test embed() dispatcher with list."""
-    mock_response = MagicMock()
-    mock_response.json.return_value = [[0.1], [0.2]]
-    mock_httpx_client.post.return_value = mock_response
+    mock_httpx_client.post.return_value = _embed_response([[0.1], [0.2]])
 
     result = await embedding_service.embed(["text1", "text2"])
 
-    assert isinstance(result, list)
+    assert isinstance(result, np.ndarray)
     assert len(result) == 2
 
 
@@ -160,3 +164,124 @@ async def test_close(embedding_service: EmbeddingService, mock_httpx_client: Asy
     await embedding_service.close()
 
     mock_httpx_client.aclose.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_micro_batching_coalesces_concurrent_calls(mock_httpx_client: AsyncMock) -> None:
+    """Test concurrent embed_batch/embed_single calls share one TEI request."""
+    service = EmbeddingService(tei_url=get_tei_base_url(), micro_batch_wait_ms=20)
+    service._client = mock_httpx_client
+    mock_httpx_client.post.return_value = _embed_response([[0.5], [0.25], [0.75]])
+
+    batch, single = await asyncio.gather(
+        service.embed_batch(["text1", "text2"]),
+        service.embed_single("query"),
+    )
+
+    mock_httpx_client.post.assert_called_once()
+    assert mock_httpx_client.post.call_args[1]["json"]["inputs"] == ["text1", "text2", "query"]
+    assert batch.tolist() == [[0.5], [0.25]]
+    assert single == [0.75]
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_splits_by_tei_limits(
+    embedding_service: EmbeddingService, mock_httpx_client: AsyncMock
+) -> None:
+    """Test oversized requests are split using /info limits, retrying only the failed part."""
+    mock_httpx_client.get.return_value = MagicMock(
+        status_code=200, json=MagicMock(return_value={"max_client_batch_size": 2})
+    )
+
+    attempts: dict[str, int] = {}
+
+    async def post(url: str, json: dict[str, list[str]]) -> httpx.Response:
+        first = json["inputs"][0]
+        attempts[first] = attempts.get(first, 0) + 1
+        if first == "t2" and attempts[first] == 1:
+            raise httpx.ConnectError("connection reset")
+        return _embed_response([[float(t[1:])] for t in json["inputs"]])
+
+    mock_httpx_client.post.side_effect = post
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        embeddings = await embedding_service.embed_batch([f"t{i}" for i in range(5)])
+
+    assert embeddings.tolist() == [[0.0], [1.0], [2.0], [3.0], [4.0]]
+    assert attempts == {"t0": 1, "t2": 2, "t4": 1}
+    mock_httpx_client.get.assert_called_once_with(f"{get_tei_base_url()}/info")
+
+
+@pytest.mark.asyncio
+async def test_batch_limits_are_cached_only_from_a_successful_info(
+    embedding_service: EmbeddingService, mock_httpx_client: AsyncMock
+) -> None:
+    """Test a failed /info is retried later, and concurrent first calls share one fetch."""
+    mock_httpx_client.get.return_value = MagicMock(status_code=503)
+
+    assert await embedding_service._get_batch_limits() == (32, 16384)
+    assert embedding_service._batch_limits is None
+
+    async def get(url: str) -> MagicMock:
+        await asyncio.sleep(0)
+        return MagicMock(status_code=200, json=MagicMock(return_value={"max_client_batch_size": 8}))
+
+    mock_httpx_client.get.reset_mock()
+    mock_httpx_client.get.side_effect = get
+
+    limits = await asyncio.gather(*(embedding_service._get_batch_limits() for _ in range(5)))
+
+    assert limits == [(8, 16384)] * 5
+    mock_httpx_client.get.assert_called_once_with(f"{get_tei_base_url()}/info")
+
+
+@pytest.mark.asyncio
+async def test_embed_batch_fails_over_between_endpoints(mock_httpx_client: AsyncMock) -> None:
+    """Test a failing replica is ejected and the retry goes to a healthy one."""
+    service = EmbeddingService(tei_url="http://tei-a:80, http://tei-b:80")
+    service._client = mock_httpx_client
+    service._batch_limits = (32, 16384)
+
+    urls: list[str] = []
+
+    async def post(url: str, json: dict[str, list[str]]) -> httpx.Response:
+        urls.append(url)
+        if url.startswith("http://tei-a"):
+            raise httpx.ConnectError("connection refused")
+        return _embed_response([[0.5]])
+
+    mock_httpx_client.post.side_effect = post
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        assert (await service.embed_batch(["text"])).tolist() == [[0.5]]
+        assert (await service.embed_batch(["text"])).tolist() == [[0.5]]
+
+    assert urls == ["http://tei-a:80/embed", "http://tei-b:80/embed", "http://tei-b:80/embed"]
+
+
+def test_decode_embeddings_fast_path_and_fallback() -> None:
+    """Test TEI bodies decode to float32 matrices, falling back to JSON when needed."""
+    fast = decode_embeddings(b"[[0.5,-0.25,1e-2],[3,4.5,-6]]", 2)
+    assert fast.dtype == np.float32
+    assert fast.shape == (2, 3)
+    assert fast[1].tolist() == [3.0, 4.5, -6.0]
+
+    # Exponent signs and whitespace are fine; ragged rows are not
+    assert decode_embeddings(b"[[1.5e+00, 2]]\n", 1).tolist() == [[1.5, 2.0]]
+    with pytest.raises(ValueError):
+        decode_embeddings(b"[[1.0,2.0],[3.0]]", 2)
+
+
+@pytest.mark.parametrize(
+    ("body", "count"),
+    [
+        (b"[[1,2,3,4]]", 2),  # fewer rows than requested
+        (b"[[1,2,3],[4,5,6,7,8,9]]", 3),  # ragged, total divisible by count
+        (b"[[1,2],[3],[4,5,6]]", 3),  # ragged, count rows
+        (b"[1,2,3,4]", 2),  # not a matrix
+    ],
+)
+def test_decode_embeddings_rejects_mismatched_bodies(body: bytes, count: int) -> None:
+    """Test a short or malformed TEI reply is never reshaped into count rows."""
+    with pytest.raises(ValueError):
+        decode_embeddings(body, count)
@@ -0,0 +1,262 @@
+"""
+Unit tests for rebuilding the search indexes from scraped_content.
+"""
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from api.schemas.indexing import IndexDocumentRequest
+from services.index_rebuild import (
+    IndexRebuilder,
+    PreparedDocument,
+    RebuildCheckpoint,
+    prepare_document,
+)
+from services.indexing import IndexingService
+from services.vector_store import chunk_payload
+
+
+def _chunker() -> MagicMock:
+    """Chunker splitting text into one chunk per word."""
+    chunker = MagicMock()
+    chunker.chunk_text.side_effect = lambda text, metadata: [
+        {"text": word, "chunk_index": index, "token_count": 1, **metadata}
+        for index, word in enumerate(text.split())
+    ]
+    return chunker
+
+
+@pytest.fixture
+def vector_store() -> MagicMock:
+    """Vector store whose served collection is docs_old."""
+    vector_store = MagicMock()
+    vector_store.vector_dim = 2
+    vector_store.resolve_collection = AsyncMock(return_value="docs_old")
+    vector_store.new_collection_name.return_value = "docs_new"
+    vector_store.create_collection = AsyncMock()
+    vector_store.finish_bulk_load = AsyncMock()
+    vector_store.switch_alias = AsyncMock(return_value="docs_old")
+    vector_store.client = AsyncMock()
+    source_info = vector_store.client.get_collection.return_value
+    source_info.config.optimizer_config.indexing_threshold = 20000
+    return vector_store
+
+
+def _rebuilder(
+    vector_store: MagicMock, bm25_engine: MagicMock, pages: list[list[tuple[Any, ...]]]
+) -> tuple[IndexRebuilder, list[int]]:
+    """Rebuilder over the given row pages, chunking inline instead of in a pool."""
+    embedding_service = AsyncMock()
+    embedding_service.embed_batch.side_effect = lambda texts: np.ones(
+        (len(texts), 2), dtype=np.float32
+    )
+
+    rebuilder = IndexRebuilder(
+        text_chunker=_chunker(),
+        embedding_service=embedding_service,
+        vector_store=vector_store,
+        bm25_engine=bm25_engine,
+        workers=1,
+    )
+    streamed_from: list[int] = []
+
+    async def stream_rows(after_id: int) -> AsyncIterator[list[tuple[Any, ...]]]:
+        streamed_from.append(after_id)
+        for page in pages:
+            if page[-1][0] > after_id:
+                yield page
+
+    async def prepare_page(chunking_pool: Any, rows: list[Any]) -> list[PreparedDocument | None]:
+        return [prepare_document(row, rebuilder.text_chunker) for row in rows]
+
+    rebuilder._stream_rows = stream_rows  # type: ignore[method-assign]
+    rebuilder._prepare_page = prepare_page  # type: ignore[method-assign]
+    return rebuilder, streamed_from
+
+
+def test_prepare_document_matches_indexing_metadata() -> None:
+    """Test rows are cleaned, chunked and tagged like webhook-indexed documents."""
+    document = prepare_document(
+        (
+            7,
+            "https://example.com/page?utm_source=x",
+            "hello   world",
+            {"title": "Page", "language": "en", "statusCode": 200},
+        ),
+        _chunker(),
+    )
+
+    assert document is not None
+    assert document.text == "hello world"
+    assert document.metadata["canonical_url"] == "https://example.com/page"
+    assert document.metadata["domain"] == "example.com"
+    assert document.metadata["title"] == "Page"
+    assert document.metadata["content_id"] == 7
+    assert [chunk["text"] for chunk in document.chunks] == ["hello", "world"]
+    assert all(len(chunk["chunk_hash"]) == 64 for chunk in document.chunks)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_reproduces_indexing_service_payloads(
+    tmp_path: Path, vector_store: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test rebuilding from the row IndexingService stored gives the live payloads."""
+    monkeypatch.delenv("WEBHOOK_SKIP_DB_FIXTURES", raising=False)
+    live_vector_store = AsyncMock()
+    live_vector_store.vector_dim = 2
+    live_vector_store.get_chunk_hashes.return_value = {}
+    live_bm25_engine = MagicMock()
+    embedding_service = AsyncMock()
+    embedding_service.embed_batch.side_effect = lambda texts: np.ones(
+        (len(texts), 2), dtype=np.float32
+    )
+    service = IndexingService(
+        text_chunker=_chunker(),
+        embedding_service=embedding_service,
+        vector_store=live_vector_store,
+        bm25_engine=live_bm25_engine,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        title="Page",
+        description="About the page",
+        markdown="hello   world",
+        html="",
+        statusCode=200,
+        language="de",
+        country="AT",
+        isMobile=True,
+    )
+
+    with (
+        patch("services.indexing.get_db_context") as mock_db_context,
+        patch("services.indexing.store_scraped_content", new_callable=AsyncMock) as mock_store,
+    ):
+        mock_db_context.return_value.__aenter__.return_value = AsyncMock()
+        mock_store.return_value = MagicMock(id=7)
+        await service.index_document(document, crawl_id="crawl-1")
+
+    stored = mock_store.await_args.kwargs
+    row = (7, stored["url"], stored["document"]["markdown"], stored["document"]["metadata"])
+    bm25_engine = MagicMock()
+    rebuilder, _ = _rebuilder(vector_store, bm25_engine, [[row]])
+    await rebuilder.run(tmp_path / "checkpoint.json")
+
+    live_payloads = [
+        chunk_payload(chunk, document.url)
+        for chunk in live_vector_store.index_chunks.await_args.kwargs["chunks"]
+    ]
+    rebuilt_payloads = [
+        point.payload
+        for call in vector_store.client.upsert.await_args_list
+        for point in call.kwargs["points"]
+    ]
+    assert rebuilt_payloads == live_payloads
+    assert rebuilt_payloads[0]["isMobile"] is True
+    assert rebuilt_payloads[0]["country"] == "AT"
+    ((text, metadata),) = bm25_engine.index_documents.call_args.args[0]
+    assert text == live_bm25_engine.index_document.call_args.kwargs["text"]
+    assert metadata == live_bm25_engine.index_document.call_args.kwargs["metadata"]
+
+
+def test_prepare_document_does_not_invent_a_mobile_flag() -> None:
+    """Test Firecrawl rows, which carry no mobile flag, are rebuilt without one."""
+    document = prepare_document((3, "https://example.com", "text", {"title": "T"}), _chunker())
+
+    assert document is not None
+    assert "isMobile" not in document.metadata
+    assert "isMobile" not in chunk_payload(document.chunks[0], document.url)
+
+
+def test_prepare_document_skips_empty_content() -> None:
+    """Test rows without markdown produce no document."""
+    assert prepare_document((1, "https://example.com", None, {}), _chunker()) is None
+    assert prepare_document((2, "https://example.com", " \n ", None), _chunker()) is None
+
+
+@pytest.mark.asyncio
+async def test_rebuild_loads_pages_then_switches_alias(
+    tmp_path: Path, vector_store: MagicMock
+) -> None:
+    """Test every page is embedded, upserted and added to BM25 before the switch."""
+    bm25_engine = MagicMock()
+    rebuilder, _ = _rebuilder(
+        vector_store,
+        bm25_engine,
+        [
+            [(1, "https://a.com", "one two", {}), (2, "https://b.com", "", {})],
+            [(5, "https://c.com", "three", {})],
+        ],
+    )
+    checkpoint_path = tmp_path / "checkpoint.json"
+
+    summary = await rebuilder.run(checkpoint_path)
+
+    assert summary == {
+        "target": "docs_new",
+        "documents": 2,
+        "chunks": 3,
+        "skipped": 1,
+        "previous_kept": "docs_old",
+    }
+    vector_store.create_collection.assert_awaited_once_with("docs_new", bulk_load=True)
+    upserted = [
+        point
+        for call in vector_store.client.upsert.await_args_list
+        for point in call.kwargs["points"]
+    ]
+    assert [point.payload["text"] for point in upserted] == ["one", "two", "three"]
+    assert {
+        call.kwargs["collection_name"] for call in vector_store.client.upsert.await_args_list
+    } == {"docs_new"}
+    assert bm25_engine.index_documents.call_count == 2
+    vector_store.finish_bulk_load.assert_awaited_once_with(
+        "docs_new", indexing_threshold=20000, timeout=3600.0
+    )
+    vector_store.switch_alias.assert_awaited_once_with("docs_new")
+    bm25_engine.merge_segments.assert_called_once()
+    assert not checkpoint_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_resumes_from_checkpoint(tmp_path: Path, vector_store: MagicMock) -> None:
+    """Test a checkpointed rebuild continues after the last loaded row."""
+    rebuilder, streamed_from = _rebuilder(
+        vector_store,
+        MagicMock(),
+        [[(1, "https://a.com", "one", {})], [(5, "https://c.com", "three", {})]],
+    )
+    checkpoint_path = tmp_path / "checkpoint.json"
+    RebuildCheckpoint(
+        target="docs_partial", indexing_threshold=20000, last_id=1, documents=1, chunks=1
+    ).save(checkpoint_path)
+    vector_store.client.collection_exists.return_value = True
+
+    summary = await rebuilder.run(checkpoint_path)
+
+    assert streamed_from == [1]
+    assert summary["target"] == "docs_partial"
+    assert summary["documents"] == 2
+    vector_store.create_collection.assert_not_awaited()
+    vector_store.switch_alias.assert_awaited_once_with("docs_partial")
+
+
+@pytest.mark.asyncio
+async def test_rebuild_refuses_missing_checkpointed_collection(
+    tmp_path: Path, vector_store: MagicMock
+) -> None:
+    """Test resuming into a deleted collection fails instead of loading a partial one."""
+    rebuilder, _ = _rebuilder(vector_store, MagicMock(), [])
+    checkpoint_path = tmp_path / "checkpoint.json"
+    RebuildCheckpoint(target="docs_gone", last_id=10).save(checkpoint_path)
+    vector_store.client.collection_exists.return_value = False
+
+    with pytest.raises(ValueError, match="docs_gone"):
+        await rebuilder.run(checkpoint_path)
+    assert checkpoint_path.exists()
@@ -2,11 +2,14 @@
 Unit tests for IndexingService.
 """
 
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 
 from api.schemas.indexing import IndexDocumentRequest
+from services.content_registry import IndexedContentRegistry, index_version
+from services.content_storage import compute_content_hash
 from services.indexing import IndexingService
 
 
@@ -35,6 +38,7 @@ def mock_vector_store() -> AsyncMock:
     store = AsyncMock()
     store.vector_dim = 2  # Must match embedding dimension
     store.index_chunks.return_value = 2
+    store.get_chunk_hashes.return_value = {}
     return store
 
 
@@ -305,3 +309,356 @@ async def test_canonical_url_normalization(
     bm25_metadata = bm25_call_args[1]["metadata"]
 
     assert bm25_metadata["canonical_url"] == "https://example.com/page?id=123"
+
+
+@pytest.fixture
+def content_registry() -> IndexedContentRegistry:
+    """Registry backed by an in-memory dict standing in for a Redis hash."""
+    store: dict[str, str] = {}
+    redis = MagicMock()
+    redis.hget.side_effect = lambda key, field: store.get(field)
+    redis.hset.side_effect = lambda key, field, value: store.__setitem__(field, value)
+    redis.hdel.side_effect = lambda key, field: store.pop(field, None)
+    return IndexedContentRegistry(redis=redis, index_version="test")
+
+
+@pytest.mark.asyncio
+async def test_unchanged_document_is_skipped(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+    content_registry: IndexedContentRegistry,
+) -> None:
+    """Test re-indexing identical content short-circuits before chunking and embedding."""
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        content_registry=content_registry,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page?utm_source=feed",
+        resolvedUrl="https://example.com/page",
+        markdown="# Test\n\nThis is test content.",
+        html="",
+        statusCode=200,
+    )
+
+    first = await service.index_document(document)
+    second = await service.index_document(document)
+
+    assert first["chunks_indexed"] == 2
+    assert second == {
+        "success": True,
+        "status": "skipped_unchanged",
+        "url": document.url,
+        "chunks_indexed": 0,
+        "total_tokens": 0,
+    }
+    mock_text_chunker.chunk_text.assert_called_once()
+    mock_embedding_service.embed_batch.assert_called_once()
+    mock_vector_store.index_chunks.assert_called_once()
+    mock_bm25_engine.index_document.assert_called_once()
+    assert content_registry.get("https://example.com/page") is not None
+
+
+@pytest.mark.asyncio
+async def test_metadata_change_is_reindexed(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+    content_registry: IndexedContentRegistry,
+) -> None:
+    """Test a new title re-indexes a document whose text is unchanged."""
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        content_registry=content_registry,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="same content",
+        html="",
+        statusCode=200,
+        title="Old title",
+    )
+
+    await service.index_document(document)
+    document.title = "New title"
+    result = await service.index_document(document)
+
+    assert result.get("status") != "skipped_unchanged"
+    assert mock_bm25_engine.index_document.call_count == 2
+    assert mock_bm25_engine.index_document.call_args[1]["metadata"]["title"] == "New title"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_document_content_is_still_stored(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+    content_registry: IndexedContentRegistry,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a skipped document is still stored for the crawl it arrived in."""
+    monkeypatch.delenv("WEBHOOK_SKIP_DB_FIXTURES", raising=False)
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        content_registry=content_registry,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="same content",
+        html="",
+        statusCode=200,
+    )
+
+    with (
+        patch("services.indexing.get_db_context") as mock_db_context,
+        patch("services.indexing.store_scraped_content", new_callable=AsyncMock) as mock_store,
+    ):
+        mock_db_context.return_value.__aenter__.return_value = AsyncMock()
+        mock_store.return_value = MagicMock(id=7)
+
+        await service.index_document(document, crawl_id="crawl-1")
+        second = await service.index_document(document, crawl_id="crawl-2")
+
+    assert second["status"] == "skipped_unchanged"
+    assert [call.kwargs["crawl_session_id"] for call in mock_store.await_args_list] == [
+        "crawl-1",
+        "crawl-2",
+    ]
+    mock_bm25_engine.index_document.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_changed_or_failed_document_is_reindexed(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+    content_registry: IndexedContentRegistry,
+) -> None:
+    """Test only fully indexed content is recorded, and changed content is re-indexed."""
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        content_registry=content_registry,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="version one",
+        html="",
+        statusCode=200,
+    )
+
+    mock_vector_store.index_chunks.side_effect = Exception("qdrant down")
+    assert (await service.index_document(document))["success"] is False
+    assert content_registry.get("https://example.com/page") is None
+
+    mock_vector_store.index_chunks.side_effect = None
+    await service.index_document(document)
+    document.markdown = "version two"
+    result = await service.index_document(document)
+
+    assert result.get("status") != "skipped_unchanged"
+    assert mock_bm25_engine.index_document.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_only_changed_chunks_are_embedded(
+    indexing_service: IndexingService,
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+) -> None:
+    """Test unchanged chunks keep their points and moved chunks reuse stored vectors."""
+    mock_text_chunker.chunk_text.return_value = [
+        {"text": "intro", "chunk_index": 0, "token_count": 10},
+        {"text": "new paragraph", "chunk_index": 1, "token_count": 10},
+        {"text": "outro", "chunk_index": 2, "token_count": 10},
+    ]
+    mock_vector_store.get_chunk_hashes.return_value = {
+        0: compute_content_hash("intro"),
+        1: compute_content_hash("outro"),
+    }
+    mock_vector_store.get_chunk_vectors.return_value = {1: np.array([0.5, 0.75], dtype=np.float32)}
+    mock_embedding_service.embed_batch.return_value = np.array([[0.25, 0.125]], dtype=np.float32)
+    mock_vector_store.index_chunks.return_value = 3
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="changed",
+        html="",
+        statusCode=200,
+    )
+
+    result = await indexing_service.index_document(document)
+
+    assert result["success"] is True
+    assert result["chunks_embedded"] == 1
+    mock_embedding_service.embed_batch.assert_awaited_once_with(["new paragraph"])
+    mock_vector_store.get_chunk_vectors.assert_awaited_once_with("https://example.com/page", [1])
+    call_kwargs = mock_vector_store.index_chunks.call_args[1]
+    assert [None if e is None else e.tolist() for e in call_kwargs["embeddings"]] == [
+        None,
+        [0.25, 0.125],
+        [0.5, 0.75],
+    ]
+    assert call_kwargs["chunks"][2]["chunk_hash"] == compute_content_hash("outro")
+
+
+@pytest.mark.asyncio
+async def test_chunk_hash_lookup_failure_embeds_everything(
+    indexing_service: IndexingService,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+) -> None:
+    """Test a failed hash lookup falls back to a full re-embed."""
+    mock_vector_store.get_chunk_hashes.side_effect = Exception("qdrant down")
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="content",
+        html="",
+        statusCode=200,
+    )
+
+    result = await indexing_service.index_document(document)
+
+    assert result["success"] is True
+    assert result["chunks_embedded"] == 2
+    mock_embedding_service.embed_batch.assert_awaited_once_with(["chunk1", "chunk2"])
+
+
+def test_content_registry_treats_redis_errors_as_miss() -> None:
+    """Test an unavailable registry never blocks indexing."""
+    redis = MagicMock()
+    redis.hget.side_effect = ConnectionError("redis down")
+    redis.hset.side_effect = ConnectionError("redis down")
+    registry = IndexedContentRegistry(redis=redis, index_version="test")
+
+    assert registry.get("https://example.com") is None
+    registry.record("https://example.com", "abc")
+
+
+def test_index_version_changes_with_chunking_settings_and_pipeline_code() -> None:
+    """Test the registry key changes when either the settings or the pipeline code change."""
+    settings = MagicMock(
+        qdrant_collection="pages",
+        embedding_model="model",
+        max_chunk_tokens=256,
+        chunk_overlap_tokens=50,
+    )
+    version = index_version(settings)
+
+    settings.max_chunk_tokens = 512
+    assert index_version(settings) != version
+    settings.max_chunk_tokens = 256
+    with patch("services.content_registry.INDEX_PIPELINE_VERSION", 99):
+        assert index_version(settings) != version
+
+
+@pytest.mark.asyncio
+async def test_index_write_bumps_generation(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+    content_registry: IndexedContentRegistry,
+) -> None:
+    """Test writes advance the index generation and skipped documents do not."""
+    generation = MagicMock()
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        content_registry=content_registry,
+        index_generation=generation,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="content",
+        html="",
+        statusCode=200,
+    )
+
+    await service.index_document(document)
+    await service.index_document(document)
+
+    generation.bump.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_document_removes_it_from_both_indexes(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+) -> None:
+    """Test deletion removes vectors and BM25 versions by canonical URL."""
+    generation = MagicMock()
+    mock_bm25_engine.delete_document.return_value = 2
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        index_generation=generation,
+    )
+
+    result = await service.delete_document("https://Example.com/page?utm_source=x")
+
+    assert result["success"] is True
+    assert result["bm25_versions_deleted"] == 2
+    mock_vector_store.delete_document.assert_awaited_once_with("https://example.com/page")
+    mock_bm25_engine.delete_document.assert_called_once_with("https://example.com/page")
+    generation.bump.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_deleted_document_is_reindexed_in_full(
+    mock_text_chunker: MagicMock,
+    mock_embedding_service: AsyncMock,
+    mock_vector_store: AsyncMock,
+    mock_bm25_engine: MagicMock,
+    content_registry: IndexedContentRegistry,
+) -> None:
+    """Test deleting a document forgets its hash so identical content is indexed again."""
+    service = IndexingService(
+        text_chunker=mock_text_chunker,
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        content_registry=content_registry,
+    )
+    document = IndexDocumentRequest(
+        url="https://example.com/page",
+        resolvedUrl="https://example.com/page",
+        markdown="content",
+        html="",
+        statusCode=200,
+    )
+
+    await service.index_document(document)
+    await service.delete_document(document.url)
+    result = await service.index_document(document)
+
+    assert result.get("status") != "skipped_unchanged"
+    assert mock_bm25_engine.index_document.call_count == 2
@@ -0,0 +1,71 @@
+"""
+Unit tests for QueryEmbeddingCache.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.embedding_cache import pack_vector
+from services.query_embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalize_query_collapses_whitespace_but_keeps_case() -> None:
+    """Test whitespace variants share a key while case stays significant."""
+    assert normalize_query("  Python \t async\n") == "Python async"
+
+
+@pytest.mark.asyncio
+async def test_lru_bound_and_ttl() -> None:
+    """Test entries are evicted least recently used first and expire after the TTL."""
+    cache = QueryEmbeddingCache(model="m", max_entries=2, ttl_seconds=60)
+
+    with patch("services.query_embedding_cache.time.monotonic", return_value=0.0):
+        await cache.put("a", [1.0])
+        await cache.put("b", [2.0])
+        assert await cache.get("a") == [1.0]
+        await cache.put("c", [3.0])
+        assert await cache.get("b") is None
+
+    with patch("services.query_embedding_cache.time.monotonic", return_value=61.0):
+        assert await cache.get("a") is None
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_errors_are_misses() -> None:
+    """Test Redis hits fill the local tier and Redis errors never fail a search."""
+    redis = MagicMock()
+    redis.get.return_value = pack_vector([0.5, 0.25])
+    cache = QueryEmbeddingCache(model="m", ttl_seconds=30, redis=redis)
+
+    assert await cache.get("query") == [0.5, 0.25]
+    assert await cache.get("query") == [0.5, 0.25]
+    redis.get.assert_called_once()
+    assert cache.stats()["redis_hits"] == 1
+    assert cache.stats()["hits"] == 1
+
+    redis.get.side_effect = ConnectionError("redis down")
+    redis.set.side_effect = ConnectionError("redis down")
+    assert await cache.get("other") is None
+    await cache.put("other", [1.0])
+    assert await cache.get("other") == [1.0]
+    assert redis.set.call_args[1]["px"] == 30_000
+
+
+@pytest.mark.asyncio
+async def test_cached_vectors_cannot_be_mutated_by_callers() -> None:
+    """Test get and put copy vectors, so callers never share the cached entry."""
+    cache = QueryEmbeddingCache(model="m")
+    vector = [1.0, 2.0]
+    await cache.put("query", vector)
+    vector.append(3.0)
+
+    first = await cache.get("query")
+    assert first == [1.0, 2.0]
+    assert first is not None
+    first[0] = 9.0
+    assert await cache.get("query") == [1.0, 2.0]
@@ -124,3 +124,53 @@ async def test_rescrape_changed_url_not_found():
 
         with pytest.raises(ValueError, match="Change event .* not found"):
             await rescrape_changed_url(99999)
+
+
+@pytest.mark.asyncio
+async def test_rescrape_changed_url_gone_page_is_deleted():
+    """Test a rescrape that finds the page gone removes it from search."""
+    mock_event = ChangeEvent(
+        id=124,
+        watch_id="test-watch",
+        watch_url="https://example.com/removed",
+        detected_at=datetime.now(UTC),
+        rescrape_status="queued",
+        extra_metadata={},
+    )
+
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = mock_event
+    mock_session.execute.return_value = mock_result
+
+    mock_firecrawl_response = {
+        "success": True,
+        "data": {
+            "markdown": "# Not Found",
+            "metadata": {"title": "Not Found", "statusCode": 404},
+        },
+    }
+
+    with patch("workers.jobs.get_db_context") as mock_db_context:
+        mock_db_context.return_value.__aenter__.return_value = mock_session
+
+        with patch("httpx.AsyncClient") as mock_client_class:
+            mock_client = AsyncMock()
+            mock_client_class.return_value.__aenter__.return_value = mock_client
+            mock_response = MagicMock()
+            mock_response.json.return_value = mock_firecrawl_response
+            mock_client.post.return_value = mock_response
+
+            with (
+                patch("workers.jobs._index_document_helper", new_callable=AsyncMock) as mock_index,
+                patch(
+                    "workers.jobs._delete_document_helper", new_callable=AsyncMock
+                ) as mock_delete,
+            ):
+                mock_delete.return_value = "https://example.com/removed"
+
+                result = await rescrape_changed_url(124)
+
+    assert result["status"] == "success"
+    mock_delete.assert_awaited_once_with("https://example.com/removed")
+    mock_index.assert_not_awaited()
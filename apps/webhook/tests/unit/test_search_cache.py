@@ -0,0 +1,144 @@
+"""
+Unit tests for the shared search result cache.
+"""
+
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.search_cache import IndexGeneration, SearchResultCache
+
+
+class _DictRedis:
+    """The few Redis commands the cache uses, backed by a dict (expiry ignored)."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self.store.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False, **kwargs: Any) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    def incr(self, key: str) -> int:
+        self.store[key] = int(self.store.get(key, 0)) + 1
+        return self.store[key]
+
+    def exists(self, key: str) -> int:
+        return int(key in self.store)
+
+    def delete(self, key: str) -> int:
+        return int(self.store.pop(key, None) is not None)
+
+    def pipeline(self, transaction: bool = True) -> "_DictPipeline":
+        return _DictPipeline(self)
+
+
+class _DictPipeline:
+    def __init__(self, redis: _DictRedis) -> None:
+        self.redis = redis
+        self.calls: list[Any] = []
+
+    def get(self, key: str) -> None:
+        self.calls.append(lambda: self.redis.get(key))
+
+    def exists(self, key: str) -> None:
+        self.calls.append(lambda: self.redis.exists(key))
+
+    def execute(self) -> list[Any]:
+        return [call() for call in self.calls]
+
+
+REQUEST = {"query": "python", "mode": "hybrid", "limit": 10, "offset": 0}
+
+
+def _cache(redis: Any, **kwargs: Any) -> SearchResultCache:
+    return SearchResultCache(redis=redis, generation=IndexGeneration(redis, "pages"), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_cached_until_index_generation_changes() -> None:
+    """Test repeated requests are served from Redis until an index write."""
+    redis = _DictRedis()
+    cache = _cache(redis)
+    compute = MagicMock(side_effect=lambda: asyncio.sleep(0, ([{"id": "a"}], 1)))
+
+    assert await cache.get_or_compute(REQUEST, compute) == ([{"id": "a"}], 1)
+    assert await cache.get_or_compute(dict(reversed(REQUEST.items())), compute) == (
+        [{"id": "a"}],
+        1,
+    )
+    assert compute.call_count == 1
+
+    IndexGeneration(redis, "pages").bump()
+    await cache.get_or_compute(REQUEST, compute)
+    assert compute.call_count == 2
+
+    await cache.get_or_compute({**REQUEST, "offset": 10}, compute)
+    assert compute.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_compute_once() -> None:
+    """Test a burst of identical requests in one process shares one computation."""
+    cache = _cache(_DictRedis())
+    calls = 0
+
+    async def compute() -> tuple[list[dict[str, Any]], int]:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [{"id": "a"}], 1
+
+    outcomes = await asyncio.gather(*(cache.get_or_compute(REQUEST, compute) for _ in range(5)))
+
+    assert calls == 1
+    assert outcomes == [([{"id": "a"}], 1)] * 5
+
+
+@pytest.mark.asyncio
+async def test_waits_for_result_computed_by_another_replica() -> None:
+    """Test a replica that loses the lock race polls for the winner's result."""
+    redis = _DictRedis()
+    winner = _cache(redis)
+    loser = _cache(redis, poll_interval=0.01)
+    started = asyncio.Event()
+
+    async def slow_compute() -> tuple[list[dict[str, Any]], int]:
+        started.set()
+        await asyncio.sleep(0.05)
+        return [{"id": "a"}], 1
+
+    async def must_not_run() -> tuple[list[dict[str, Any]], int]:
+        raise AssertionError("computed twice")
+
+    winning = asyncio.create_task(winner.get_or_compute(REQUEST, slow_compute))
+    await started.wait()
+
+    assert await loser.get_or_compute(REQUEST, must_not_run) == ([{"id": "a"}], 1)
+    assert await winning == ([{"id": "a"}], 1)
+    assert not any(key.endswith(":lock") for key in redis.store)
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_outcomes_and_redis_errors() -> None:
+    """Test partial outcomes are not stored and an unavailable Redis never fails a search."""
+    redis = _DictRedis()
+    cache = _cache(redis)
+    compute = MagicMock(side_effect=lambda: asyncio.sleep(0, ([], 0)))
+
+    await cache.get_or_compute(REQUEST, compute, cacheable=lambda outcome: False)
+    await cache.get_or_compute(REQUEST, compute, cacheable=lambda outcome: False)
+    assert compute.call_count == 2
+
+    broken = MagicMock()
+    broken.get.side_effect = ConnectionError("redis down")
+    broken.incr.side_effect = ConnectionError("redis down")
+    assert await _cache(broken).get_or_compute(REQUEST, compute) == ([], 0)
+    IndexGeneration(broken, "pages").bump()
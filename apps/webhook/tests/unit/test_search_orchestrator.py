@@ -2,12 +2,15 @@
 Unit tests for SearchOrchestrator.
 """
 
+import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from api.schemas.search import SearchMode
-from services.search import SearchOrchestrator
+from api.schemas.search import CountMode, SearchMode
+from services.query_embedding_cache import QueryEmbeddingCache
+from services.search import SearchOrchestrator, SearchResults
 
 
 @pytest.fixture
@@ -287,3 +290,156 @@ async def test_hybrid_search_limit_expansion(
     bm25_call = mock_bm25_engine.search.call_args
     assert bm25_call[1]["limit"] == 22
     assert bm25_call[1]["offset"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_queries_skip_tei(
+    mock_embedding_service: AsyncMock, mock_vector_store: AsyncMock, mock_bm25_engine: MagicMock
+) -> None:
+    """Test the query cache serves repeated (whitespace-variant) queries without TEI."""
+    cache = QueryEmbeddingCache(model="m")
+    orchestrator = SearchOrchestrator(
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        query_cache=cache,
+    )
+
+    await orchestrator.search("python  async", mode=SearchMode.HYBRID)
+    await orchestrator.search(" python async ", mode=SearchMode.SEMANTIC)
+
+    mock_embedding_service.embed_single.assert_awaited_once_with("python async")
+    assert mock_vector_store.search.call_args[1]["query_vector"] == [0.1, 0.2, 0.3]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hybrid_legs_run_concurrently(
+    mock_embedding_service: AsyncMock, mock_vector_store: AsyncMock, mock_bm25_engine: MagicMock
+) -> None:
+    """Test hybrid latency is the slower leg, not the sum of both."""
+
+    async def vector_search(**kwargs: object) -> tuple[list[dict[str, object]], int]:
+        await asyncio.sleep(0.1)
+        return [{"id": "v1", "score": 0.9, "payload": {"url": "url1"}}], 1
+
+    def bm25_search(**kwargs: object) -> tuple[list[dict[str, object]], int]:
+        time.sleep(0.1)  # runs in the thread executor
+        return [], 0
+
+    mock_vector_store.search.side_effect = vector_search
+    mock_bm25_engine.search.side_effect = bm25_search
+    orchestrator = SearchOrchestrator(
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+    )
+
+    start = time.perf_counter()
+    results, total = await orchestrator.search("q", mode=SearchMode.HYBRID, limit=5)
+
+    assert time.perf_counter() - start < 0.18
+    assert [r["id"] for r in results] == ["v1"]
+    assert results.partial is False  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_degrades_when_leg_times_out(
+    mock_embedding_service: AsyncMock, mock_vector_store: AsyncMock, mock_bm25_engine: MagicMock
+) -> None:
+    """Test a slow vector leg is dropped and BM25 results are returned flagged partial."""
+
+    async def hanging_search(**kwargs: object) -> tuple[list[dict[str, object]], int]:
+        await asyncio.sleep(10)
+        raise AssertionError("vector leg should have been cancelled")
+
+    mock_vector_store.search.side_effect = hanging_search
+    orchestrator = SearchOrchestrator(
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        semantic_timeout=0.01,
+    )
+
+    results, total = await orchestrator.search("q", mode=SearchMode.HYBRID, limit=10)
+
+    assert results.partial is True  # type: ignore[attr-defined]
+    assert results.failed_legs == ("semantic",)  # type: ignore[attr-defined]
+    assert [r["metadata"]["url"] for r in results] == ["url1", "url3"]
+    assert total == 2
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fails_when_both_legs_fail(
+    orchestrator: SearchOrchestrator, mock_vector_store: AsyncMock, mock_bm25_engine: MagicMock
+) -> None:
+    """Test the search still fails when no leg finished."""
+    mock_vector_store.search.side_effect = RuntimeError("qdrant down")
+    mock_bm25_engine.search.side_effect = RuntimeError("index missing")
+
+    with pytest.raises(RuntimeError, match="qdrant down"):
+        await orchestrator.search("q", mode=SearchMode.HYBRID, limit=10)
+
+
+@pytest.mark.asyncio
+async def test_search_goes_through_result_cache(
+    mock_embedding_service: AsyncMock, mock_vector_store: AsyncMock, mock_bm25_engine: MagicMock
+) -> None:
+    """Test searches are keyed on every request parameter and partial results are not cached."""
+    result_cache = MagicMock()
+    result_cache.get_or_compute = AsyncMock(return_value=([{"id": "cached"}], 1))
+    orchestrator = SearchOrchestrator(
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        result_cache=result_cache,
+    )
+
+    results, total = await orchestrator.search(
+        "q", mode=SearchMode.KEYWORD, limit=5, domain="a.com"
+    )
+
+    assert (results, total) == ([{"id": "cached"}], 1)
+    request, compute = result_cache.get_or_compute.await_args.args
+    assert request == {
+        "query": "q",
+        "mode": "keyword",
+        "limit": 5,
+        "offset": 0,
+        "domain": "a.com",
+        "language": None,
+        "country": None,
+        "is_mobile": None,
+        "count_mode": "exact",
+    }
+    cacheable = result_cache.get_or_compute.await_args.kwargs["cacheable"]
+    assert cacheable(await compute()) is True
+    assert cacheable((SearchResults([], ("semantic",)), 0)) is False
+    mock_embedding_service.embed_single.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_count_mode_is_passed_to_vector_store_and_reported(
+    mock_embedding_service: AsyncMock, mock_vector_store: AsyncMock, mock_bm25_engine: MagicMock
+) -> None:
+    """Test the configured count mode applies unless a search asks for another."""
+    orchestrator = SearchOrchestrator(
+        embedding_service=mock_embedding_service,
+        vector_store=mock_vector_store,
+        bm25_engine=mock_bm25_engine,
+        count_mode=CountMode.NONE,
+    )
+
+    results, _ = await orchestrator.search("q", mode=SearchMode.HYBRID)
+    assert mock_vector_store.search.call_args.kwargs["count_mode"] == CountMode.NONE
+    assert results.count_mode == CountMode.NONE  # type: ignore[attr-defined]
+
+    results, _ = await orchestrator.search(
+        "q", mode=SearchMode.SEMANTIC, count_mode=CountMode.EXACT
+    )
+    assert mock_vector_store.search.call_args.kwargs["count_mode"] == CountMode.EXACT
+    assert results.count_mode == CountMode.EXACT  # type: ignore[attr-defined]
+
+    results, _ = await orchestrator.search("q", mode=SearchMode.KEYWORD)
+    assert results.count_mode == CountMode.EXACT  # type: ignore[attr-defined]
@@ -20,12 +20,14 @@ def mock_services():
     Prevents:
     - TextChunker from downloading HuggingFace tokenizer (1-5s, network)
     - EmbeddingService from creating HTTP client
+    - Embedding cache from creating its SQLite file
     - VectorStore from creating Qdrant client (may attempt connection)
     - BM25Engine from loading from disk
     """
     with (
         patch("services.service_pool.TextChunker") as mock_chunker,
         patch("services.service_pool.EmbeddingService") as mock_embed,
+        patch("services.service_pool.create_embedding_cache", return_value=None),
         patch("services.service_pool.VectorStore") as mock_vector,
         patch("services.service_pool.BM25Engine") as mock_bm25,
     ):
@@ -0,0 +1,80 @@
+"""
+Unit tests for TEI endpoint routing.
+"""
+
+import pytest
+
+from services.tei_endpoints import EndpointPool, parse_endpoints
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_endpoints() -> None:
+    """Test comma-separated and list configuration normalise to unique base URLs."""
+    assert parse_endpoints("http://a:80/, http://b:80,,http://a:80") == [
+        "http://a:80",
+        "http://b:80",
+    ]
+    assert parse_endpoints(["http://a/"]) == ["http://a"]
+    with pytest.raises(ValueError):
+        parse_endpoints(" , ")
+
+
+def test_select_prefers_lowest_expected_wait() -> None:
+    """Test routing weighs the latency EWMA by outstanding requests."""
+    clock = _Clock()
+    pool = EndpointPool(["http://fast", "http://slow"], clock=clock)
+    fast, slow = pool.endpoints
+
+    for endpoint, elapsed in ((fast, 0.1), (slow, 0.4)):
+        started = pool.begin(endpoint)
+        clock.now += elapsed
+        pool.succeeded(endpoint, started)
+
+    assert pool.select() is fast
+    pool.begin(fast)
+    pool.begin(fast)
+    pool.begin(fast)
+    # 4 * 0.1 ties 1 * 0.4; fewer outstanding requests wins
+    assert pool.select() is slow
+
+
+def test_failed_endpoint_is_ejected_then_probed() -> None:
+    """Test a failure ejects the endpoint until its probe readmits it."""
+    clock = _Clock()
+    pool = EndpointPool(["http://a", "http://b"], eject_seconds=10, clock=clock)
+    a, b = pool.endpoints
+
+    pool.begin(a)
+    pool.failed(a)
+    assert pool.select() is b
+    assert pool.due_for_probe() == []
+
+    clock.now = 10
+    assert pool.due_for_probe() == [a]
+    assert pool.due_for_probe() == []  # claimed by the first caller
+    assert pool.select() is b
+
+    pool.readmit(a)
+    assert pool.select() is a  # no latency sample yet
+
+
+def test_single_endpoint_is_never_ejected() -> None:
+    """Test a lone endpoint keeps serving after a failure."""
+    pool = EndpointPool(["http://only"])
+    (only,) = pool.endpoints
+
+    pool.begin(only)
+    pool.failed(only)
+
+    assert only.outstanding == 0
+    assert pool.due_for_probe() == []
+    assert pool.select() is only
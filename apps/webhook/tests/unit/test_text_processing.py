@@ -2,6 +2,8 @@
 Tests for text processing utilities.
 """
 
+import random
+import sys
 from unittest.mock import MagicMock, patch
 
 from utils.text_processing import TextChunker, clean_text, extract_domain
@@ -18,6 +20,55 @@ def test_clean_text() -> None:
     assert clean_text("   ") == ""
 
 
+def _reference_clean_text(text: str) -> str:
+    """The original per-character implementation clean_text must match."""
+    if not text:
+        return ""
+    text = " ".join(text.split())
+    text = "".join(char for char in text if char.isprintable() or char in "\n\t")
+    return text.strip()
+
+
+def test_clean_text_matches_reference_for_every_code_point() -> None:
+    """Test every code point is kept or dropped exactly as the reference does."""
+    for start in range(0, sys.maxunicode + 1, 1024):
+        end = min(start + 1024, sys.maxunicode + 1)
+        text = "a".join(chr(codepoint) for codepoint in range(start, end))
+        assert clean_text(text) == _reference_clean_text(text), hex(start)
+
+
+def test_clean_text_matches_reference_on_random_text() -> None:
+    """Test random mixes of whitespace, control, format and printable characters."""
+    alphabet = [
+        "a",
+        "Z",
+        "7",
+        " ",
+        "\n",
+        "\t",
+        "\r",
+        "\x00",
+        "\x1b",
+        "\x1c",
+        "\x7f",
+        "\x85",
+        "\xa0",
+        "\xad",
+        "\u200b",
+        "\u2028",
+        "\u3000",
+        "\ud800",
+        "\ue000",
+        "\u0378",
+        "\u4e2d",
+        "\U0001f600",
+    ]
+    rng = random.Random(20251016)
+    for _ in range(5000):
+        text = "".join(rng.choices(alphabet, k=rng.randint(0, 40)))
+        assert clean_text(text) == _reference_clean_text(text), repr(text)
+
+
 def test_extract_domain() -> None:
     """Test domain extraction."""
     assert extract_domain("https://example.com/path") == "example.com"
@@ -87,3 +138,33 @@ def test_text_chunker_uses_hf_tokenizer() -> None:
             overlap=16,
         )
         assert chunker.splitter is mock_splitter
+
+
+def test_text_chunker_counts_tokens_from_one_encoding() -> None:
+    """Test chunk token counts come from a single encoding of the whole document."""
+    text = "alpha beta gamma delta"
+    with (
+        patch("tokenizers.Tokenizer.from_pretrained") as mock_from_pretrained,
+        patch("semantic_text_splitter.TextSplitter.from_huggingface_tokenizer") as mock_from_hf,
+    ):
+        tokenizer = mock_from_pretrained.return_value
+        # "alpha" is one token, "beta" two, "gamma" and "delta" one each
+        tokenizer.encode.return_value.offsets = [(0, 5), (6, 8), (8, 10), (11, 16), (17, 22)]
+        mock_from_hf.return_value.chunk_indices.return_value = [
+            (0, "alpha beta"),
+            (6, "beta gamma"),
+            (17, "delta"),
+        ]
+
+        chunker = TextChunker("test-model", max_tokens=3, overlap_tokens=1)
+        chunks = chunker.chunk_text(text, metadata={"url": "https://example.com"})
+
+    tokenizer.no_truncation.assert_called_once()
+    tokenizer.encode.assert_called_once_with(text, add_special_tokens=False)
+    assert [chunk["token_count"] for chunk in chunks] == [3, 3, 1]
+    assert [(chunk["char_start"], chunk["char_end"]) for chunk in chunks] == [
+        (0, 10),
+        (6, 16),
+        (17, 22),
+    ]
+    assert all(chunk["url"] == "https://example.com" for chunk in chunks)
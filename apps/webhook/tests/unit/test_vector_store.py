@@ -7,8 +7,10 @@ from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from qdrant_client.models import BinaryQuantization, PayloadSchemaType, ScalarQuantization
 
-from services.vector_store import VectorStore
+from api.schemas.search import CountMode
+from services.vector_store import PAYLOAD_INDEXES, VectorStore, chunk_point_id
 from tests.utils.db_fixtures import (  # noqa: F401
     cleanup_database_engine,
     initialize_test_database,
@@ -19,7 +21,10 @@ from tests.utils.service_endpoints import get_qdrant_base_url
 @pytest.fixture
 def mock_qdrant_client() -> AsyncMock:
     """Create mocked Qdrant client."""
-    return AsyncMock()
+    client = AsyncMock()
+    # A collection without payload indexes, as Qdrant reports for a new one
+    client.get_collection.return_value = MagicMock(payload_schema={})
+    return client
 
 
 @pytest.fixture
@@ -86,6 +91,145 @@ async def test_ensure_collection_exists(
     mock_qdrant_client.create_collection.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_new_collection_is_created_behind_alias(
+    vector_store: VectorStore, mock_qdrant_client: AsyncMock
+) -> None:
+    """Test a fresh deployment creates a physical collection and points the alias at it."""
+    mock_qdrant_client.get_aliases.return_value = MagicMock(aliases=[])
+    mock_qdrant_client.get_collections.return_value = MagicMock(collections=[])
+
+    await vector_store.ensure_collection()
+
+    physical = mock_qdrant_client.create_collection.call_args.kwargs["collection_name"]
+    assert physical.startswith("test_collection_")
+    (operation,) = mock_qdrant_client.update_collection_aliases.call_args.kwargs[
+        "change_aliases_operations"
+    ]
+    assert operation.create_alias.alias_name == "test_collection"
+    assert operation.create_alias.collection_name == physical
+
+
+@pytest.mark.asyncio
+async def test_switch_alias(vector_store: VectorStore, mock_qdrant_client: AsyncMock) -> None:
+    """Test the alias moves atomically and a pre-alias collection is replaced."""
+    mock_qdrant_client.get_aliases.return_value = MagicMock(
+        aliases=[MagicMock(alias_name="test_collection", collection_name="test_collection_1")]
+    )
+
+    assert await vector_store.switch_alias("test_collection_2") == "test_collection_1"
+
+    delete_op, create_op = mock_qdrant_client.update_collection_aliases.call_args.kwargs[
+        "change_aliases_operations"
+    ]
+    assert delete_op.delete_alias.alias_name == "test_collection"
+    assert create_op.create_alias.collection_name == "test_collection_2"
+    mock_qdrant_client.delete_collection.assert_not_called()
+
+    legacy = MagicMock()
+    legacy.name = "test_collection"
+    mock_qdrant_client.get_aliases.return_value = MagicMock(aliases=[])
+    mock_qdrant_client.get_collections.return_value = MagicMock(collections=[legacy])
+
+    assert await vector_store.switch_alias("test_collection_2") is None
+    mock_qdrant_client.delete_collection.assert_awaited_once_with("test_collection")
+
+
+@pytest.mark.asyncio
+async def test_quantized_collection_layout(mock_qdrant_client: AsyncMock) -> None:
+    """Test quantization and storage settings shape collection creation and searches."""
+    store = VectorStore(
+        url=get_qdrant_base_url(),
+        collection_name="test_collection",
+        vector_dim=384,
+        quantization="binary",
+        oversampling=3.0,
+        vectors_on_disk=True,
+        hnsw_m=32,
+    )
+    store._client = mock_qdrant_client
+    mock_qdrant_client.get_collections.return_value = MagicMock(collections=[])
+    mock_qdrant_client.get_collection.return_value = MagicMock(payload_schema={})
+
+    await store.ensure_collection()
+
+    create_kwargs = mock_qdrant_client.create_collection.call_args.kwargs
+    assert isinstance(create_kwargs["quantization_config"], BinaryQuantization)
+    assert create_kwargs["vectors_config"].on_disk is True
+    assert create_kwargs["on_disk_payload"] is None
+    assert create_kwargs["hnsw_config"].m == 32
+
+    mock_qdrant_client.search.return_value = []
+    await store.search([0.1], count_mode=CountMode.NONE)
+    search_params = mock_qdrant_client.search.call_args.kwargs["search_params"]
+    assert search_params.quantization.oversampling == 3.0
+    assert search_params.quantization.rescore is True
+
+
+@pytest.mark.asyncio
+async def test_existing_collection_layout_is_migrated(mock_qdrant_client: AsyncMock) -> None:
+    """Test an existing collection is updated only when its layout differs."""
+    store = VectorStore(
+        url=get_qdrant_base_url(),
+        collection_name="test_collection",
+        vector_dim=384,
+        quantization="scalar",
+    )
+    store._client = mock_qdrant_client
+    existing_collection = MagicMock()
+    existing_collection.name = "test_collection"
+    mock_qdrant_client.get_collections.return_value = MagicMock(collections=[existing_collection])
+    info = MagicMock(payload_schema={})
+    info.config.quantization_config = None
+    info.config.params.vectors.on_disk = True  # unmanaged: left alone
+    info.config.hnsw_config.m = 16
+    info.config.hnsw_config.ef_construct = 100
+    mock_qdrant_client.get_collection.return_value = info
+
+    await store.ensure_collection()
+
+    update_kwargs = mock_qdrant_client.update_collection.call_args.kwargs
+    assert isinstance(update_kwargs["quantization_config"], ScalarQuantization)
+    assert update_kwargs["vectors_config"] is None
+
+    info.config.quantization_config = update_kwargs["quantization_config"]
+    mock_qdrant_client.update_collection.reset_mock()
+    await store.ensure_collection()
+    mock_qdrant_client.update_collection.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ensure_collection_migrates_payload_indexes(
+    vector_store: VectorStore, mock_qdrant_client: AsyncMock
+) -> None:
+    """Test missing payload indexes are created and mistyped ones recreated."""
+    existing_collection = MagicMock()
+    existing_collection.name = "test_collection"
+    mock_qdrant_client.get_collections.return_value = MagicMock(collections=[existing_collection])
+    payload_schema = {
+        field: MagicMock(data_type=schema) for field, schema in PAYLOAD_INDEXES.items()
+    }
+    del payload_schema["country"]
+    payload_schema["content_id"] = MagicMock(data_type=PayloadSchemaType.KEYWORD)
+    mock_qdrant_client.get_collection.return_value = MagicMock(payload_schema=payload_schema)
+
+    assert (await vector_store.payload_index_status())["content_id"] == "wrong type: keyword"
+
+    await vector_store.ensure_collection()
+
+    created = {
+        call.kwargs["field_name"]: call.kwargs["field_schema"]
+        for call in mock_qdrant_client.create_payload_index.call_args_list
+    }
+    assert created == {
+        "country": PayloadSchemaType.KEYWORD,
+        "content_id": PayloadSchemaType.INTEGER,
+    }
+    mock_qdrant_client.delete_payload_index.assert_called_once_with(
+        collection_name="test_collection", field_name="content_id"
+    )
+
+
 @pytest.mark.asyncio
 async def test_index_chunks_success(
     vector_store: VectorStore, mock_qdrant_client: AsyncMock
@@ -111,6 +255,106 @@ async def test_index_chunks_success(
     assert points[0].payload["title"] == "Test"
 
 
+@pytest.mark.asyncio
+async def test_index_chunks_uses_deterministic_ids(
+    vector_store: VectorStore, mock_qdrant_client: AsyncMock
+) -> None:
+    """Test re-indexing the same page produces the same point IDs."""
+    chunks: list[dict[str, Any]] = [
+        {"text": "chunk1", "chunk_index": 0, "token_count": 10, "canonical_url": "https://a.com/p"},
+        {"text": "chunk2", "chunk_index": 1, "token_count": 10, "canonical_url": "https://a.com/p"},
+    ]
+    embeddings = [[0.1, 0.2], [0.3, 0.4]]
+
+    await vector_store.index_chunks(chunks, embeddings, "https://a.com/p?utm_source=x")
+    await vector_store.index_chunks(chunks, embeddings, "https://a.com/p")
+
+    first, second = (call[1]["points"] for call in mock_qdrant_client.upsert.call_args_list)
+    assert [p.id for p in first] == [p.id for p in second]
+    assert first[1].id == chunk_point_id("https://a.com/p", 1)
+    assert chunk_point_id("https://a.com/p", 0) != chunk_point_id("https://a.com/q", 0)
+
+
+@pytest.mark.asyncio
+async def test_index_chunks_deletes_stale_chunks(
+    vector_store: VectorStore, mock_qdrant_client: AsyncMock
+) -> None:
+    """Test points of the page not in the new version are removed after upsert."""
+    chunks: list[dict[str, Any]] = [
+        {
+            "text": "only chunk",
+            "chunk_index": 0,
+            "token_count": 10,
+            "canonical_url": "https://a.com/p",
+        }
+    ]
+
+    await vector_store.index_chunks(chunks, [[0.1, 0.2]], "https://a.com/p")
+
+    mock_qdrant_client.delete.assert_awaited_once()
+    selector = mock_qdrant_client.delete.call_args[1]["points_selector"]
+    assert selector.filter.must[0].key == "canonical_url"
+    assert selector.filter.must[0].match.value == "https://a.com/p"
+    assert selector.filter.must_not[0].has_id == [chunk_point_id("https://a.com/p", 0)]
+
+
+@pytest.mark.asyncio
+async def test_index_chunks_keeps_unchanged_points(
+    vector_store: VectorStore, mock_qdrant_client: AsyncMock
+) -> None:
+    """Test None embeddings skip the upsert but keep the point and refresh its metadata."""
+    chunks: list[dict[str, Any]] = [
+        {
+            "text": "same",
+            "chunk_index": 0,
+            "token_count": 10,
+            "chunk_hash": "h0",
+            "char_start": 12,
+            "char_end": 16,
+            "title": "New",
+        },
+        {"text": "edited", "chunk_index": 1, "token_count": 10, "chunk_hash": "h1", "title": "New"},
+    ]
+
+    result = await vector_store.index_chunks(chunks, [None, [0.1, 0.2]], "https://a.com/p")
+
+    assert result == 2
+    points = mock_qdrant_client.upsert.call_args[1]["points"]
+    assert [p.id for p in points] == [chunk_point_id("https://a.com/p", 1)]
+    assert points[0].payload["chunk_hash"] == "h1"
+    (refresh,) = mock_qdrant_client.batch_update_points.call_args[1]["update_operations"]
+    assert refresh.set_payload.points == [chunk_point_id("https://a.com/p", 0)]
+    assert refresh.set_payload.payload["title"] == "New"
+    # Text before the chunk changed, so its offsets moved even though it did not
+    assert refresh.set_payload.payload["char_start"] == 12
+    assert refresh.set_payload.payload["char_end"] == 16
+    assert "text" not in refresh.set_payload.payload
+    mock_qdrant_client.set_payload.assert_not_called()
+    selector = mock_qdrant_client.delete.call_args[1]["points_selector"]
+    assert selector.filter.must_not[0].has_id == [
+        chunk_point_id("https://a.com/p", 0),
+        chunk_point_id("https://a.com/p", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_chunk_hashes_ignores_legacy_points(
+    vector_store: VectorStore, mock_qdrant_client: AsyncMock
+) -> None:
+    """Test only deterministic-ID points with a stored hash are reported."""
+    url = "https://a.com/p"
+    mock_qdrant_client.scroll.return_value = (
+        [
+            MagicMock(id=chunk_point_id(url, 0), payload={"chunk_index": 0, "chunk_hash": "h0"}),
+            MagicMock(id="legacy-random-id", payload={"chunk_index": 1, "chunk_hash": "h1"}),
+            MagicMock(id=chunk_point_id(url, 2), payload={"chunk_index": 2}),
+        ],
+        None,
+    )
+
+    assert await vector_store.get_chunk_hashes(url) == {0: "h0"}
+
+
 @pytest.mark.asyncio
 async def test_index_chunks_mismatch_error(
     vector_store: VectorStore, mock_qdrant_client: AsyncMock
@@ -191,6 +435,36 @@ async def test_search_with_multiple_filters(
     assert len(query_filter.must) == 4
 
 
+@pytest.mark.asyncio
+async def test_search_count_modes(vector_store: VectorStore, mock_qdrant_client: AsyncMock) -> None:
+    """Test each count mode's Qdrant round trips and reported total."""
+    mock_qdrant_client.search.return_value = [MagicMock(id="id1", score=0.9, payload={})]
+    count_resp = MagicMock()
+    count_resp.count = 42
+    mock_qdrant_client.count.return_value = count_resp
+
+    # Like the server setting, direct callers skip the count by default
+    _, total = await vector_store.search([0.1], offset=5)
+    assert total == 6
+    mock_qdrant_client.count.assert_not_called()
+
+    _, total = await vector_store.search([0.1], count_mode=CountMode.APPROXIMATE)
+    assert total == 42
+    assert mock_qdrant_client.count.call_args.kwargs["exact"] is False
+
+    mock_qdrant_client.count.reset_mock()
+    for _ in range(2):
+        _, total = await vector_store.search(
+            [0.1], domain="example.com", count_mode=CountMode.CACHED
+        )
+        assert total == 42
+    mock_qdrant_client.count.assert_called_once()
+    assert mock_qdrant_client.count.call_args.kwargs["exact"] is True
+
+    await vector_store.search([0.1], domain="other.com", count_mode=CountMode.CACHED)
+    assert mock_qdrant_client.count.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_count_points(vector_store: VectorStore, mock_qdrant_client: AsyncMock) -> None:
     """Test counting points."""
@@ -2,7 +2,7 @@
 
 import asyncio
 from typing import Any
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from workers.batch_worker import BatchWorker
 
@@ -225,3 +225,25 @@ def test_batch_worker_logs_batch_metrics():
 
     # Run async test in synchronous context
     asyncio.run(run_test())
+
+
+def test_batch_worker_publishes_chunking_pool_stats():
+    """Test each batch publishes the worker's chunking pool stats for the metrics API."""
+
+    async def run_test():
+        services = MagicMock()
+        services.chunking_pool.stats.return_value = {"mode": "thread", "tasks": 3}
+
+        with (
+            patch(
+                "workers.batch_worker._index_document_async",
+                new_callable=AsyncMock,
+                return_value={"success": True, "url": "https://example.com/1"},
+            ),
+            patch("workers.batch_worker.ServicePool.get_instance", return_value=services),
+        ):
+            await BatchWorker().process_batch([{"url": "https://example.com/1"}])
+
+        services.chunking_pool.publish_stats.assert_called_once_with(services.redis)
+
+    asyncio.run(run_test())
@@ -8,6 +8,7 @@ This implementation uses semantic-text-splitter, a high-performance Rust-based
 library designed for parallel processing and high-throughput workloads.
 """
 
+from bisect import bisect_left, bisect_right
 from typing import Any
 
 from semantic_text_splitter import TextSplitter
@@ -67,9 +68,12 @@ class TextChunker:
         )
 
         try:
-            tokenizer = Tokenizer.from_pretrained(model_name)
+            self.tokenizer = Tokenizer.from_pretrained(model_name)
+            # Token counts cover whole documents, never a truncated prefix
+            self.tokenizer.no_truncation()
+            self.tokenizer.no_padding()
             self.splitter = TextSplitter.from_huggingface_tokenizer(
-                tokenizer,
+                self.tokenizer,
                 capacity=max_tokens,
                 overlap=overlap_tokens,
             )
@@ -89,29 +93,38 @@ class TextChunker:
             metadata: Optional metadata to attach to each chunk
 
         Returns:
-            List of chunk dictionaries with 'text', 'chunk_index', and optional metadata
+            List of chunk dictionaries with 'text', 'chunk_index', 'token_count',
+            'char_start' and 'char_end' (offsets into ``text``), and optional metadata
         """
         if not text or not text.strip():
             logger.warning("Empty text provided for chunking")
             return []
 
         try:
-            # Use semantic-text-splitter (thread-safe, high-performance Rust implementation)
-            # chunks() returns an iterator of text chunks
-            chunk_texts = list(self.splitter.chunks(text))
+            # The document is encoded once; each chunk's token count is the
+            # number of tokens overlapping its character span, so tokens that
+            # straddle a chunk boundary count towards both chunks
+            offsets = self.tokenizer.encode(text, add_special_tokens=False).offsets
+            token_starts = [start for start, _ in offsets]
+            token_ends = [end for _, end in offsets]
 
-            # Convert to list of chunks with metadata
+            # Use semantic-text-splitter (thread-safe, high-performance Rust implementation)
+            # chunk_indices() returns (character offset, chunk text) pairs
             chunks = []
-            for chunk_index, chunk_text in enumerate(chunk_texts):
-                # semantic-text-splitter guarantees chunks are within token limits
-                # We can estimate token count based on character/token ratio
-                # For most tokenizers, ~4 chars per token is a reasonable estimate
-                estimated_tokens = min(self.max_tokens, max(1, len(chunk_text) // 4))
+            for chunk_index, (char_start, chunk_text) in enumerate(
+                self.splitter.chunk_indices(text)
+            ):
+                char_end = char_start + len(chunk_text)
+                token_count = bisect_left(token_starts, char_end) - bisect_right(
+                    token_ends, char_start
+                )
 
                 chunk = {
                     "text": chunk_text,
                     "chunk_index": chunk_index,
-                    "token_count": estimated_tokens,
+                    "token_count": token_count,
+                    "char_start": char_start,
+                    "char_end": char_end,
                 }
 
                 # Add metadata if provided
@@ -124,13 +137,14 @@ class TextChunker:
                     "Created chunk",
                     chunk_index=chunk_index,
                     chars=len(chunk_text),
-                    estimated_tokens=estimated_tokens,
+                    tokens=token_count,
                 )
 
             logger.info(
                 "Chunking complete",
                 total_chunks=len(chunks),
                 text_length=len(text),
+                total_tokens=len(offsets),
                 avg_chars_per_chunk=len(text) / len(chunks) if chunks else 0,
             )
 
@@ -141,6 +155,30 @@ class TextChunker:
             raise
 
 
+# Distinct code points remembered by the cleaning table; real pages use a few
+# thousand, and the cap bounds memory on adversarial input
+_PRINTABLE_TABLE_MAX_ENTRIES = 65536
+
+
+class _PrintableTable(dict[int, int | None]):
+    """
+    ``str.translate`` table deleting the characters ``str.isprintable`` rejects.
+
+    Code points are classified the first time they are seen; after that
+    ``translate`` resolves them with a C-level dict lookup.
+    """
+
+    def __missing__(self, codepoint: int) -> int | None:
+        char = chr(codepoint)
+        value = codepoint if char.isprintable() or char in "\n\t" else None
+        if len(self) < _PRINTABLE_TABLE_MAX_ENTRIES:
+            self[codepoint] = value
+        return value
+
+
+_PRINTABLE_TABLE = _PrintableTable()
+
+
 def clean_text(text: str) -> str:
     """
     Clean and normalize text for indexing.
@@ -157,8 +195,10 @@ def clean_text(text: str) -> str:
     # Remove excessive whitespace
     text = " ".join(text.split())
 
-    # Remove control characters (but keep newlines and tabs)
-    text = "".join(char for char in text if char.isprintable() or char in "\n\t")
+    # Remove control characters (but keep newlines and tabs). Most pages have
+    # none, and the check and the removal both run in C
+    if not text.isprintable():
+        text = text.translate(_PRINTABLE_TABLE)
 
     return text.strip()
 
@@ -87,6 +87,7 @@ async def _index_document_async(document_dict: dict[str, Any]) -> dict[str, Any]
             url=document.url,
             success=result.get("success"),
             chunks=result.get("chunks_indexed", 0),
+            skipped_unchanged=result.get("status") == "skipped_unchanged",
         )
 
         return result
@@ -225,12 +226,24 @@ class BatchWorker:
                 failures=infrastructure_errors[:3],  # Sample of failures
             )
 
+        # Report how busy chunking kept its pool, to size it against the I/O,
+        # and publish it for the metrics API
+        chunking_pool: dict[str, Any] | None = None
+        try:
+            services = ServicePool.get_instance()
+            chunking_pool = services.chunking_pool.stats()
+            if services.redis is not None:
+                await asyncio.to_thread(services.chunking_pool.publish_stats, services.redis)
+        except Exception as e:
+            logger.debug("Chunking pool stats unavailable", error=str(e))
+
         success_count = sum(1 for r in processed_results if r.get("success"))
         logger.info(
             "Batch processing complete",
             total=len(documents),
             success=success_count,
             failed=len(documents) - success_count,
+            chunking_pool=chunking_pool,
         )
 
         return processed_results
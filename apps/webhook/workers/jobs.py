@@ -17,6 +17,9 @@ from utils.time import format_est_timestamp
 
 logger = get_logger(__name__)
 
+# Firecrawl status codes meaning the watched page no longer exists
+_GONE_STATUS_CODES = frozenset({404, 410})
+
 
 async def _index_document_helper(
     url: str,
@@ -66,6 +69,27 @@ async def _index_document_helper(
     return url  # Return URL as document ID
 
 
+async def _delete_document_helper(url: str) -> str:
+    """
+    Helper function to remove a document from the indexes.
+
+    Args:
+        url: Document URL
+
+    Returns:
+        Document URL as identifier
+    """
+    service_pool = ServicePool.get_instance()
+    indexing_service = service_pool.get_indexing_service()
+
+    result = await indexing_service.delete_document(url)
+
+    if not result.get("success"):
+        raise Exception(f"Deletion failed: {result.get('error')}")
+
+    return url
+
+
 async def rescrape_changed_url(change_event_id: int) -> dict[str, Any]:
     """
     Rescrape URL with proper transaction boundaries.
@@ -177,18 +201,24 @@ async def rescrape_changed_url(change_event_id: int) -> dict[str, Any]:
         if not scrape_data.get("success"):
             raise Exception(f"Firecrawl scrape failed: {scrape_data}")
 
-        # Index in search
-        logger.info("Indexing scraped content", url=watch_url)
         data = scrape_data.get("data", {})
-        doc_id = await _index_document_helper(
-            url=watch_url,
-            text=data.get("markdown", ""),
-            metadata={
-                "change_event_id": change_event_id,
-                "title": data.get("metadata", {}).get("title"),
-                "description": data.get("metadata", {}).get("description"),
-            },
-        )
+        status_code = data.get("metadata", {}).get("statusCode")
+        if status_code in _GONE_STATUS_CODES:
+            # The page was removed: drop it from search instead of indexing the error page
+            logger.info("Removing gone URL from search", url=watch_url, status_code=status_code)
+            doc_id = await _delete_document_helper(watch_url)
+        else:
+            # Index in search (replaces the previously indexed version)
+            logger.info("Indexing scraped content", url=watch_url)
+            doc_id = await _index_document_helper(
+                url=watch_url,
+                text=data.get("markdown", ""),
+                metadata={
+                    "change_event_id": change_event_id,
+                    "title": data.get("metadata", {}).get("title"),
+                    "description": data.get("metadata", {}).get("description"),
+                },
+            )
 
     except Exception as e:
         # TRANSACTION 3a: Update failure status (separate transaction)